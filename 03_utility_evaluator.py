@@ -1,8 +1,14 @@
 import pandas as pd
 import glob, re, warnings
+from functools import partial
 from xgboost import XGBClassifier
 from sklearn.metrics import f1_score
-from sklearn.preprocessing import LabelEncoder
+
+# Também ajusta o path para o pacote pipeline do ml-worker-python
+from ml_utility_evaluator import parallel_fit, ML_EVAL_CPUS, ML_EVAL_CACHE_DIR
+from pipeline.encoded import encode_shared
+from pipeline.fingerprint import dataset_fingerprint
+from pipeline.model_cache import ModelCache
 
 warnings.filterwarnings("ignore")
 
@@ -12,33 +18,43 @@ def apply_wrangling(df):
     # Agrupamento Top 15 (Equilíbrio entre sinal e ruído)
     for col in ['DS_OCUPACAO', 'SG_PARTIDO']:
         top_n = df_w[col].value_counts().nlargest(15).index
-        df_w[col] = df_w[col].apply(lambda x: x if x in top_n else 'OUTROS')
+        df_w[col] = df_w[col].where(df_w[col].isin(top_n), 'OUTROS')
     return df_w
 
-def run_model(df_train, df_test, wrangle=False):
-    df_tr = apply_wrangling(df_train) if wrangle else df_train.copy()
-    df_ts = df_test.copy() 
+def run_model(df_train, df_test, wrangle=False, n_jobs=1):
+    df_tr = apply_wrangling(df_train) if wrangle else df_train
 
     X_train, y_train = df_tr.drop(columns=['ALVO']), df_tr['ALVO']
-    X_test, y_test = df_ts.drop(columns=['ALVO']), df_ts['ALVO']
+    X_test, y_test = df_test.drop(columns=['ALVO']), df_test['ALVO']
 
-    for col in X_train.columns:
-        le = LabelEncoder()
-        le.fit(pd.concat([X_train[col], X_test[col]]).astype(str))
-        X_train[col] = le.transform(X_train[col].astype(str))
-        X_test[col] = le.transform(X_test[col].astype(str))
+    # Vocabulário comum ordenado (os códigos de um LabelEncoder ajustado em treino + teste)
+    enc_train, enc_test = encode_shared([X_train, X_test], columns=list(X_train.columns), sort=True)
+    X_train, X_test = enc_train.codes_frame(), enc_test.codes_frame()
 
-    model = XGBClassifier(n_estimators=100, random_state=42, eval_metric='logloss')
+    model = XGBClassifier(n_estimators=100, random_state=42, eval_metric='logloss', n_jobs=n_jobs)
     model.fit(X_train, y_train)
     return f1_score(y_test, model.predict(X_test), average='weighted')
 
+def real_baselines(real_train, real_test, cache):
+    """F1 dos baselines Real Puro / Real Wrangled, treinados uma vez por par treino/teste."""
+    key = ModelCache.make_key(f"{dataset_fingerprint(real_train)}:{dataset_fingerprint(real_test)}",
+                              kind="tstr_baseline_03")
+    baselines = cache.get(key) if cache else None
+    if baselines is None:
+        puro, wrang = parallel_fit([partial(run_model, real_train, real_test, wrangle=w) for w in (False, True)])
+        baselines = {"puro": puro, "wrangled": wrang}
+        if cache:
+            cache.put(key, baselines)
+    return baselines
+
 if __name__ == "__main__":
     real_train = pd.read_parquet("df_real_train.parquet")
     real_test = pd.read_parquet("df_real_test.parquet")
 
-    # Baselines Reais
-    f1_real_puro = run_model(real_train, real_test, wrangle=False)
-    f1_real_wrang = run_model(real_train, real_test, wrangle=True)
+    # Baselines Reais (reaproveitados do cache enquanto o treino/teste real não mudar)
+    cache = ModelCache(ML_EVAL_CACHE_DIR) if ML_EVAL_CACHE_DIR else None
+    baselines = real_baselines(real_train, real_test, cache)
+    f1_real_puro, f1_real_wrang = baselines["puro"], baselines["wrangled"]
 
     print("\n" + "="*75)
     print(f"{'Epsilon':>10} | {'F1 (Puro)':>12} | {'F1 (Wrangled)':>15} | {'Retenção %':>12}")
@@ -49,11 +65,22 @@ if __name__ == "__main__":
     files = glob.glob("df_syn_eps_*.parquet")
     eps_files = sorted([(float(re.findall(r"eps_(.*)\.parquet", f)[0]), f) for f in files], key=lambda x: x[0], reverse=True)
 
+    # Todos os epsilons (puro e wrangled) treinam em paralelo dentro de ML_EVAL_CPUS
+    jobs, labels = [], []
     for eps, fname in eps_files:
         syn_train = pd.read_parquet(fname)
-        f1_p = run_model(syn_train, real_test, wrangle=False)
-        f1_w = run_model(syn_train, real_test, wrangle=True)
+        for wrangle in (False, True):
+            labels.append((eps, wrangle))
+            jobs.append(partial(run_model, syn_train, real_test, wrangle=wrangle))
+    scores = dict(zip(labels, parallel_fit(jobs, ML_EVAL_CPUS)))
+
+    rows = []
+    for eps, _ in eps_files:
+        f1_p, f1_w = scores[(eps, False)], scores[(eps, True)]
         # Retenção baseada no Real Wrangled
-        ret = (f1_w / f1_real_wrang) * 100
-        print(f"{eps:10.3f} | {f1_p:12.4f} | {f1_w:15.4f} | {ret:11.2f}%")
-    print("="*75)
\ No newline at end of file
+        rows.append({"Epsilon": eps, "F1_Puro": f1_p, "F1_Wrangled": f1_w, "Retencao_Pct": f1_w / f1_real_wrang * 100})
+        print(f"{eps:10.3f} | {f1_p:12.4f} | {f1_w:15.4f} | {rows[-1]['Retencao_Pct']:11.2f}%")
+    print("="*75)
+
+    pd.DataFrame([{"Epsilon": "REAL", "F1_Puro": f1_real_puro, "F1_Wrangled": f1_real_wrang, "Retencao_Pct": 100.0},
+                  *rows]).to_csv("tstr_resultados.csv", index=False)
\ No newline at end of file
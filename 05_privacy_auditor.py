@@ -1,31 +1,43 @@
+import sys, os
 import pandas as pd
 import glob, re, warnings
-from anonymeter.evaluators import InferenceEvaluator
+
+# --- AJUSTE DE PATH ---
+root_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.join(root_dir, "ml-worker-python")
+if worker_dir not in sys.path:
+    sys.path.insert(0, worker_dir)
+
+from pipeline.audit_executor import AuditExecutor, attack_task
 
 warnings.filterwarnings("ignore")
 
 if __name__ == "__main__":
     QIDS = ['SG_PARTIDO', 'DS_GENERO', 'DS_COR_RACA', 'DS_ESTADO_CIVIL', 'SG_UF']
     SECRET = 'DS_GRAU_INSTRUCAO'
+    # Lotes de 100 ataques até o IC 95% ter largura <= 0.05 (no máximo 1000 ataques)
+    TARGET_CI_WIDTH = 0.05
+    MAX_ATTACKS = 1000
+    executor = AuditExecutor(max_workers=1)
     
     df_real = pd.read_parquet("df_real_train.parquet").astype(str)
     
     files = glob.glob("df_syn_eps_*.parquet")
     eps_files = sorted([(float(re.findall(r"eps_(.*)\.parquet", f)[0]), f) for f in files], key=lambda x: x[0], reverse=True)
 
-    print("\n" + "="*60)
-    print(f"{'Epsilon':>10} | {'Risco':>12} | {'IC 95%':>25}")
-    print("-" * 60)
+    print("\n" + "="*70)
+    print(f"{'Epsilon':>10} | {'Risco':>12} | {'IC 95%':>25} | {'Ataques':>8}")
+    print("-" * 70)
 
     for eps, fname in eps_files:
         try:
             df_syn = pd.read_parquet(fname).astype(str)
-            # Aumentamos para 1000 ataques para estabilizar o IC
-            eval_inf = InferenceEvaluator(ori=df_real, syn=df_syn, aux_cols=QIDS, secret=SECRET, n_attacks=1000)
-            eval_inf.evaluate()
-            risk = eval_inf.risk()
+            task = attack_task("inference", name=SECRET, aux_cols=QIDS, secret=SECRET)
+            result = executor.run_adaptive({"ori": df_real, "syn": df_syn}, [task],
+                                           target_ci_width=TARGET_CI_WIDTH, max_attacks=MAX_ATTACKS)[SECRET]
+            risk = result.risk
             ic = f"({risk.ci[0]:.3f} - {risk.ci[1]:.3f})"
-            print(f"{eps:10.3f} | {risk.value:12.4f} | {ic:>25}")
+            print(f"{eps:10.3f} | {risk.value:12.4f} | {ic:>25} | {result.n_attacks:>8}")
         except Exception as e:
             print(f"⚠️ Erro no Epsilon {eps}: {e}")
-    print("="*60)
\ No newline at end of file
+    print("="*70)
\ No newline at end of file
@@ -10,10 +10,13 @@ import (
 	"os"
 	"path/filepath"
 	"strconv"
+	"sync"
 	"time"
 
 	"google.golang.org/grpc"
+	"google.golang.org/grpc/codes"
 	"google.golang.org/grpc/credentials/insecure"
+	"google.golang.org/grpc/status"
 
 	pb "github.com/samico/lgpd-diff-priv/pb"
 )
@@ -21,21 +24,112 @@ import (
 const (
 	uploadPath = "./data"
 	workerAddr = "localhost:50051"
+	// Fragmentos do UploadDataset (abaixo do limite de 4 MB por mensagem do gRPC)
+	streamChunkSize = 1 << 20
+	// Jobs terminados cujo resultado nunca foi aberto saem do jobTracker depois deste prazo
+	jobRetention = 30 * time.Minute
 )
 
+// WORKER_TRANSPORT=stream envia o upload ao worker por gRPC em vez de gravá-lo no
+// volume compartilhado ./data (necessário quando os containers não dividem disco)
+var streamTransport = os.Getenv("WORKER_TRANSPORT") == "stream"
+
 type PageData struct {
 	Response *pb.AnonymizeResponse
 	Error    string
 }
 
+// JobView alimenta o fragmento web/job.html, que se atualiza via HTMX a cada 2s
+type JobView struct {
+	JobId          string
+	State          string
+	Stage          string
+	Progress       float32
+	ElapsedSeconds float32
+	QueuePosition  int32
+}
+
+// jobTracker guarda o último evento de progresso de cada job acompanhado via WatchJob.
+// A entrada sai quando a página de resultado é servida ou, se ninguém a abrir, jobRetention
+// depois do estado final (o worker também só guarda os últimos jobs terminados).
+type jobTracker struct {
+	mu   sync.Mutex
+	jobs map[string]*trackedJob
+}
+
+type trackedJob struct {
+	progress *pb.JobProgress
+	finished time.Time // Zero enquanto o job não chega a um estado final
+}
+
+func (t *jobTracker) set(p *pb.JobProgress) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	job, ok := t.jobs[p.JobId]
+	if !ok {
+		job = &trackedJob{}
+		t.jobs[p.JobId] = job
+	}
+	job.progress = p
+	if isTerminal(p.State) && job.finished.IsZero() {
+		job.finished = time.Now()
+		t.expire(job.finished)
+	}
+}
+
+func (t *jobTracker) get(jobID string) *pb.JobProgress {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	if job, ok := t.jobs[jobID]; ok {
+		return job.progress
+	}
+	return nil
+}
+
+func (t *jobTracker) remove(jobID string) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	delete(t.jobs, jobID)
+}
+
+// expire remove os jobs terminados há mais de jobRetention (chamado com o mutex travado)
+func (t *jobTracker) expire(now time.Time) {
+	for id, job := range t.jobs {
+		if !job.finished.IsZero() && now.Sub(job.finished) > jobRetention {
+			delete(t.jobs, id)
+		}
+	}
+}
+
+var (
+	workerConn *grpc.ClientConn
+	tracker    = &jobTracker{jobs: make(map[string]*trackedJob)}
+)
+
+func isTerminal(state string) bool {
+	return state == "DONE" || state == "FAILED" || state == "CANCELLED"
+}
+
 func main() {
 	os.MkdirAll(uploadPath, os.ModePerm)
 
+	// Conexão única com o worker, compartilhada pelos handlers e pelos streams de progresso
+	conn, err := grpc.Dial(workerAddr, grpc.WithTransportCredentials(insecure.NewCredentials()))
+	if err != nil {
+		log.Fatalf("[ERROR] Falha ao configurar conexão com o worker: %v", err)
+	}
+	defer conn.Close()
+	workerConn = conn
+
 	mux := http.NewServeMux()
 
 	// Rotas principais
 	mux.HandleFunc("GET /", indexHandler)
 	mux.HandleFunc("POST /upload", uploadHandler)
+	mux.HandleFunc("GET /jobs/{id}", jobHandler)
+	mux.HandleFunc("POST /jobs/{id}/cancel", cancelHandler)
+	mux.HandleFunc("GET /results/{name}", downloadHandler)
+	mux.HandleFunc("GET /metrics", metricsHandler)
 	mux.HandleFunc("GET /debug-gui", debugHandler)
 
 	// Servidor de arquivos estáticos
@@ -67,20 +161,33 @@ func debugHandler(w http.ResponseWriter, r *http.Request) {
 	w.Header().Set("Content-Type", "text/html; charset=utf-8")
 
 	mockResp := &pb.AnonymizeResponse{
-		OutputPath:      "amostra_final_tse.parquet",
-		PrivacyScore:    0.9215,
-		UtilityScore:    0.7840,
-		EpsilonUsed:     1.0,
-		SinglingOutRisk: 0.0120, // FICARÁ VERDE (Seguro)
-		LinkabilityRisk: 0.1250, // FICARÁ AMARELO (Moderado)
-		InferenceRisk:   0.3640, // FICARÁ VERMELHO (Vulnerável)
-		Status:          "ESTADO DE DEBUG // AMBIENTE DE DESENVOLVIMENTO",
+		OutputPath:        "amostra_final_tse.parquet",
+		PrivacyScore:      0.9215,
+		UtilityScore:      0.7840,
+		JointUtilityScore: 0.7310,
+		DcrExactMatchRate: 0.0040,
+		DcrMedian:         0.3846,
+		DcrP05:            0.1538,
+		NndrMedian:        0.8000,
+		EpsilonUsed:       1.0,
+		EpsilonProbes:     6,
+		TargetMet:         true,
+		SinglingOutRisk:   0.0120, // FICARÁ VERDE (Seguro)
+		LinkabilityRisk:   0.1250, // FICARÁ AMARELO (Moderado)
+		InferenceRisk:     0.3640, // FICARÁ VERMELHO (Vulnerável)
+		Status:            "ESTADO DE DEBUG // AMBIENTE DE DESENVOLVIMENTO",
 		PiiReport: map[string]string{
 			"NM_CANDIDATO": "MASKED",
 			"NR_CPF":       "HASHED",
 			"DS_EMAIL":     "REDACTED",
 			"DT_NASC":      "GENERALIZED",
 		},
+		Stages: []*pb.StageMetric{
+			{Name: "load", WallSec: 1.84, CpuSec: 1.79, PeakRssMb: 412, RowsIn: 486000, RowsOut: 10000},
+			{Name: "wrangle", WallSec: 0.42, CpuSec: 0.41, PeakRssMb: 298, RowsIn: 10000, RowsOut: 10000},
+			{Name: "fit", WallSec: 96.3, CpuSec: 188.5, PeakRssMb: 1730, RowsIn: 10000},
+			{Name: "audit_inference", WallSec: 7.9, CpuSec: 7.6, PeakRssMb: 520, RowsIn: 300},
+		},
 	}
 
 	// Wrapper HTML para o Debug carregar estilos
@@ -131,40 +238,274 @@ func uploadHandler(w http.ResponseWriter, r *http.Request) {
 		epsilon = 1.0
 	}
 
-	filename := filepath.Join(uploadPath, "raw_"+header.Filename)
-	out, err := os.Create(filename)
+	// Vazio ou inválido: o worker gera o mesmo número de linhas da amostra de treino
+	outputRows, _ := strconv.ParseInt(r.FormValue("output_rows"), 10, 64)
+	if outputRows < 0 {
+		outputRows = 0
+	}
+
+	// Risco alvo: o worker busca o maior epsilon que o atinge (vazio ou inválido = usa o epsilon do formulário).
+	// O epsilon vai zerado para a busca usar a faixa inteira do worker, não o valor do controle deslizante.
+	targetRisk, _ := strconv.ParseFloat(r.FormValue("target_risk"), 64)
+	if targetRisk <= 0 || targetRisk >= 1 {
+		targetRisk = 0
+	} else {
+		epsilon = 0
+	}
+
+	client := pb.NewPrivacyServiceClient(workerConn)
+
+	var inputPath string
+	if streamTransport {
+		inputPath, err = uploadDataset(r.Context(), client, file, header.Filename)
+		if status.Code(err) == codes.ResourceExhausted {
+			renderResult(w, nil, "Dataset maior que o espaço disponível no worker")
+			return
+		}
+		if err != nil {
+			log.Printf("[ERROR] UploadDataset: %v", err)
+			renderResult(w, nil, "Erro ao enviar o dataset ao worker")
+			return
+		}
+	} else {
+		filename := filepath.Join(uploadPath, "raw_"+header.Filename)
+		out, err := os.Create(filename)
+		if err != nil {
+			renderResult(w, nil, "Erro ao salvar arquivo")
+			return
+		}
+		defer out.Close()
+		io.Copy(out, file)
+
+		inputPath, _ = filepath.Abs(filename)
+	}
+
+	// O job entra na fila do worker; a página acompanha o progresso por polling em /jobs/{id}
+	ctx, cancel := context.WithTimeout(r.Context(), 30*time.Second)
+	defer cancel()
+
+	handle, err := client.SubmitJob(ctx, &pb.AnonymizeRequest{
+		InputPath:  inputPath,
+		Epsilon:    float32(epsilon),
+		DetectPii:  true,
+		OutputRows: outputRows,
+		TargetRisk: float32(targetRisk),
+	})
+
+	if status.Code(err) == codes.ResourceExhausted {
+		renderResult(w, nil, "Worker saturado, tente novamente em instantes")
+		return
+	}
 	if err != nil {
-		renderResult(w, nil, "Erro ao salvar arquivo")
+		renderResult(w, nil, "Worker Offline")
 		return
 	}
-	defer out.Close()
-	io.Copy(out, file)
 
-	absPath, _ := filepath.Abs(filename)
+	fmt.Printf("[INFO] Job %s enfileirado (posição %d)\n", handle.JobId, handle.QueuePosition)
+	tracker.set(&pb.JobProgress{JobId: handle.JobId, State: handle.State, Stage: "queued"})
+	go watchJob(handle.JobId)
 
-	conn, err := grpc.Dial(workerAddr, grpc.WithTransportCredentials(insecure.NewCredentials()))
+	renderJob(w, tracker.get(handle.JobId), handle.QueuePosition)
+}
+
+// uploadDataset envia o arquivo ao worker em fragmentos (sem tocar o disco local) e
+// devolve o input_path dataset://... a ser usado no AnonymizeRequest
+func uploadDataset(ctx context.Context, client pb.PrivacyServiceClient, file io.Reader, filename string) (string, error) {
+	stream, err := client.UploadDataset(ctx)
 	if err != nil {
-		renderResult(w, nil, "Worker Offline")
+		return "", err
+	}
+
+	buf := make([]byte, streamChunkSize)
+	first := true
+	for {
+		n, readErr := io.ReadFull(file, buf)
+		if n > 0 {
+			chunk := &pb.DataChunk{Data: buf[:n]}
+			if first {
+				chunk.Filename = filename
+				first = false
+			}
+			// Send serializa a mensagem antes de retornar: o buffer pode ser reaproveitado
+			if err := stream.Send(chunk); err != nil {
+				_, err = stream.CloseAndRecv()
+				return "", err
+			}
+		}
+		if readErr == io.EOF || readErr == io.ErrUnexpectedEOF {
+			break
+		}
+		if readErr != nil {
+			return "", readErr
+		}
+	}
+
+	handle, err := stream.CloseAndRecv()
+	if err != nil {
+		return "", err
+	}
+	fmt.Printf("[INFO] Dataset %s enviado por stream (%d linhas, %d bytes)\n", handle.DatasetId, handle.Rows, handle.SizeBytes)
+	return handle.InputPath, nil
+}
+
+// downloadHandler repassa o Parquet gerado pelo worker direto para o navegador,
+// sem depender do volume compartilhado
+func downloadHandler(w http.ResponseWriter, r *http.Request) {
+	name := filepath.Base(r.PathValue("name"))
+	client := pb.NewPrivacyServiceClient(workerConn)
+	stream, err := client.DownloadResult(r.Context(), &pb.DownloadRequest{OutputPath: name, Format: "parquet"})
+	if err != nil {
+		http.Error(w, "Worker Offline", http.StatusBadGateway)
 		return
 	}
-	defer conn.Close()
 
-	client := pb.NewPrivacyServiceClient(conn)
-	ctx, cancel := context.WithTimeout(context.Background(), 30*time.Minute)
+	// O primeiro fragmento confirma que o arquivo existe antes de enviar os cabeçalhos
+	chunk, err := stream.Recv()
+	if err != nil && err != io.EOF {
+		if status.Code(err) == codes.NotFound {
+			http.NotFound(w, r)
+		} else {
+			http.Error(w, "Falha ao baixar o resultado", http.StatusBadGateway)
+		}
+		return
+	}
+
+	w.Header().Set("Content-Type", "application/vnd.apache.parquet")
+	w.Header().Set("Content-Disposition", fmt.Sprintf("attachment; filename=%q", name))
+	for chunk != nil {
+		if _, err := w.Write(chunk.Data); err != nil {
+			return
+		}
+		chunk, err = stream.Recv()
+		if err != nil {
+			if err != io.EOF {
+				log.Printf("[ERROR] DownloadResult %s: %v", name, err)
+			}
+			return
+		}
+	}
+}
+
+// metricsHandler expõe ao Prometheus o custo por etapa agregado pelo worker
+func metricsHandler(w http.ResponseWriter, r *http.Request) {
+	client := pb.NewPrivacyServiceClient(workerConn)
+	ctx, cancel := context.WithTimeout(r.Context(), 5*time.Second)
 	defer cancel()
 
-	resp, err := client.ProcessDataset(ctx, &pb.AnonymizeRequest{
-		InputPath: absPath,
-		Epsilon:   float32(epsilon),
-		DetectPii: true,
-	})
+	metrics, err := client.GetMetrics(ctx, &pb.MetricsRequest{})
+	if err != nil {
+		http.Error(w, "Worker Offline", http.StatusBadGateway)
+		return
+	}
+	w.Header().Set("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+	io.WriteString(w, metrics.Text)
+}
 
+// watchJob consome o stream de progresso do worker até o job terminar
+func watchJob(jobID string) {
+	client := pb.NewPrivacyServiceClient(workerConn)
+	stream, err := client.WatchJob(context.Background(), &pb.JobRequest{JobId: jobID})
 	if err != nil {
-		renderResult(w, nil, "Erro no processamento gRPC")
+		log.Printf("[ERROR] WatchJob %s: %v", jobID, err)
+		// Sem stream o job nunca chegaria a um estado final no tracker
+		tracker.set(&pb.JobProgress{JobId: jobID, State: "FAILED", Stage: "stream", Message: err.Error()})
+		return
+	}
+
+	for {
+		p, err := stream.Recv()
+		if err == io.EOF {
+			return
+		}
+		if err != nil {
+			log.Printf("[ERROR] Stream de progresso do job %s interrompido: %v", jobID, err)
+			tracker.set(&pb.JobProgress{JobId: jobID, State: "FAILED", Stage: "stream", Message: err.Error()})
+			return
+		}
+		fmt.Printf("[JOB %s] %-20s %5.1f%% (etapa %.1fs / total %.1fs)\n",
+			jobID[:8], p.Stage, p.Progress*100, p.StageSeconds, p.ElapsedSeconds)
+		tracker.set(p)
+	}
+}
+
+func jobHandler(w http.ResponseWriter, r *http.Request) {
+	jobID := r.PathValue("id")
+	p := tracker.get(jobID)
+	if p == nil {
+		renderResult(w, nil, "Job desconhecido")
+		return
+	}
+
+	if !isTerminal(p.State) {
+		renderJob(w, p, 0)
 		return
 	}
 
-	renderResult(w, resp, "")
+	client := pb.NewPrivacyServiceClient(workerConn)
+	ctx, cancel := context.WithTimeout(r.Context(), 30*time.Second)
+	defer cancel()
+
+	res, err := client.GetJobResult(ctx, &pb.JobRequest{JobId: jobID})
+	if err != nil {
+		// A entrada fica: o próximo polling tenta de novo
+		renderResult(w, nil, "Erro ao obter resultado do job")
+		return
+	}
+	// Resultado entregue: o job sai do tracker (o worker ainda o guarda entre os últimos terminados)
+	tracker.remove(jobID)
+	switch {
+	case res.State == "DONE":
+		renderResult(w, res.Response, "")
+	case res.State == "CANCELLED":
+		renderResult(w, nil, "Job cancelado")
+	default:
+		renderResult(w, nil, "Erro no processamento: "+res.Error)
+	}
+}
+
+func cancelHandler(w http.ResponseWriter, r *http.Request) {
+	jobID := r.PathValue("id")
+	if tracker.get(jobID) == nil {
+		renderResult(w, nil, "Job desconhecido")
+		return
+	}
+
+	client := pb.NewPrivacyServiceClient(workerConn)
+	ctx, cancel := context.WithTimeout(r.Context(), 30*time.Second)
+	defer cancel()
+
+	if _, err := client.CancelJob(ctx, &pb.JobRequest{JobId: jobID}); err != nil {
+		renderResult(w, nil, "Erro ao cancelar job")
+		return
+	}
+
+	// O estado final chega pelo stream; até lá o fragmento continua em polling
+	p := tracker.get(jobID)
+	if p == nil {
+		// Saiu do tracker durante o CancelJob (resultado já entregue ou expirado)
+		renderResult(w, nil, "Job desconhecido")
+		return
+	}
+	renderJob(w, p, 0)
+}
+
+func renderJob(w http.ResponseWriter, p *pb.JobProgress, queuePosition int32) {
+	w.Header().Set("Content-Type", "text/html; charset=utf-8")
+	funcs := template.FuncMap{"percent": func(v float32) float32 { return v * 100 }}
+	tmpl, err := template.New("job.html").Funcs(funcs).ParseFiles("web/job.html")
+	if err != nil {
+		log.Printf("[ERROR] Erro ao carregar job.html: %v", err)
+		http.Error(w, "Erro ao renderizar job", 500)
+		return
+	}
+	tmpl.Execute(w, JobView{
+		JobId:          p.JobId,
+		State:          p.State,
+		Stage:          p.Stage,
+		Progress:       p.Progress,
+		ElapsedSeconds: p.ElapsedSeconds,
+		QueuePosition:  queuePosition,
+	})
 }
 
 func renderResult(w http.ResponseWriter, resp *pb.AnonymizeResponse, errStr string) {
@@ -22,11 +22,15 @@ const (
 )
 
 type AnonymizeRequest struct {
-	state         protoimpl.MessageState `protogen:"open.v1"`
-	InputPath     string                 `protobuf:"bytes,1,opt,name=input_path,json=inputPath,proto3" json:"input_path,omitempty"`
-	Epsilon       float32                `protobuf:"fixed32,2,opt,name=epsilon,proto3" json:"epsilon,omitempty"`
-	Delta         float32                `protobuf:"fixed32,3,opt,name=delta,proto3" json:"delta,omitempty"`
-	DetectPii     bool                   `protobuf:"varint,4,opt,name=detect_pii,json=detectPii,proto3" json:"detect_pii,omitempty"`
+	state      protoimpl.MessageState `protogen:"open.v1"`
+	InputPath  string                 `protobuf:"bytes,1,opt,name=input_path,json=inputPath,proto3" json:"input_path,omitempty"`
+	Epsilon    float32                `protobuf:"fixed32,2,opt,name=epsilon,proto3" json:"epsilon,omitempty"`
+	Delta      float32                `protobuf:"fixed32,3,opt,name=delta,proto3" json:"delta,omitempty"`
+	DetectPii  bool                   `protobuf:"varint,4,opt,name=detect_pii,json=detectPii,proto3" json:"detect_pii,omitempty"`
+	OutputRows int64                  `protobuf:"varint,5,opt,name=output_rows,json=outputRows,proto3" json:"output_rows,omitempty"` // Linhas do sintético publicado (0 = tamanho da amostra de treino)
+	// > 0: busca o maior epsilon com pior risco abaixo deste alvo (epsilon > 0 vira o teto da busca);
+	// < 0: usa o alvo padrão do worker (TARGET_RISK); 0: usa o epsilon pedido
+	TargetRisk    float32 `protobuf:"fixed32,6,opt,name=target_risk,json=targetRisk,proto3" json:"target_risk,omitempty"`
 	unknownFields protoimpl.UnknownFields
 	sizeCache     protoimpl.SizeCache
 }
@@ -89,6 +93,20 @@ func (x *AnonymizeRequest) GetDetectPii() bool {
 	return false
 }
 
+func (x *AnonymizeRequest) GetOutputRows() int64 {
+	if x != nil {
+		return x.OutputRows
+	}
+	return 0
+}
+
+func (x *AnonymizeRequest) GetTargetRisk() float32 {
+	if x != nil {
+		return x.TargetRisk
+	}
+	return 0
+}
+
 type AnonymizeResponse struct {
 	state        protoimpl.MessageState `protogen:"open.v1"`
 	OutputPath   string                 `protobuf:"bytes,1,opt,name=output_path,json=outputPath,proto3" json:"output_path,omitempty"`
@@ -98,11 +116,21 @@ type AnonymizeResponse struct {
 	Status       string                 `protobuf:"bytes,5,opt,name=status,proto3" json:"status,omitempty"` // Aqui enviaremos a tabela formatada
 	PiiReport    map[string]string      `protobuf:"bytes,6,rep,name=pii_report,json=piiReport,proto3" json:"pii_report,omitempty" protobuf_key:"bytes,1,opt,name=key" protobuf_val:"bytes,2,opt,name=value"`
 	// Novos campos para a GUI tabular
-	SinglingOutRisk float32 `protobuf:"fixed32,7,opt,name=singling_out_risk,json=singlingOutRisk,proto3" json:"singling_out_risk,omitempty"`
-	LinkabilityRisk float32 `protobuf:"fixed32,8,opt,name=linkability_risk,json=linkabilityRisk,proto3" json:"linkability_risk,omitempty"`
-	InferenceRisk   float32 `protobuf:"fixed32,9,opt,name=inference_risk,json=inferenceRisk,proto3" json:"inference_risk,omitempty"`
-	unknownFields   protoimpl.UnknownFields
-	sizeCache       protoimpl.SizeCache
+	SinglingOutRisk   float32        `protobuf:"fixed32,7,opt,name=singling_out_risk,json=singlingOutRisk,proto3" json:"singling_out_risk,omitempty"`
+	LinkabilityRisk   float32        `protobuf:"fixed32,8,opt,name=linkability_risk,json=linkabilityRisk,proto3" json:"linkability_risk,omitempty"`
+	InferenceRisk     float32        `protobuf:"fixed32,9,opt,name=inference_risk,json=inferenceRisk,proto3" json:"inference_risk,omitempty"`
+	JointUtilityScore float32        `protobuf:"fixed32,10,opt,name=joint_utility_score,json=jointUtilityScore,proto3" json:"joint_utility_score,omitempty"` // 1 - média da JSD de todos os pares de colunas (2-way)
+	Stages            []*StageMetric `protobuf:"bytes,11,rep,name=stages,proto3" json:"stages,omitempty"`                                                    // Custo de cada etapa do pipeline e de cada ataque
+	// Distância de cada sintético ao real mais próximo (Hamming / nº de colunas)
+	DcrExactMatchRate float32 `protobuf:"fixed32,12,opt,name=dcr_exact_match_rate,json=dcrExactMatchRate,proto3" json:"dcr_exact_match_rate,omitempty"` // Fração de sintéticos idênticos a um registro real
+	DcrMedian         float32 `protobuf:"fixed32,13,opt,name=dcr_median,json=dcrMedian,proto3" json:"dcr_median,omitempty"`
+	DcrP05            float32 `protobuf:"fixed32,14,opt,name=dcr_p05,json=dcrP05,proto3" json:"dcr_p05,omitempty"`
+	NndrMedian        float32 `protobuf:"fixed32,15,opt,name=nndr_median,json=nndrMedian,proto3" json:"nndr_median,omitempty"` // Mediana de d(1º vizinho) / d(2º vizinho)
+	// Modo target_risk: epsilon_used é o epsilon escolhido pela busca
+	EpsilonProbes int32 `protobuf:"varint,16,opt,name=epsilon_probes,json=epsilonProbes,proto3" json:"epsilon_probes,omitempty"` // Sondagens (treino + auditoria barata) feitas pela busca
+	TargetMet     bool  `protobuf:"varint,17,opt,name=target_met,json=targetMet,proto3" json:"target_met,omitempty"`             // Pior risco da auditoria completa abaixo do alvo
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
 }
 
 func (x *AnonymizeResponse) Reset() {
@@ -198,18 +226,695 @@ func (x *AnonymizeResponse) GetInferenceRisk() float32 {
 	return 0
 }
 
+func (x *AnonymizeResponse) GetJointUtilityScore() float32 {
+	if x != nil {
+		return x.JointUtilityScore
+	}
+	return 0
+}
+
+func (x *AnonymizeResponse) GetStages() []*StageMetric {
+	if x != nil {
+		return x.Stages
+	}
+	return nil
+}
+
+func (x *AnonymizeResponse) GetDcrExactMatchRate() float32 {
+	if x != nil {
+		return x.DcrExactMatchRate
+	}
+	return 0
+}
+
+func (x *AnonymizeResponse) GetDcrMedian() float32 {
+	if x != nil {
+		return x.DcrMedian
+	}
+	return 0
+}
+
+func (x *AnonymizeResponse) GetDcrP05() float32 {
+	if x != nil {
+		return x.DcrP05
+	}
+	return 0
+}
+
+func (x *AnonymizeResponse) GetNndrMedian() float32 {
+	if x != nil {
+		return x.NndrMedian
+	}
+	return 0
+}
+
+func (x *AnonymizeResponse) GetEpsilonProbes() int32 {
+	if x != nil {
+		return x.EpsilonProbes
+	}
+	return 0
+}
+
+func (x *AnonymizeResponse) GetTargetMet() bool {
+	if x != nil {
+		return x.TargetMet
+	}
+	return false
+}
+
+type StageMetric struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Name          string                 `protobuf:"bytes,1,opt,name=name,proto3" json:"name,omitempty"` // load, wrangle, pii, stats, cardinality, search, fit, generate, utility, distance, save, audit_*
+	WallSec       float64                `protobuf:"fixed64,2,opt,name=wall_sec,json=wallSec,proto3" json:"wall_sec,omitempty"`
+	CpuSec        float64                `protobuf:"fixed64,3,opt,name=cpu_sec,json=cpuSec,proto3" json:"cpu_sec,omitempty"`            // CPU do processo (todas as threads) durante a etapa
+	PeakRssMb     float64                `protobuf:"fixed64,4,opt,name=peak_rss_mb,json=peakRssMb,proto3" json:"peak_rss_mb,omitempty"` // Pico de RSS do processo durante a etapa
+	RowsIn        int64                  `protobuf:"varint,5,opt,name=rows_in,json=rowsIn,proto3" json:"rows_in,omitempty"`
+	RowsOut       int64                  `protobuf:"varint,6,opt,name=rows_out,json=rowsOut,proto3" json:"rows_out,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *StageMetric) Reset() {
+	*x = StageMetric{}
+	mi := &file_privacy_proto_msgTypes[2]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *StageMetric) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*StageMetric) ProtoMessage() {}
+
+func (x *StageMetric) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[2]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use StageMetric.ProtoReflect.Descriptor instead.
+func (*StageMetric) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{2}
+}
+
+func (x *StageMetric) GetName() string {
+	if x != nil {
+		return x.Name
+	}
+	return ""
+}
+
+func (x *StageMetric) GetWallSec() float64 {
+	if x != nil {
+		return x.WallSec
+	}
+	return 0
+}
+
+func (x *StageMetric) GetCpuSec() float64 {
+	if x != nil {
+		return x.CpuSec
+	}
+	return 0
+}
+
+func (x *StageMetric) GetPeakRssMb() float64 {
+	if x != nil {
+		return x.PeakRssMb
+	}
+	return 0
+}
+
+func (x *StageMetric) GetRowsIn() int64 {
+	if x != nil {
+		return x.RowsIn
+	}
+	return 0
+}
+
+func (x *StageMetric) GetRowsOut() int64 {
+	if x != nil {
+		return x.RowsOut
+	}
+	return 0
+}
+
+type JobRequest struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	JobId         string                 `protobuf:"bytes,1,opt,name=job_id,json=jobId,proto3" json:"job_id,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *JobRequest) Reset() {
+	*x = JobRequest{}
+	mi := &file_privacy_proto_msgTypes[3]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *JobRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*JobRequest) ProtoMessage() {}
+
+func (x *JobRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[3]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use JobRequest.ProtoReflect.Descriptor instead.
+func (*JobRequest) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{3}
+}
+
+func (x *JobRequest) GetJobId() string {
+	if x != nil {
+		return x.JobId
+	}
+	return ""
+}
+
+type JobHandle struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	JobId         string                 `protobuf:"bytes,1,opt,name=job_id,json=jobId,proto3" json:"job_id,omitempty"`
+	State         string                 `protobuf:"bytes,2,opt,name=state,proto3" json:"state,omitempty"`                                       // QUEUED, RUNNING, DONE, FAILED, CANCELLED
+	QueuePosition int32                  `protobuf:"varint,3,opt,name=queue_position,json=queuePosition,proto3" json:"queue_position,omitempty"` // 0 quando o job já saiu da fila
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *JobHandle) Reset() {
+	*x = JobHandle{}
+	mi := &file_privacy_proto_msgTypes[4]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *JobHandle) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*JobHandle) ProtoMessage() {}
+
+func (x *JobHandle) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[4]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use JobHandle.ProtoReflect.Descriptor instead.
+func (*JobHandle) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{4}
+}
+
+func (x *JobHandle) GetJobId() string {
+	if x != nil {
+		return x.JobId
+	}
+	return ""
+}
+
+func (x *JobHandle) GetState() string {
+	if x != nil {
+		return x.State
+	}
+	return ""
+}
+
+func (x *JobHandle) GetQueuePosition() int32 {
+	if x != nil {
+		return x.QueuePosition
+	}
+	return 0
+}
+
+// Um evento por etapa concluída do pipeline (load, wrangle, fit, generate, ...)
+type JobProgress struct {
+	state          protoimpl.MessageState `protogen:"open.v1"`
+	JobId          string                 `protobuf:"bytes,1,opt,name=job_id,json=jobId,proto3" json:"job_id,omitempty"`
+	State          string                 `protobuf:"bytes,2,opt,name=state,proto3" json:"state,omitempty"`
+	Stage          string                 `protobuf:"bytes,3,opt,name=stage,proto3" json:"stage,omitempty"`
+	Progress       float32                `protobuf:"fixed32,4,opt,name=progress,proto3" json:"progress,omitempty"`                                   // 0.0 a 1.0
+	StageSeconds   float32                `protobuf:"fixed32,5,opt,name=stage_seconds,json=stageSeconds,proto3" json:"stage_seconds,omitempty"`       // Duração da etapa que acabou de terminar
+	ElapsedSeconds float32                `protobuf:"fixed32,6,opt,name=elapsed_seconds,json=elapsedSeconds,proto3" json:"elapsed_seconds,omitempty"` // Tempo desde o início da execução do job
+	Message        string                 `protobuf:"bytes,7,opt,name=message,proto3" json:"message,omitempty"`
+	unknownFields  protoimpl.UnknownFields
+	sizeCache      protoimpl.SizeCache
+}
+
+func (x *JobProgress) Reset() {
+	*x = JobProgress{}
+	mi := &file_privacy_proto_msgTypes[5]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *JobProgress) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*JobProgress) ProtoMessage() {}
+
+func (x *JobProgress) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[5]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use JobProgress.ProtoReflect.Descriptor instead.
+func (*JobProgress) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{5}
+}
+
+func (x *JobProgress) GetJobId() string {
+	if x != nil {
+		return x.JobId
+	}
+	return ""
+}
+
+func (x *JobProgress) GetState() string {
+	if x != nil {
+		return x.State
+	}
+	return ""
+}
+
+func (x *JobProgress) GetStage() string {
+	if x != nil {
+		return x.Stage
+	}
+	return ""
+}
+
+func (x *JobProgress) GetProgress() float32 {
+	if x != nil {
+		return x.Progress
+	}
+	return 0
+}
+
+func (x *JobProgress) GetStageSeconds() float32 {
+	if x != nil {
+		return x.StageSeconds
+	}
+	return 0
+}
+
+func (x *JobProgress) GetElapsedSeconds() float32 {
+	if x != nil {
+		return x.ElapsedSeconds
+	}
+	return 0
+}
+
+func (x *JobProgress) GetMessage() string {
+	if x != nil {
+		return x.Message
+	}
+	return ""
+}
+
+type JobResult struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	JobId         string                 `protobuf:"bytes,1,opt,name=job_id,json=jobId,proto3" json:"job_id,omitempty"`
+	State         string                 `protobuf:"bytes,2,opt,name=state,proto3" json:"state,omitempty"`
+	Response      *AnonymizeResponse     `protobuf:"bytes,3,opt,name=response,proto3" json:"response,omitempty"` // Preenchido apenas quando state == DONE
+	Error         string                 `protobuf:"bytes,4,opt,name=error,proto3" json:"error,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *JobResult) Reset() {
+	*x = JobResult{}
+	mi := &file_privacy_proto_msgTypes[6]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *JobResult) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*JobResult) ProtoMessage() {}
+
+func (x *JobResult) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[6]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use JobResult.ProtoReflect.Descriptor instead.
+func (*JobResult) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{6}
+}
+
+func (x *JobResult) GetJobId() string {
+	if x != nil {
+		return x.JobId
+	}
+	return ""
+}
+
+func (x *JobResult) GetState() string {
+	if x != nil {
+		return x.State
+	}
+	return ""
+}
+
+func (x *JobResult) GetResponse() *AnonymizeResponse {
+	if x != nil {
+		return x.Response
+	}
+	return nil
+}
+
+func (x *JobResult) GetError() string {
+	if x != nil {
+		return x.Error
+	}
+	return ""
+}
+
+type DataChunk struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Filename      string                 `protobuf:"bytes,1,opt,name=filename,proto3" json:"filename,omitempty"` // Só no primeiro fragmento do upload
+	Format        string                 `protobuf:"bytes,2,opt,name=format,proto3" json:"format,omitempty"`     // "arrow" (stream IPC), "parquet" ou "csv"; vazio = pela extensão
+	Data          []byte                 `protobuf:"bytes,3,opt,name=data,proto3" json:"data,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *DataChunk) Reset() {
+	*x = DataChunk{}
+	mi := &file_privacy_proto_msgTypes[7]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *DataChunk) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*DataChunk) ProtoMessage() {}
+
+func (x *DataChunk) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[7]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use DataChunk.ProtoReflect.Descriptor instead.
+func (*DataChunk) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{7}
+}
+
+func (x *DataChunk) GetFilename() string {
+	if x != nil {
+		return x.Filename
+	}
+	return ""
+}
+
+func (x *DataChunk) GetFormat() string {
+	if x != nil {
+		return x.Format
+	}
+	return ""
+}
+
+func (x *DataChunk) GetData() []byte {
+	if x != nil {
+		return x.Data
+	}
+	return nil
+}
+
+type DatasetHandle struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	DatasetId     string                 `protobuf:"bytes,1,opt,name=dataset_id,json=datasetId,proto3" json:"dataset_id,omitempty"`
+	InputPath     string                 `protobuf:"bytes,2,opt,name=input_path,json=inputPath,proto3" json:"input_path,omitempty"` // dataset://<id>/<arquivo>, usado direto no AnonymizeRequest
+	Rows          int64                  `protobuf:"varint,3,opt,name=rows,proto3" json:"rows,omitempty"`
+	SizeBytes     int64                  `protobuf:"varint,4,opt,name=size_bytes,json=sizeBytes,proto3" json:"size_bytes,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *DatasetHandle) Reset() {
+	*x = DatasetHandle{}
+	mi := &file_privacy_proto_msgTypes[8]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *DatasetHandle) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*DatasetHandle) ProtoMessage() {}
+
+func (x *DatasetHandle) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[8]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use DatasetHandle.ProtoReflect.Descriptor instead.
+func (*DatasetHandle) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{8}
+}
+
+func (x *DatasetHandle) GetDatasetId() string {
+	if x != nil {
+		return x.DatasetId
+	}
+	return ""
+}
+
+func (x *DatasetHandle) GetInputPath() string {
+	if x != nil {
+		return x.InputPath
+	}
+	return ""
+}
+
+func (x *DatasetHandle) GetRows() int64 {
+	if x != nil {
+		return x.Rows
+	}
+	return 0
+}
+
+func (x *DatasetHandle) GetSizeBytes() int64 {
+	if x != nil {
+		return x.SizeBytes
+	}
+	return 0
+}
+
+type DownloadRequest struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	OutputPath    string                 `protobuf:"bytes,1,opt,name=output_path,json=outputPath,proto3" json:"output_path,omitempty"` // Como devolvido em AnonymizeResponse.output_path
+	Format        string                 `protobuf:"bytes,2,opt,name=format,proto3" json:"format,omitempty"`                           // "arrow" (padrão) ou "parquet"
+	BatchRows     int32                  `protobuf:"varint,3,opt,name=batch_rows,json=batchRows,proto3" json:"batch_rows,omitempty"`   // Linhas por record batch no modo arrow (0 = padrão)
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *DownloadRequest) Reset() {
+	*x = DownloadRequest{}
+	mi := &file_privacy_proto_msgTypes[9]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *DownloadRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*DownloadRequest) ProtoMessage() {}
+
+func (x *DownloadRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[9]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use DownloadRequest.ProtoReflect.Descriptor instead.
+func (*DownloadRequest) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{9}
+}
+
+func (x *DownloadRequest) GetOutputPath() string {
+	if x != nil {
+		return x.OutputPath
+	}
+	return ""
+}
+
+func (x *DownloadRequest) GetFormat() string {
+	if x != nil {
+		return x.Format
+	}
+	return ""
+}
+
+func (x *DownloadRequest) GetBatchRows() int32 {
+	if x != nil {
+		return x.BatchRows
+	}
+	return 0
+}
+
+type MetricsRequest struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *MetricsRequest) Reset() {
+	*x = MetricsRequest{}
+	mi := &file_privacy_proto_msgTypes[10]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *MetricsRequest) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*MetricsRequest) ProtoMessage() {}
+
+func (x *MetricsRequest) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[10]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use MetricsRequest.ProtoReflect.Descriptor instead.
+func (*MetricsRequest) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{10}
+}
+
+type MetricsText struct {
+	state         protoimpl.MessageState `protogen:"open.v1"`
+	Text          string                 `protobuf:"bytes,1,opt,name=text,proto3" json:"text,omitempty"`
+	unknownFields protoimpl.UnknownFields
+	sizeCache     protoimpl.SizeCache
+}
+
+func (x *MetricsText) Reset() {
+	*x = MetricsText{}
+	mi := &file_privacy_proto_msgTypes[11]
+	ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+	ms.StoreMessageInfo(mi)
+}
+
+func (x *MetricsText) String() string {
+	return protoimpl.X.MessageStringOf(x)
+}
+
+func (*MetricsText) ProtoMessage() {}
+
+func (x *MetricsText) ProtoReflect() protoreflect.Message {
+	mi := &file_privacy_proto_msgTypes[11]
+	if x != nil {
+		ms := protoimpl.X.MessageStateOf(protoimpl.Pointer(x))
+		if ms.LoadMessageInfo() == nil {
+			ms.StoreMessageInfo(mi)
+		}
+		return ms
+	}
+	return mi.MessageOf(x)
+}
+
+// Deprecated: Use MetricsText.ProtoReflect.Descriptor instead.
+func (*MetricsText) Descriptor() ([]byte, []int) {
+	return file_privacy_proto_rawDescGZIP(), []int{11}
+}
+
+func (x *MetricsText) GetText() string {
+	if x != nil {
+		return x.Text
+	}
+	return ""
+}
+
 var File_privacy_proto protoreflect.FileDescriptor
 
 const file_privacy_proto_rawDesc = "" +
 	"\n" +
-	"\rprivacy.proto\x12\aprivacy\"\x80\x01\n" +
+	"\rprivacy.proto\x12\aprivacy\"\xc2\x01\n" +
 	"\x10AnonymizeRequest\x12\x1d\n" +
 	"\n" +
 	"input_path\x18\x01 \x01(\tR\tinputPath\x12\x18\n" +
 	"\aepsilon\x18\x02 \x01(\x02R\aepsilon\x12\x14\n" +
 	"\x05delta\x18\x03 \x01(\x02R\x05delta\x12\x1d\n" +
 	"\n" +
-	"detect_pii\x18\x04 \x01(\bR\tdetectPii\"\xbf\x03\n" +
+	"detect_pii\x18\x04 \x01(\bR\tdetectPii\x12\x1f\n" +
+	"\voutput_rows\x18\x05 \x01(\x03R\n" +
+	"outputRows\x12\x1f\n" +
+	"\vtarget_risk\x18\x06 \x01(\x02R\n" +
+	"targetRisk\"\xed\x05\n" +
 	"\x11AnonymizeResponse\x12\x1f\n" +
 	"\voutput_path\x18\x01 \x01(\tR\n" +
 	"outputPath\x12#\n" +
@@ -221,12 +926,80 @@ const file_privacy_proto_rawDesc = "" +
 	"pii_report\x18\x06 \x03(\v2).privacy.AnonymizeResponse.PiiReportEntryR\tpiiReport\x12*\n" +
 	"\x11singling_out_risk\x18\a \x01(\x02R\x0fsinglingOutRisk\x12)\n" +
 	"\x10linkability_risk\x18\b \x01(\x02R\x0flinkabilityRisk\x12%\n" +
-	"\x0einference_risk\x18\t \x01(\x02R\rinferenceRisk\x1a<\n" +
+	"\x0einference_risk\x18\t \x01(\x02R\rinferenceRisk\x12.\n" +
+	"\x13joint_utility_score\x18\n" +
+	" \x01(\x02R\x11jointUtilityScore\x12,\n" +
+	"\x06stages\x18\v \x03(\v2\x14.privacy.StageMetricR\x06stages\x12/\n" +
+	"\x14dcr_exact_match_rate\x18\f \x01(\x02R\x11dcrExactMatchRate\x12\x1d\n" +
+	"\n" +
+	"dcr_median\x18\r \x01(\x02R\tdcrMedian\x12\x17\n" +
+	"\adcr_p05\x18\x0e \x01(\x02R\x06dcrP05\x12\x1f\n" +
+	"\vnndr_median\x18\x0f \x01(\x02R\n" +
+	"nndrMedian\x12%\n" +
+	"\x0eepsilon_probes\x18\x10 \x01(\x05R\repsilonProbes\x12\x1d\n" +
+	"\n" +
+	"target_met\x18\x11 \x01(\bR\ttargetMet\x1a<\n" +
 	"\x0ePiiReportEntry\x12\x10\n" +
 	"\x03key\x18\x01 \x01(\tR\x03key\x12\x14\n" +
-	"\x05value\x18\x02 \x01(\tR\x05value:\x028\x012[\n" +
+	"\x05value\x18\x02 \x01(\tR\x05value:\x028\x01\"\xa9\x01\n" +
+	"\vStageMetric\x12\x12\n" +
+	"\x04name\x18\x01 \x01(\tR\x04name\x12\x19\n" +
+	"\bwall_sec\x18\x02 \x01(\x01R\awallSec\x12\x17\n" +
+	"\acpu_sec\x18\x03 \x01(\x01R\x06cpuSec\x12\x1e\n" +
+	"\vpeak_rss_mb\x18\x04 \x01(\x01R\tpeakRssMb\x12\x17\n" +
+	"\arows_in\x18\x05 \x01(\x03R\x06rowsIn\x12\x19\n" +
+	"\brows_out\x18\x06 \x01(\x03R\arowsOut\"#\n" +
+	"\n" +
+	"JobRequest\x12\x15\n" +
+	"\x06job_id\x18\x01 \x01(\tR\x05jobId\"_\n" +
+	"\tJobHandle\x12\x15\n" +
+	"\x06job_id\x18\x01 \x01(\tR\x05jobId\x12\x14\n" +
+	"\x05state\x18\x02 \x01(\tR\x05state\x12%\n" +
+	"\x0equeue_position\x18\x03 \x01(\x05R\rqueuePosition\"\xd4\x01\n" +
+	"\vJobProgress\x12\x15\n" +
+	"\x06job_id\x18\x01 \x01(\tR\x05jobId\x12\x14\n" +
+	"\x05state\x18\x02 \x01(\tR\x05state\x12\x14\n" +
+	"\x05stage\x18\x03 \x01(\tR\x05stage\x12\x1a\n" +
+	"\bprogress\x18\x04 \x01(\x02R\bprogress\x12#\n" +
+	"\rstage_seconds\x18\x05 \x01(\x02R\fstageSeconds\x12'\n" +
+	"\x0felapsed_seconds\x18\x06 \x01(\x02R\x0eelapsedSeconds\x12\x18\n" +
+	"\amessage\x18\a \x01(\tR\amessage\"\x86\x01\n" +
+	"\tJobResult\x12\x15\n" +
+	"\x06job_id\x18\x01 \x01(\tR\x05jobId\x12\x14\n" +
+	"\x05state\x18\x02 \x01(\tR\x05state\x126\n" +
+	"\bresponse\x18\x03 \x01(\v2\x1a.privacy.AnonymizeResponseR\bresponse\x12\x14\n" +
+	"\x05error\x18\x04 \x01(\tR\x05error\"S\n" +
+	"\tDataChunk\x12\x1a\n" +
+	"\bfilename\x18\x01 \x01(\tR\bfilename\x12\x16\n" +
+	"\x06format\x18\x02 \x01(\tR\x06format\x12\x12\n" +
+	"\x04data\x18\x03 \x01(\fR\x04data\"\x80\x01\n" +
+	"\rDatasetHandle\x12\x1d\n" +
+	"\n" +
+	"dataset_id\x18\x01 \x01(\tR\tdatasetId\x12\x1d\n" +
+	"\n" +
+	"input_path\x18\x02 \x01(\tR\tinputPath\x12\x12\n" +
+	"\x04rows\x18\x03 \x01(\x03R\x04rows\x12\x1d\n" +
+	"\n" +
+	"size_bytes\x18\x04 \x01(\x03R\tsizeBytes\"i\n" +
+	"\x0fDownloadRequest\x12\x1f\n" +
+	"\voutput_path\x18\x01 \x01(\tR\n" +
+	"outputPath\x12\x16\n" +
+	"\x06format\x18\x02 \x01(\tR\x06format\x12\x1d\n" +
+	"\n" +
+	"batch_rows\x18\x03 \x01(\x05R\tbatchRows\"\x10\n" +
+	"\x0eMetricsRequest\"!\n" +
+	"\vMetricsText\x12\x12\n" +
+	"\x04text\x18\x01 \x01(\tR\x04text2\x8b\x04\n" +
 	"\x0ePrivacyService\x12I\n" +
-	"\x0eProcessDataset\x12\x19.privacy.AnonymizeRequest\x1a\x1a.privacy.AnonymizeResponse\"\x00B\x0fZ\rbackend-go/pbb\x06proto3"
+	"\x0eProcessDataset\x12\x19.privacy.AnonymizeRequest\x1a\x1a.privacy.AnonymizeResponse\"\x00\x12<\n" +
+	"\tSubmitJob\x12\x19.privacy.AnonymizeRequest\x1a\x12.privacy.JobHandle\"\x00\x129\n" +
+	"\bWatchJob\x12\x13.privacy.JobRequest\x1a\x14.privacy.JobProgress\"\x000\x01\x129\n" +
+	"\fGetJobResult\x12\x13.privacy.JobRequest\x1a\x12.privacy.JobResult\"\x00\x126\n" +
+	"\tCancelJob\x12\x13.privacy.JobRequest\x1a\x12.privacy.JobHandle\"\x00\x12?\n" +
+	"\rUploadDataset\x12\x12.privacy.DataChunk\x1a\x16.privacy.DatasetHandle\"\x00(\x01\x12B\n" +
+	"\x0eDownloadResult\x12\x18.privacy.DownloadRequest\x1a\x12.privacy.DataChunk\"\x000\x01\x12=\n" +
+	"\n" +
+	"GetMetrics\x12\x17.privacy.MetricsRequest\x1a\x14.privacy.MetricsText\"\x00B\x0fZ\rbackend-go/pbb\x06proto3"
 
 var (
 	file_privacy_proto_rawDescOnce sync.Once
@@ -240,21 +1013,47 @@ func file_privacy_proto_rawDescGZIP() []byte {
 	return file_privacy_proto_rawDescData
 }
 
-var file_privacy_proto_msgTypes = make([]protoimpl.MessageInfo, 3)
+var file_privacy_proto_msgTypes = make([]protoimpl.MessageInfo, 13)
 var file_privacy_proto_goTypes = []any{
 	(*AnonymizeRequest)(nil),  // 0: privacy.AnonymizeRequest
 	(*AnonymizeResponse)(nil), // 1: privacy.AnonymizeResponse
-	nil,                       // 2: privacy.AnonymizeResponse.PiiReportEntry
+	(*StageMetric)(nil),       // 2: privacy.StageMetric
+	(*JobRequest)(nil),        // 3: privacy.JobRequest
+	(*JobHandle)(nil),         // 4: privacy.JobHandle
+	(*JobProgress)(nil),       // 5: privacy.JobProgress
+	(*JobResult)(nil),         // 6: privacy.JobResult
+	(*DataChunk)(nil),         // 7: privacy.DataChunk
+	(*DatasetHandle)(nil),     // 8: privacy.DatasetHandle
+	(*DownloadRequest)(nil),   // 9: privacy.DownloadRequest
+	(*MetricsRequest)(nil),    // 10: privacy.MetricsRequest
+	(*MetricsText)(nil),       // 11: privacy.MetricsText
+	nil,                       // 12: privacy.AnonymizeResponse.PiiReportEntry
 }
 var file_privacy_proto_depIdxs = []int32{
-	2, // 0: privacy.AnonymizeResponse.pii_report:type_name -> privacy.AnonymizeResponse.PiiReportEntry
-	0, // 1: privacy.PrivacyService.ProcessDataset:input_type -> privacy.AnonymizeRequest
-	1, // 2: privacy.PrivacyService.ProcessDataset:output_type -> privacy.AnonymizeResponse
-	2, // [2:3] is the sub-list for method output_type
-	1, // [1:2] is the sub-list for method input_type
-	1, // [1:1] is the sub-list for extension type_name
-	1, // [1:1] is the sub-list for extension extendee
-	0, // [0:1] is the sub-list for field type_name
+	12, // 0: privacy.AnonymizeResponse.pii_report:type_name -> privacy.AnonymizeResponse.PiiReportEntry
+	2,  // 1: privacy.AnonymizeResponse.stages:type_name -> privacy.StageMetric
+	1,  // 2: privacy.JobResult.response:type_name -> privacy.AnonymizeResponse
+	0,  // 3: privacy.PrivacyService.ProcessDataset:input_type -> privacy.AnonymizeRequest
+	0,  // 4: privacy.PrivacyService.SubmitJob:input_type -> privacy.AnonymizeRequest
+	3,  // 5: privacy.PrivacyService.WatchJob:input_type -> privacy.JobRequest
+	3,  // 6: privacy.PrivacyService.GetJobResult:input_type -> privacy.JobRequest
+	3,  // 7: privacy.PrivacyService.CancelJob:input_type -> privacy.JobRequest
+	7,  // 8: privacy.PrivacyService.UploadDataset:input_type -> privacy.DataChunk
+	9,  // 9: privacy.PrivacyService.DownloadResult:input_type -> privacy.DownloadRequest
+	10, // 10: privacy.PrivacyService.GetMetrics:input_type -> privacy.MetricsRequest
+	1,  // 11: privacy.PrivacyService.ProcessDataset:output_type -> privacy.AnonymizeResponse
+	4,  // 12: privacy.PrivacyService.SubmitJob:output_type -> privacy.JobHandle
+	5,  // 13: privacy.PrivacyService.WatchJob:output_type -> privacy.JobProgress
+	6,  // 14: privacy.PrivacyService.GetJobResult:output_type -> privacy.JobResult
+	4,  // 15: privacy.PrivacyService.CancelJob:output_type -> privacy.JobHandle
+	8,  // 16: privacy.PrivacyService.UploadDataset:output_type -> privacy.DatasetHandle
+	7,  // 17: privacy.PrivacyService.DownloadResult:output_type -> privacy.DataChunk
+	11, // 18: privacy.PrivacyService.GetMetrics:output_type -> privacy.MetricsText
+	11, // [11:19] is the sub-list for method output_type
+	3,  // [3:11] is the sub-list for method input_type
+	3,  // [3:3] is the sub-list for extension type_name
+	3,  // [3:3] is the sub-list for extension extendee
+	0,  // [0:3] is the sub-list for field type_name
 }
 
 func init() { file_privacy_proto_init() }
@@ -268,7 +1067,7 @@ func file_privacy_proto_init() {
 			GoPackagePath: reflect.TypeOf(x{}).PkgPath(),
 			RawDescriptor: unsafe.Slice(unsafe.StringData(file_privacy_proto_rawDesc), len(file_privacy_proto_rawDesc)),
 			NumEnums:      0,
-			NumMessages:   3,
+			NumMessages:   13,
 			NumExtensions: 0,
 			NumServices:   1,
 		},
@@ -20,6 +20,13 @@ const _ = grpc.SupportPackageIsVersion9
 
 const (
 	PrivacyService_ProcessDataset_FullMethodName = "/privacy.PrivacyService/ProcessDataset"
+	PrivacyService_SubmitJob_FullMethodName      = "/privacy.PrivacyService/SubmitJob"
+	PrivacyService_WatchJob_FullMethodName       = "/privacy.PrivacyService/WatchJob"
+	PrivacyService_GetJobResult_FullMethodName   = "/privacy.PrivacyService/GetJobResult"
+	PrivacyService_CancelJob_FullMethodName      = "/privacy.PrivacyService/CancelJob"
+	PrivacyService_UploadDataset_FullMethodName  = "/privacy.PrivacyService/UploadDataset"
+	PrivacyService_DownloadResult_FullMethodName = "/privacy.PrivacyService/DownloadResult"
+	PrivacyService_GetMetrics_FullMethodName     = "/privacy.PrivacyService/GetMetrics"
 )
 
 // PrivacyServiceClient is the client API for PrivacyService service.
@@ -27,6 +34,13 @@ const (
 // For semantics around ctx use and closing/ending streaming RPCs, please refer to https://pkg.go.dev/google.golang.org/grpc/?tab=doc#ClientConn.NewStream.
 type PrivacyServiceClient interface {
 	ProcessDataset(ctx context.Context, in *AnonymizeRequest, opts ...grpc.CallOption) (*AnonymizeResponse, error)
+	SubmitJob(ctx context.Context, in *AnonymizeRequest, opts ...grpc.CallOption) (*JobHandle, error)
+	WatchJob(ctx context.Context, in *JobRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[JobProgress], error)
+	GetJobResult(ctx context.Context, in *JobRequest, opts ...grpc.CallOption) (*JobResult, error)
+	CancelJob(ctx context.Context, in *JobRequest, opts ...grpc.CallOption) (*JobHandle, error)
+	UploadDataset(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[DataChunk, DatasetHandle], error)
+	DownloadResult(ctx context.Context, in *DownloadRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[DataChunk], error)
+	GetMetrics(ctx context.Context, in *MetricsRequest, opts ...grpc.CallOption) (*MetricsText, error)
 }
 
 type privacyServiceClient struct {
@@ -47,11 +61,109 @@ func (c *privacyServiceClient) ProcessDataset(ctx context.Context, in *Anonymize
 	return out, nil
 }
 
+func (c *privacyServiceClient) SubmitJob(ctx context.Context, in *AnonymizeRequest, opts ...grpc.CallOption) (*JobHandle, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(JobHandle)
+	err := c.cc.Invoke(ctx, PrivacyService_SubmitJob_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *privacyServiceClient) WatchJob(ctx context.Context, in *JobRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[JobProgress], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &PrivacyService_ServiceDesc.Streams[0], PrivacyService_WatchJob_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[JobRequest, JobProgress]{ClientStream: stream}
+	if err := x.ClientStream.SendMsg(in); err != nil {
+		return nil, err
+	}
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type PrivacyService_WatchJobClient = grpc.ServerStreamingClient[JobProgress]
+
+func (c *privacyServiceClient) GetJobResult(ctx context.Context, in *JobRequest, opts ...grpc.CallOption) (*JobResult, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(JobResult)
+	err := c.cc.Invoke(ctx, PrivacyService_GetJobResult_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *privacyServiceClient) CancelJob(ctx context.Context, in *JobRequest, opts ...grpc.CallOption) (*JobHandle, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(JobHandle)
+	err := c.cc.Invoke(ctx, PrivacyService_CancelJob_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
+func (c *privacyServiceClient) UploadDataset(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[DataChunk, DatasetHandle], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &PrivacyService_ServiceDesc.Streams[1], PrivacyService_UploadDataset_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[DataChunk, DatasetHandle]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type PrivacyService_UploadDatasetClient = grpc.ClientStreamingClient[DataChunk, DatasetHandle]
+
+func (c *privacyServiceClient) DownloadResult(ctx context.Context, in *DownloadRequest, opts ...grpc.CallOption) (grpc.ServerStreamingClient[DataChunk], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &PrivacyService_ServiceDesc.Streams[2], PrivacyService_DownloadResult_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[DownloadRequest, DataChunk]{ClientStream: stream}
+	if err := x.ClientStream.SendMsg(in); err != nil {
+		return nil, err
+	}
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type PrivacyService_DownloadResultClient = grpc.ServerStreamingClient[DataChunk]
+
+func (c *privacyServiceClient) GetMetrics(ctx context.Context, in *MetricsRequest, opts ...grpc.CallOption) (*MetricsText, error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	out := new(MetricsText)
+	err := c.cc.Invoke(ctx, PrivacyService_GetMetrics_FullMethodName, in, out, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 // PrivacyServiceServer is the server API for PrivacyService service.
 // All implementations must embed UnimplementedPrivacyServiceServer
 // for forward compatibility.
 type PrivacyServiceServer interface {
 	ProcessDataset(context.Context, *AnonymizeRequest) (*AnonymizeResponse, error)
+	SubmitJob(context.Context, *AnonymizeRequest) (*JobHandle, error)
+	WatchJob(*JobRequest, grpc.ServerStreamingServer[JobProgress]) error
+	GetJobResult(context.Context, *JobRequest) (*JobResult, error)
+	CancelJob(context.Context, *JobRequest) (*JobHandle, error)
+	UploadDataset(grpc.ClientStreamingServer[DataChunk, DatasetHandle]) error
+	DownloadResult(*DownloadRequest, grpc.ServerStreamingServer[DataChunk]) error
+	GetMetrics(context.Context, *MetricsRequest) (*MetricsText, error)
 	mustEmbedUnimplementedPrivacyServiceServer()
 }
 
@@ -65,6 +177,27 @@ type UnimplementedPrivacyServiceServer struct{}
 func (UnimplementedPrivacyServiceServer) ProcessDataset(context.Context, *AnonymizeRequest) (*AnonymizeResponse, error) {
 	return nil, status.Error(codes.Unimplemented, "method ProcessDataset not implemented")
 }
+func (UnimplementedPrivacyServiceServer) SubmitJob(context.Context, *AnonymizeRequest) (*JobHandle, error) {
+	return nil, status.Error(codes.Unimplemented, "method SubmitJob not implemented")
+}
+func (UnimplementedPrivacyServiceServer) WatchJob(*JobRequest, grpc.ServerStreamingServer[JobProgress]) error {
+	return status.Error(codes.Unimplemented, "method WatchJob not implemented")
+}
+func (UnimplementedPrivacyServiceServer) GetJobResult(context.Context, *JobRequest) (*JobResult, error) {
+	return nil, status.Error(codes.Unimplemented, "method GetJobResult not implemented")
+}
+func (UnimplementedPrivacyServiceServer) CancelJob(context.Context, *JobRequest) (*JobHandle, error) {
+	return nil, status.Error(codes.Unimplemented, "method CancelJob not implemented")
+}
+func (UnimplementedPrivacyServiceServer) UploadDataset(grpc.ClientStreamingServer[DataChunk, DatasetHandle]) error {
+	return status.Error(codes.Unimplemented, "method UploadDataset not implemented")
+}
+func (UnimplementedPrivacyServiceServer) DownloadResult(*DownloadRequest, grpc.ServerStreamingServer[DataChunk]) error {
+	return status.Error(codes.Unimplemented, "method DownloadResult not implemented")
+}
+func (UnimplementedPrivacyServiceServer) GetMetrics(context.Context, *MetricsRequest) (*MetricsText, error) {
+	return nil, status.Error(codes.Unimplemented, "method GetMetrics not implemented")
+}
 func (UnimplementedPrivacyServiceServer) mustEmbedUnimplementedPrivacyServiceServer() {}
 func (UnimplementedPrivacyServiceServer) testEmbeddedByValue()                        {}
 
@@ -104,6 +237,107 @@ func _PrivacyService_ProcessDataset_Handler(srv interface{}, ctx context.Context
 	return interceptor(ctx, in, info, handler)
 }
 
+func _PrivacyService_SubmitJob_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(AnonymizeRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PrivacyServiceServer).SubmitJob(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: PrivacyService_SubmitJob_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PrivacyServiceServer).SubmitJob(ctx, req.(*AnonymizeRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _PrivacyService_WatchJob_Handler(srv interface{}, stream grpc.ServerStream) error {
+	m := new(JobRequest)
+	if err := stream.RecvMsg(m); err != nil {
+		return err
+	}
+	return srv.(PrivacyServiceServer).WatchJob(m, &grpc.GenericServerStream[JobRequest, JobProgress]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type PrivacyService_WatchJobServer = grpc.ServerStreamingServer[JobProgress]
+
+func _PrivacyService_GetJobResult_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(JobRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PrivacyServiceServer).GetJobResult(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: PrivacyService_GetJobResult_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PrivacyServiceServer).GetJobResult(ctx, req.(*JobRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _PrivacyService_CancelJob_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(JobRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PrivacyServiceServer).CancelJob(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: PrivacyService_CancelJob_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PrivacyServiceServer).CancelJob(ctx, req.(*JobRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
+func _PrivacyService_UploadDataset_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(PrivacyServiceServer).UploadDataset(&grpc.GenericServerStream[DataChunk, DatasetHandle]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type PrivacyService_UploadDatasetServer = grpc.ClientStreamingServer[DataChunk, DatasetHandle]
+
+func _PrivacyService_DownloadResult_Handler(srv interface{}, stream grpc.ServerStream) error {
+	m := new(DownloadRequest)
+	if err := stream.RecvMsg(m); err != nil {
+		return err
+	}
+	return srv.(PrivacyServiceServer).DownloadResult(m, &grpc.GenericServerStream[DownloadRequest, DataChunk]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type PrivacyService_DownloadResultServer = grpc.ServerStreamingServer[DataChunk]
+
+func _PrivacyService_GetMetrics_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(MetricsRequest)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PrivacyServiceServer).GetMetrics(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: PrivacyService_GetMetrics_FullMethodName,
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PrivacyServiceServer).GetMetrics(ctx, req.(*MetricsRequest))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 // PrivacyService_ServiceDesc is the grpc.ServiceDesc for PrivacyService service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -115,7 +349,39 @@ var PrivacyService_ServiceDesc = grpc.ServiceDesc{
 			MethodName: "ProcessDataset",
 			Handler:    _PrivacyService_ProcessDataset_Handler,
 		},
+		{
+			MethodName: "SubmitJob",
+			Handler:    _PrivacyService_SubmitJob_Handler,
+		},
+		{
+			MethodName: "GetJobResult",
+			Handler:    _PrivacyService_GetJobResult_Handler,
+		},
+		{
+			MethodName: "CancelJob",
+			Handler:    _PrivacyService_CancelJob_Handler,
+		},
+		{
+			MethodName: "GetMetrics",
+			Handler:    _PrivacyService_GetMetrics_Handler,
+		},
+	},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "WatchJob",
+			Handler:       _PrivacyService_WatchJob_Handler,
+			ServerStreams: true,
+		},
+		{
+			StreamName:    "UploadDataset",
+			Handler:       _PrivacyService_UploadDataset_Handler,
+			ClientStreams: true,
+		},
+		{
+			StreamName:    "DownloadResult",
+			Handler:       _PrivacyService_DownloadResult_Handler,
+			ServerStreams: true,
+		},
 	},
-	Streams:  []grpc.StreamDesc{},
 	Metadata: "privacy.proto",
 }
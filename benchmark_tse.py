@@ -9,7 +9,7 @@ worker_dir = os.path.join(root_dir, "ml-worker-python")
 if worker_dir not in sys.path:
     sys.path.insert(0, worker_dir)
 
-from pipeline.engine import PrivacyEngine
+from pipeline.engine import PrivacyEngine, WRANGLER_CACHE_DIR
 from pipeline.wrangling_tse import apply_wrangling
 from privacy_auditor import PrivacyAuditor
 from ml_utility_evaluator import MLUtilityEvaluator
@@ -52,7 +52,7 @@ def run_benchmark(input_path):
         print(f"\n[{scenario_name}] Processando...")
         
         # 1. WRANGLING
-        df_proc = apply_wrangling(df_working, strategy=strategy)
+        df_proc = apply_wrangling(df_working, strategy=strategy, cache_dir=WRANGLER_CACHE_DIR)
         
         # PONTE DE SEGURANÇA: Garante que o target do ML sobreviva ao wrangling
         if ML_TARGET not in df_proc.columns:
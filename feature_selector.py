@@ -1,42 +1,59 @@
 import pandas as pd
 import numpy as np
+import sys
+import os
 from sklearn.feature_selection import mutual_info_classif
-from sklearn.preprocessing import LabelEncoder
+
+# --- AJUSTE DE PATH ---
+root_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.join(root_dir, "ml-worker-python")
+if worker_dir not in sys.path:
+    sys.path.insert(0, worker_dir)
+
+from pipeline.encoded import EncodedFrame
 
 class DPFeatureSelector:
     def __init__(self, target_col='DS_SIT_TOT_TURNO'):
         self.target_col = target_col
 
-    def calculate_efficiency(self, df):
+    def calculate_efficiency(self, df, stats=None):
+        """
+        `stats` (SufficientStats de ml-worker-python/pipeline/stats_store.py) evita recontar
+        o df: MI e cardinalidade saem das tabelas de 2 e 1 vias já armazenadas.
+        """
         print(f"📊 Calculando Eficiência DP para as colunas...")
+
+        if stats is not None:
+            results = []
+            for col in [c for c in stats.columns if c != self.target_col]:
+                results.append(self._efficiency_row(col, stats.mutual_information(col, self.target_col),
+                                                    stats.nunique(col)))
+            return pd.DataFrame(results).sort_values(by='DP_Efficiency', ascending=False)
         
         # Preparação rápida (Encoding para o algoritmo de MI)
-        df_encoded = df.copy().astype(str)
-        le = LabelEncoder()
-        for col in df_encoded.columns:
-            df_encoded[col] = le.fit_transform(df_encoded[col])
+        df_encoded = EncodedFrame.from_frame(df).codes_frame()
             
         X = df_encoded.drop(columns=[self.target_col])
         y = df_encoded[self.target_col]
         
         # 1. Calcula a Informação Mútua Bruta (Sinal)
-        mi_scores = mutual_info_classif(X, y, discrete_features=True, random_index=42)
+        mi_scores = mutual_info_classif(X, y, discrete_features=True, random_state=42)
         
         results = []
         for i, col in enumerate(X.columns):
-            cardinality = df[col].nunique()
-            mi = mi_scores[i]
-            
-            # 2. O SCORE DE EFICIÊNCIA DP:
-            # Penaliza a cardinalidade de forma logarítmica (bits de informação)
-            # Isso evita que colunas com 5000 municípios dominem o modelo
-            efficiency = mi / np.log2(cardinality) if cardinality > 1 else 0
+            results.append(self._efficiency_row(col, mi_scores[i], df[col].nunique()))
             
-            results.append({
-                'Feature': col,
-                'MI_Raw': round(mi, 4),
-                'Cardinality': cardinality,
-                'DP_Efficiency': round(efficiency, 4)
-            })
-            
-        return pd.DataFrame(results).sort_values(by='DP_Efficiency', ascending=False)
\ No newline at end of file
+        return pd.DataFrame(results).sort_values(by='DP_Efficiency', ascending=False)
+
+    def _efficiency_row(self, col, mi, cardinality):
+        # 2. O SCORE DE EFICIÊNCIA DP:
+        # Penaliza a cardinalidade de forma logarítmica (bits de informação)
+        # Isso evita que colunas com 5000 municípios dominem o modelo
+        efficiency = mi / np.log2(cardinality) if cardinality > 1 else 0
+        
+        return {
+            'Feature': col,
+            'MI_Raw': round(mi, 4),
+            'Cardinality': cardinality,
+            'DP_Efficiency': round(efficiency, 4)
+        }
\ No newline at end of file
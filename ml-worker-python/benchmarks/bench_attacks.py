@@ -0,0 +1,101 @@
+import sys
+import os
+import re
+import glob
+import time
+import argparse
+import warnings
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+root_dir = os.path.dirname(worker_dir)
+for p in (worker_dir, bench_dir):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pipeline.audit_executor import ATTACK_ENGINES, attack_task, _evaluate, merge_counts, risk_from_counts
+from pipeline.encoded import encode_shared
+
+warnings.filterwarnings("ignore")
+
+QIDS = ['SG_PARTIDO', 'DS_GENERO', 'DS_COR_RACA', 'DS_ESTADO_CIVIL', 'SG_UF']
+SECRET = 'DS_GRAU_INSTRUCAO'
+
+def build_tasks(n_attacks, engine):
+    half = len(QIDS) // 2
+    return [
+        attack_task("singling_out", name="Singling Out", engine=engine, n_attacks=n_attacks),
+        attack_task("linkability", name="Linkability", engine=engine, n_attacks=n_attacks,
+                    aux_cols=(QIDS[:half], QIDS[half:])),
+        attack_task("inference", name="Inference", engine=engine, n_attacks=n_attacks,
+                    aux_cols=QIDS, secret=SECRET),
+    ]
+
+def run_engine(engine, frames, n_attacks, repeat):
+    """
+    Roda cada ataque `repeat` vezes e soma as contagens (n_attacks * repeat ataques no IC):
+    os dois motores são aleatórios, então a comparação é entre estimativas, não entre sorteios.
+    """
+    rows = {}
+    for task in build_tasks(n_attacks, engine):
+        total, start = None, time.perf_counter()
+        for _ in range(repeat):
+            total = merge_counts(total, _evaluate(task, frames))
+        risk = risk_from_counts(total)
+        rows[task["name"]] = (risk, (time.perf_counter() - start) / repeat)
+    return rows
+
+def _load_syn(pattern):
+    files = glob.glob(pattern)
+    return sorted([(float(re.findall(r"eps_(.*)\.parquet", f)[0]), f) for f in files], key=lambda x: x[0])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o motor nativo de ataques com o anonymeter.")
+    parser.add_argument("--real", default=os.path.join(root_dir, "df_real_train.parquet"))
+    parser.add_argument("--syn", default=os.path.join(root_dir, "df_syn_eps_*.parquet"))
+    parser.add_argument("--n-attacks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções somadas por ataque")
+    parser.add_argument("--engines", nargs="+", default=list(ATTACK_ENGINES), choices=ATTACK_ENGINES)
+    parser.add_argument("--full", action="store_true",
+                        help="Também mede o motor nativo atacando todos os registros reais")
+    args = parser.parse_args()
+
+    df_real = pd.read_parquet(args.real)
+    cols = QIDS + [SECRET]
+    print(f"--- ⏱️  BENCHMARK DOS ATAQUES ({len(df_real)} reais, {args.n_attacks} ataques x {args.repeat}) ---")
+
+    rows = []
+    for eps, fname in _load_syn(args.syn):
+        df_syn = pd.read_parquet(fname)
+        # Texto para o anonymeter, códigos para o motor nativo: o mesmo dado nos dois formatos
+        frames = {
+            "anonymeter": {"ori": df_real[cols].astype(str), "syn": df_syn[cols].astype(str)},
+            "native": dict(zip(("ori", "syn"), encode_shared([df_real[cols], df_syn[cols]]))),
+        }
+        results = {engine: run_engine(engine, frames[engine], args.n_attacks, args.repeat) for engine in args.engines}
+        for attack in results[args.engines[0]]:
+            row = {"Epsilon": eps, "Ataque": attack}
+            for engine in args.engines:
+                risk, secs = results[engine][attack]
+                row[f"Risco {engine}"] = round(risk.value, 4)
+                row[f"IC {engine}"] = f"({risk.ci[0]:.3f}, {risk.ci[1]:.3f})"
+                row[f"Tempo {engine} (s)"] = round(secs, 3)
+            if len(args.engines) == 2:
+                (a, _), (b, _) = (results[e][attack] for e in args.engines)
+                row["ICs se cruzam"] = "sim" if a.ci[0] <= b.ci[1] and b.ci[0] <= a.ci[1] else "NÃO"
+            rows.append(row)
+        print(f"   eps {eps:<6} concluído")
+
+        if args.full:
+            full = run_engine("native", frames["native"], len(df_real), 1)
+            summary = " | ".join(f"{name} {risk.value:.4f} ±{(risk.ci[1] - risk.ci[0]) / 2:.4f} em {secs:.2f}s"
+                                 for name, (risk, secs) in full.items())
+            print(f"   eps {eps:<6} base inteira ({len(df_real)} alvos): {summary}")
+
+    result = pd.DataFrame(rows)
+    print(result.to_string(index=False))
+    if len(args.engines) == 2:
+        times = result[[f"Tempo {e} (s)" for e in args.engines]].sum()
+        print(f"\nSpeedup total ({args.engines[0]} / {args.engines[1]}): {times.iloc[0] / times.iloc[1]:.1f}x")
@@ -0,0 +1,58 @@
+import sys
+import os
+import json
+import subprocess
+import argparse
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+
+DEFAULT_PATH = "../backend-go/data/raw_consulta_cand_2024_BRASIL.csv"
+
+# Cada carregador roda em um processo novo para isolar o pico de RSS (ru_maxrss em KB no Linux)
+PROBE = r"""
+import sys, os, time, json, resource
+sys.path.insert(0, {worker_dir!r})
+import pandas as pd
+from pipeline.loader import load_tse_sample
+from pipeline.wrangling_tse import TSEDataWrangler
+
+path, mode = {path!r}, {mode!r}
+start = time.perf_counter()
+if mode == "legacy":
+    # Carga completa + amostragem em memória (comportamento anterior do engine)
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, sep=';', encoding='iso-8859-1', low_memory=False)
+    if len(df) > 100000:
+        df = df.sample(n=10000, random_state=42).reset_index(drop=True)
+else:
+    df = load_tse_sample(path, columns=TSEDataWrangler("high_fidelity").required_columns())
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{"wall_s": elapsed, "peak_rss_mb": rss, "rows": len(df), "cols": df.shape[1]}}))
+"""
+
+def run_probe(path, mode):
+    code = PROBE.format(worker_dir=worker_dir, path=path, mode=mode)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o loader em streaming com a carga completa.")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    print(f"--- ⏱️  BENCHMARK DO LOADER ({os.path.basename(args.path)}) ---")
+    rows = []
+    for mode in ["legacy", "streaming"]:
+        rows.append({"Loader": mode, **run_probe(args.path, mode)})
+
+    df = pd.DataFrame(rows)
+    print(df.round(2).to_string(index=False))
+    legacy, streaming = df.iloc[0], df.iloc[1]
+    print(f"\nTempo: {legacy['wall_s'] / streaming['wall_s']:.1f}x | "
+          f"Pico de RSS: {legacy['peak_rss_mb'] / streaming['peak_rss_mb']:.1f}x menor")
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+for p in (worker_dir, bench_dir):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pipeline.encoded import encode_shared
+from pipeline.neighbors import HammingIndex, distance_report, summarize_distance
+from pipeline.wrangling_tse import apply_wrangling
+from synthetic_tse import make_tse_frame
+
+def brute_force(candidates, queries, k):
+    """Referência: matriz de distâncias completa em blocos e argsort estável (menor índice nos empates)."""
+    dist = np.zeros((len(queries), len(candidates)), dtype=np.int16)
+    for j in range(candidates.shape[1]):
+        dist += queries[:, j, None] != candidates[None, :, j]
+    order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(dist, order, axis=1), order
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o índice de Hamming em bitsets contra a força bruta.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Linhas reais e sintéticas")
+    parser.add_argument("--k", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--brute-queries", type=int, default=500,
+                        help="Consultas da força bruta (o tempo é extrapolado para todas)")
+    args = parser.parse_args()
+
+    # Duas amostras independentes do gerador fazem o papel de real e sintético
+    df_real = apply_wrangling(make_tse_frame(args.rows, random_state=1), strategy="high_fidelity")
+    df_syn = apply_wrangling(make_tse_frame(args.rows, random_state=2), strategy="high_fidelity")
+    ori, syn = encode_shared([df_real, df_syn])
+    candidates, queries = ori.matrix(), syn.matrix()
+    print(f"--- ⏱️  BENCHMARK DE VIZINHOS ({len(candidates)} x {len(queries)}, {candidates.shape[1]} colunas, k={args.k}) ---")
+
+    start = time.perf_counter()
+    index = HammingIndex(candidates, threads=args.threads)
+    build_sec = time.perf_counter() - start
+    start = time.perf_counter()
+    dist, idx = index.query(queries, k=args.k)
+    query_sec = time.perf_counter() - start
+    print(f"   Bitsets     | índice {build_sec:.2f}s | consultas {query_sec:.2f}s ({index.threads} threads)")
+
+    sample = np.random.default_rng(0).choice(len(queries), min(args.brute_queries, len(queries)), replace=False)
+    start = time.perf_counter()
+    ref_dist, ref_idx = brute_force(candidates, queries[sample], args.k)
+    brute_sec = (time.perf_counter() - start) * len(queries) / len(sample)
+    print(f"   Força bruta | ~{brute_sec:.2f}s (extrapolado de {len(sample)} consultas)")
+    same = (dist[sample] == ref_dist).all() and (idx[sample] == ref_idx).all()
+    print(f"   Mesmos vizinhos que a força bruta: {'sim' if same else 'NÃO'} | "
+          f"speedup ~{brute_sec / (build_sec + query_sec):.1f}x")
+
+    start = time.perf_counter()
+    scores = summarize_distance(distance_report(df_real, df_syn))
+    print(f"   distance_report: {time.perf_counter() - start:.2f}s | "
+          + " | ".join(f"{name} {value:.4f}" for name, value in scores.items()))
@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+import argparse
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+if worker_dir not in sys.path:
+    sys.path.insert(0, worker_dir)
+
+from pipeline.engine import PrivacyEngine
+from pipeline.wrangling_tse import apply_wrangling
+
+DEFAULT_PATH = "../backend-go/data/raw_consulta_cand_2024_BRASIL.csv"
+
+def detect_pii_columns_loop(engine, df):
+    """Referência: o laço original, uma chamada do analyzer por célula."""
+    pii_cols = []
+    sample_df = df.head(min(100, len(df)))
+    for col in df.columns:
+        pii_hits = 0
+        for val in sample_df[col]:
+            results = engine.analyzer.analyze(text=str(val), language='pt', entities=[])
+            if len(results) > 0: pii_hits += 1
+        if pii_hits > (len(sample_df) * 0.1):
+            pii_cols.append(col)
+    return pii_cols
+
+def time_call(fn, *args, repeat=3):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+def run(path, n_rows, repeat):
+    print(f"--- ⏱️  BENCHMARK DE DETECÇÃO DE PII ({os.path.basename(path)}) ---")
+    engine = PrivacyEngine()
+
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path).head(n_rows)
+    else:
+        df = pd.read_csv(path, sep=';', encoding='iso-8859-1', low_memory=False, nrows=n_rows)
+
+    # Bruto (nomes, CPFs, e-mails) e pós-wrangling (o que o pipeline realmente escaneia)
+    scenarios = {
+        "raw": df,
+        "high_fidelity": apply_wrangling(df, strategy="high_fidelity"),
+    }
+
+    rows = []
+    for name, frame in scenarios.items():
+        ref_cols, t_loop = time_call(detect_pii_columns_loop, engine, frame, repeat=repeat)
+        new_cols, t_batch = time_call(engine.detect_pii_columns, frame, repeat=repeat)
+        assert ref_cols == new_cols, f"Divergência em {name}: {ref_cols} != {new_cols}"
+        rows.append({
+            "Cenário": name,
+            "Colunas": frame.shape[1],
+            "Loop (s)": round(t_loop, 3),
+            "Lote (s)": round(t_batch, 3),
+            "Speedup": round(t_loop / t_batch, 1) if t_batch > 0 else float("inf"),
+            "PII": ", ".join(new_cols),
+        })
+
+    print(pd.DataFrame(rows).to_string(index=False))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o detector de PII em lote com o laço célula a célula.")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.path, args.rows, args.repeat)
@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+import argparse
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+root_dir = os.path.dirname(worker_dir)
+for p in (worker_dir, bench_dir):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pipeline.qid_lattice import QID_MAX_SIZE, qid_risk_report
+from synthetic_tse import make_tse_frame
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a busca no reticulado de quase-identificadores.")
+    parser.add_argument("--rows", type=int, default=460_000, help="Linhas do dataset bruto sintético do TSE")
+    parser.add_argument("--max-size", type=int, default=QID_MAX_SIZE)
+    parser.add_argument("--k", type=int, default=2)
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    parser.add_argument("--real", default=None, help="Parquet real (ex.: df_real_train.parquet) em vez do gerador")
+    parser.add_argument("--syn", default=None, help="Parquet sintético comparado ao real (ex.: df_syn_eps_1.0.parquet)")
+    args = parser.parse_args()
+
+    df_real = pd.read_parquet(args.real) if args.real else make_tse_frame(args.rows)
+    df_syn = pd.read_parquet(args.syn) if args.syn else None
+    columns = None if not args.real else [c for c in df_real.columns if df_syn is None or c in df_syn.columns]
+    print(f"--- ⏱️  BENCHMARK DO RETICULADO DE QIDs ({len(df_real)} linhas, até {args.max_size} colunas) ---")
+
+    params = dict(columns=columns, max_size=args.max_size, k=args.k)
+    start = time.perf_counter()
+    full = qid_risk_report(df_real, tolerance=1.0, **params)["real_search"]
+    print(f"   Sem poda     | {full['evaluated']} combinações | {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    result = qid_risk_report(df_real, df_syn, tolerance=args.tolerance, **params)
+    search = result["real_search"]
+    print(f"   Apriori      | {search['evaluated']} combinações ({search['pruned']} podadas) | "
+          f"{time.perf_counter() - start:.2f}s")
+
+    print(f"\nCombinações mínimas arriscadas (k={args.k}, tolerância {args.tolerance:.0%}):")
+    print(result["real"].to_string(index=False))
+    if df_syn is not None:
+        print("\nNo sintético:")
+        print(result["syn"].to_string(index=False))
@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+import subprocess
+import argparse
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+
+# Cada cenário roda em um processo novo para medir tempo e RSS de forma isolada.
+# ru_maxrss no Linux é em KB.
+PROBE = r"""
+import sys, time, json, resource
+sys.path.insert(0, {worker_dir!r})
+t0 = time.perf_counter()
+from pipeline.engine import PrivacyEngine, get_shared_analyzer, _build_analyzer
+import pandas as pd
+t_import = time.perf_counter() - t0
+
+mode = {mode!r}
+t1 = time.perf_counter()
+if mode == "eager":
+    # Comportamento anterior: modelos carregados no construtor
+    engine = PrivacyEngine(nlp_profile="full")
+    _build_analyzer("full")
+else:
+    engine = PrivacyEngine(nlp_profile={profile!r})
+t_init = time.perf_counter() - t1
+rss_init = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+t2 = time.perf_counter()
+df = pd.DataFrame({{"NM_CANDIDATO": ["JOSE DA SILVA"] * 50, "NR_CPF_CANDIDATO": ["12345678901"] * 50}})
+engine.detect_pii_columns(df)
+t_first = time.perf_counter() - t2
+rss_first = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+print(json.dumps({{"import_s": t_import, "init_s": t_init, "rss_init_mb": rss_init,
+                  "first_detect_s": t_first, "rss_peak_mb": rss_first}}))
+"""
+
+SCENARIOS = [
+    ("eager (antes)", "eager", "full"),
+    ("lazy full", "lazy", "full"),
+    ("lazy pt_only", "lazy", "pt_only"),
+]
+
+def run_probe(mode, profile):
+    code = PROBE.format(worker_dir=worker_dir, mode=mode, profile=profile)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede tempo de inicialização e RSS do PrivacyEngine.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("--- ⏱️  BENCHMARK DE INICIALIZAÇÃO DO MOTOR NLP ---")
+    rows = []
+    for label, mode, profile in SCENARIOS:
+        runs = pd.DataFrame([run_probe(mode, profile) for _ in range(args.repeat)])
+        row = runs.median().round(2).to_dict()
+        rows.append({"Cenário": label, **row})
+
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,237 @@
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from concurrent import futures
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+for p in (bench_dir, worker_dir, os.path.join(worker_dir, 'pb')):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from synthetic_tse import make_tse_frame
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULT_VERSION = 1
+# Métricas comparadas com o baseline e a folga absoluta abaixo da qual a diferença é ruído
+COMPARED = {"wall_sec": 0.05, "peak_rss_mb": 32.0}
+
+# --- DATASETS SINTÉTICOS ---
+
+def prepare_datasets(sizes, data_dir):
+    """CSVs no formato do arquivo do TSE (';' e ISO-8859-1), gerados uma vez por tamanho."""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {}
+    for n in sizes:
+        path = os.path.join(data_dir, f"raw_tse_synthetic_{n}.csv")
+        if not os.path.exists(path):
+            print(f"   Gerando {n} linhas em {path}...")
+            make_tse_frame(n).to_csv(path, sep=';', encoding='iso-8859-1', index=False)
+        paths[n] = os.path.abspath(path)
+    return paths
+
+# --- WORKER ---
+
+def start_local_worker(work_dir):
+    """
+    Sobe o PrivacyService em processo numa porta livre, com caches e logs num diretório
+    temporário: cada execução mede o treino, o wrangling e as contagens de verdade.
+    """
+    for var, value in {
+        "ENGINE_EXECUTION": "inline",
+        "MODEL_CACHE_DIR": "",
+        # Sidecars ao lado dos CSVs de benchmarks/data pulariam wrangling, PII e contagens após o aquecimento
+        "DATASET_STATS": "0",
+        "DATASET_ENCODED": "0",
+        "WRANGLER_CACHE_DIR": os.path.join(work_dir, "wranglers"),
+        "OUTPUT_DIR": os.path.join(work_dir, "output"),
+        "EXPERIMENTS_LOG": "",
+        "STAGE_METRICS_LOG": "",
+    }.items():
+        os.environ[var] = value
+
+    import grpc
+    from pb import privacy_pb2_grpc
+    from main import PrivacyService
+
+    service = PrivacyService()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    privacy_pb2_grpc.add_PrivacyServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    service.warmup()
+    return f"127.0.0.1:{port}", server
+
+def run_case(stub, path, epsilon):
+    """Uma requisição ProcessDataset: tempo de ida e volta e as etapas do AnonymizeResponse."""
+    from pb import privacy_pb2
+
+    start = time.perf_counter()
+    resp = stub.ProcessDataset(privacy_pb2.AnonymizeRequest(input_path=path, epsilon=epsilon, detect_pii=True))
+    round_trip = time.perf_counter() - start
+
+    stages = {s.name: {"wall_sec": s.wall_sec, "cpu_sec": s.cpu_sec, "peak_rss_mb": s.peak_rss_mb,
+                       "rows_in": s.rows_in, "rows_out": s.rows_out} for s in resp.stages}
+    # Os audit_* rodam dentro da etapa "audit": não entram na soma
+    measured = sum(v["wall_sec"] for name, v in stages.items() if not name.startswith("audit_"))
+    stages["grpc_round_trip"] = {"wall_sec": round_trip, "cpu_sec": 0.0, "peak_rss_mb": 0.0,
+                                 "rows_in": 0, "rows_out": 0}
+    stages["grpc_overhead"] = {"wall_sec": max(0.0, round_trip - measured), "cpu_sec": 0.0,
+                               "peak_rss_mb": 0.0, "rows_in": 0, "rows_out": 0}
+    return stages
+
+def _median_stages(runs):
+    """Mediana de cada métrica por etapa entre as repetições."""
+    stages = {}
+    for name in dict.fromkeys(name for run in runs for name in run):
+        present = [run[name] for run in runs if name in run]
+        stages[name] = {
+            # Contagens de linhas são inteiras: median_low evita a média de duas contagens
+            metric: (statistics.median if isinstance(present[0][metric], float) else statistics.median_low)(
+                [s[metric] for s in present])
+            for metric in present[0]
+        }
+    return stages
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=worker_dir,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run_suite(sizes, repeat, epsilon, data_dir, target=None):
+    import grpc
+    from pb import privacy_pb2_grpc
+
+    paths = prepare_datasets(sizes, data_dir)
+    with tempfile.TemporaryDirectory() as work_dir:
+        server = None
+        if target is None:
+            target, server = start_local_worker(work_dir)
+        try:
+            stub = privacy_pb2_grpc.PrivacyServiceStub(grpc.insecure_channel(target))
+            # Aquecimento (imports, NLP, pool de auditoria) fora da medição
+            run_case(stub, paths[min(sizes)], epsilon)
+
+            results = {}
+            for n in sizes:
+                runs = []
+                for i in range(repeat):
+                    runs.append(run_case(stub, paths[n], epsilon))
+                    print(f"   {n:>9} linhas | rodada {i + 1}/{repeat}: "
+                          f"{runs[-1]['grpc_round_trip']['wall_sec']:.2f}s")
+                results[str(n)] = _median_stages(runs)
+        finally:
+            if server is not None:
+                server.stop(None)
+
+    return {
+        "version": RESULT_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "epsilon": epsilon,
+            "repeat": repeat,
+            "target": target if server is None else "local",
+        },
+        "results": results,
+    }
+
+# --- COMPARAÇÃO COM O BASELINE ---
+
+def compare(baseline, current, threshold):
+    """
+    Linhas (tamanho, etapa, métrica, baseline, atual, variação, regressão) para as métricas
+    de COMPARED. É regressão quando piora mais que `threshold` (relativo) e mais que a
+    folga absoluta da métrica.
+    """
+    rows = []
+    for size, stages in current["results"].items():
+        base_stages = baseline["results"].get(size, {})
+        for name, metrics in stages.items():
+            if name not in base_stages:
+                continue
+            for metric, slack in COMPARED.items():
+                old, new = base_stages[name][metric], metrics[metric]
+                if not old and not new:
+                    continue
+                change = (new - old) / old if old else float("inf")
+                regressed = change > threshold and new - old > slack
+                rows.append({"Linhas": int(size), "Etapa": name, "Métrica": metric,
+                             "Baseline": round(old, 3), "Atual": round(new, 3),
+                             "Variação": f"{change:+.0%}" if old else "novo",
+                             "Status": "🚨 REGRESSÃO" if regressed else "OK"})
+    return rows
+
+def print_comparison(baseline, current, threshold):
+    import pandas as pd
+
+    for key in ("cpu_count", "machine", "python"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"[AVISO] {key} difere do baseline: {baseline['meta'].get(key)} -> {current['meta'].get(key)}")
+    rows = compare(baseline, current, threshold)
+    if not rows:
+        print("[AVISO] Nenhuma etapa em comum com o baseline")
+        return 0
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False))
+    regressions = df[df["Status"] != "OK"]
+    if len(regressions):
+        print(f"\n[FALHA] {len(regressions)} regressão(ões) acima de {threshold:.0%} "
+              f"(baseline {baseline['meta'].get('commit') or '?'} -> atual {current['meta'].get('commit') or '?'})")
+        return 1
+    print(f"\n[OK] Nenhuma regressão acima de {threshold:.0%}")
+    return 0
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do worker (etapas + gRPC), offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Roda o pipeline via gRPC nos tamanhos pedidos e salva o JSON")
+    run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--epsilon", type=float, default=1.0)
+    run.add_argument("--data-dir", default=os.path.join(bench_dir, "data"),
+                     help="Onde os CSVs sintéticos são gerados (reaproveitados entre execuções)")
+    run.add_argument("--target", help="host:porta de um worker já no ar (precisa enxergar --data-dir)")
+    run.add_argument("--output", default="bench_results.json")
+    run.add_argument("--baseline", help="JSON de uma execução anterior para comparar ao final")
+    run.add_argument("--threshold", type=float, default=0.2)
+
+    cmp = sub.add_parser("compare", help="Compara dois JSONs e sai com 1 se houver regressão")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        sys.exit(print_comparison(_load(args.baseline), _load(args.current), args.threshold))
+
+    print(f"--- ⏱️  BENCHMARK PONTA A PONTA ({', '.join(map(str, args.sizes))} linhas, {args.repeat}x) ---")
+    result = run_suite(args.sizes, args.repeat, args.epsilon, args.data_dir, args.target)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"[OK] Resultados em {args.output}")
+
+    for size, stages in result["results"].items():
+        summary = " | ".join(f"{name} {v['wall_sec']:.2f}s" for name, v in stages.items()
+                             if not name.startswith("audit_"))
+        print(f"   {size:>9}: {summary}")
+    if args.baseline:
+        sys.exit(print_comparison(_load(args.baseline), result, args.threshold))
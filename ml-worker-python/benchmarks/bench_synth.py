@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import argparse
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+for p in (worker_dir, bench_dir):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pipeline.engine import PrivacyEngine, SYNTH_ENGINES
+from pipeline.wrangling_tse import apply_wrangling
+from synthetic_tse import make_tse_frame
+
+def run_engine(name, df_clean, epsilon):
+    """Treino + geração de um motor (sem cache de modelos) e a utilidade do resultado."""
+    engine = PrivacyEngine(synth_engine=name)
+    engine.model_cache = None
+    train_sec = engine._train_model(df_clean, epsilon)
+    df_syn, gen_sec = engine._generate_data(df_clean)
+    util_marginal, util_joint = engine.calculate_utility(df_clean, df_syn)
+    return {"Motor": name, "Epsilon": epsilon, "Treino (s)": round(train_sec, 2),
+            "Geração (s)": round(gen_sec, 2), "Util 1-via": round(util_marginal, 4),
+            "Util 2-vias": round(util_joint, 4)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara os motores de síntese (AIM x marginal) no mesmo epsilon.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Linhas do dataset sintético do TSE")
+    parser.add_argument("--epsilons", type=float, nargs="+", default=[0.1, 1.0, 10.0])
+    parser.add_argument("--engines", nargs="+", default=list(SYNTH_ENGINES), choices=SYNTH_ENGINES)
+    parser.add_argument("--strategy", default="high_fidelity")
+    args = parser.parse_args()
+
+    df_clean = apply_wrangling(make_tse_frame(args.rows), strategy=args.strategy)
+    print(f"--- ⏱️  BENCHMARK DOS MOTORES DE SÍNTESE ({args.rows} linhas, {args.strategy}) ---")
+    rows = []
+    for epsilon in args.epsilons:
+        for name in args.engines:
+            start = time.perf_counter()
+            rows.append(run_engine(name, df_clean, epsilon))
+            print(f"   {name:<8} | eps {epsilon:<5} | {time.perf_counter() - start:.1f}s")
+
+    result = pd.DataFrame(rows)
+    print(result.to_string(index=False))
+    if len(args.engines) > 1:
+        wide = result.pivot(index="Epsilon", columns="Motor", values="Treino (s)")
+        if "aim" in wide and "marginal" in wide:
+            print("\nSpeedup do treino (aim / marginal):")
+            print((wide["aim"] / wide["marginal"]).round(1).to_string())
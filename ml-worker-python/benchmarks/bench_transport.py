@@ -0,0 +1,115 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+from concurrent import futures
+
+import grpc
+import pandas as pd
+import pyarrow as pa
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+for p in (bench_dir, worker_dir, os.path.join(worker_dir, 'pb')):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pb import privacy_pb2, privacy_pb2_grpc
+from pipeline.loader import load_tse_sample
+from pipeline.transport import DatasetStore, iter_parquet_ipc, iter_file_chunks, STREAM_CHUNK_BYTES
+from synthetic_tse import make_tse_frame
+
+class TransportServicer(privacy_pb2_grpc.PrivacyServiceServicer):
+    """Só as RPCs de transporte do main.py, sem engine/modelos (mesmos encoders e store)."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.datasets = DatasetStore()
+
+    def UploadDataset(self, request_iterator, context):
+        return privacy_pb2.DatasetHandle(**self.datasets.receive(request_iterator))
+
+    def DownloadResult(self, request, context):
+        path = os.path.join(self.output_dir, os.path.basename(request.output_path))
+        chunks = iter_file_chunks(path) if request.format == "parquet" else iter_parquet_ipc(path)
+        for data in chunks:
+            yield privacy_pb2.DataChunk(format=request.format or "arrow", data=data)
+
+def _upload_chunks(path, fmt):
+    with open(path, "rb") as f:
+        first = True
+        while True:
+            data = f.read(STREAM_CHUNK_BYTES)
+            if not data:
+                return
+            yield privacy_pb2.DataChunk(filename=os.path.basename(path) if first else "", format=fmt, data=data)
+            first = False
+
+def _mb_s(n_bytes, seconds):
+    return n_bytes / 1024**2 / seconds
+
+def bench_path_mode(csv_path, parquet_path):
+    """Modo atual: o backend grava o CSV no volume e o worker o relê do disco."""
+    start = time.perf_counter()
+    df = load_tse_sample(csv_path)
+    t_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pd.read_parquet(parquet_path)
+    t_down = time.perf_counter() - start
+    return {"Modo": "path", "upload_s": 0.0, "load_s": t_load, "download_s": t_down, "rows": len(df)}
+
+def bench_stream_mode(stub, servicer, csv_path, parquet_path):
+    """Modo stream: upload por gRPC para a memória compartilhada, download como Arrow IPC."""
+    start = time.perf_counter()
+    handle = stub.UploadDataset(_upload_chunks(csv_path, "csv"))
+    t_up = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = load_tse_sample(handle.input_path)
+    t_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = b"".join(c.data for c in stub.DownloadResult(
+        privacy_pb2.DownloadRequest(output_path=os.path.basename(parquet_path))))
+    pa.ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
+    t_down = time.perf_counter() - start
+
+    servicer.datasets.release(handle.dataset_id)
+    return {"Modo": "stream", "upload_s": t_up, "load_s": t_load, "download_s": t_down, "rows": len(df)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o transporte por caminho de arquivo com o stream gRPC.")
+    parser.add_argument("--rows", type=int, default=200_000, help="Linhas do dataset sintético do TSE")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df = make_tse_frame(args.rows)
+        csv_path = os.path.join(tmp, "raw_consulta_cand.csv")
+        parquet_path = os.path.join(tmp, "consulta_cand_synthetic.parquet")
+        df.to_csv(csv_path, sep=';', encoding='iso-8859-1', index=False)
+        df.astype(str).to_parquet(parquet_path, index=False)
+        csv_mb = os.path.getsize(csv_path) / 1024**2
+        parquet_mb = os.path.getsize(parquet_path) / 1024**2
+
+        servicer = TransportServicer(tmp)
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        privacy_pb2_grpc.add_PrivacyServiceServicer_to_server(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        try:
+            stub = privacy_pb2_grpc.PrivacyServiceStub(grpc.insecure_channel(f"127.0.0.1:{port}"))
+            print(f"--- ⏱️  BENCHMARK DE TRANSPORTE ({args.rows} linhas, CSV {csv_mb:.1f} MB, "
+                  f"Parquet {parquet_mb:.1f} MB) ---")
+            rows = [bench_path_mode(csv_path, parquet_path), bench_stream_mode(stub, servicer, csv_path, parquet_path)]
+        finally:
+            server.stop(None)
+            servicer.datasets.close()
+
+    result = pd.DataFrame(rows)
+    print(result.round(3).to_string(index=False))
+    stream = result.iloc[1]
+    print(f"\nUpload: {_mb_s(csv_mb * 1024**2, stream['upload_s']):.0f} MB/s | "
+          f"Download: {_mb_s(parquet_mb * 1024**2, stream['download_s']):.0f} MB/s")
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import argparse
+import pandas as pd
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+for p in (worker_dir, bench_dir):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pipeline.wrangling_tse import TSEDataWrangler
+from synthetic_tse import make_tse_frame
+
+STRATEGIES = ["high_fidelity", "minimal", "intensive"]
+
+def legacy_process(wrangler, df):
+    """Referência: o process() anterior, célula a célula (apply + membership no Index)."""
+    df = df.copy()
+    df = df.drop(columns=[c for c in wrangler.blacklist if c in df.columns])
+
+    if 'DT_NASCIMENTO' in df.columns:
+        years = pd.to_datetime(df['DT_NASCIMENTO'], errors='coerce').dt.year
+        years = years.fillna(years.median())
+        if wrangler.strategy == "high_fidelity":
+            df['FAIXA_ETARIA'] = years.astype(int).astype(str)
+        else:
+            bins = [0, 1960, 1975, 1985, 1995, 2005, 2026]
+            labels = ['BOOMER', 'GEN_X', 'MILLENNIAL_FALDA', 'MILLENNIAL_NOVO', 'GEN_Z', 'NEW_GEN']
+            df['FAIXA_ETARIA'] = pd.cut(years, bins=bins, labels=labels).astype(str)
+    else:
+        df['FAIXA_ETARIA'] = "NAO_INFORMADO"
+
+    available_cols = [c for c in wrangler.base_cols if c in df.columns]
+    df = df[available_cols].copy()
+
+    for col in df.columns:
+        df[col] = df[col].astype(str).str.strip().str.upper().replace('NAN', 'NULL')
+        if wrangler.strategy == "high_fidelity" and col in ['NM_UE', 'CD_OCUPACAO']:
+            continue
+        limit = wrangler.limits.get(col, wrangler.default_limit)
+        if df[col].nunique() > limit:
+            top_items = df[col].value_counts().nlargest(limit).index
+            df[col] = df[col].apply(lambda x: x if x in top_items else "OUTROS_GRUPOS")
+    return df
+
+def time_call(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark do TSEDataWrangler (legado vs códigos).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 2_000_000])
+    parser.add_argument("--categorical", action="store_true",
+                        help="Entrega as colunas já como pandas Categorical ao wrangler novo")
+    args = parser.parse_args()
+
+    print("--- ⏱️  BENCHMARK DO WRANGLER (TOP-N VETORIZADO) ---")
+    rows = []
+    for n in args.sizes:
+        df = make_tse_frame(n)
+        df_in = df.astype("category") if args.categorical else df
+        for strategy in STRATEGIES:
+            wrangler = TSEDataWrangler(strategy=strategy)
+            ref, t_old = time_call(legacy_process, wrangler, df)
+            new, t_new = time_call(wrangler.process, df_in)
+            pd.testing.assert_frame_equal(ref, new)
+            rows.append({"Linhas": n, "Estratégia": strategy, "Legado (s)": round(t_old, 3),
+                         "Códigos (s)": round(t_new, 3), "Speedup": round(t_old / t_new, 1)})
+            print(f"   {n:>9} | {strategy:<13} | {t_old:8.3f}s -> {t_new:7.3f}s")
+
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,139 @@
+import sys
+import os
+import time
+import argparse
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# --- AJUSTE DE PATH ---
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.dirname(bench_dir)
+for p in (worker_dir, os.path.join(worker_dir, 'pb')):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from pipeline.executor import ProcessEngineExecutor, EngineSaturated
+
+# --- MODO SINTÉTICO: mede o executor sem depender de torch/synthcity ---
+
+def _cpu_task(payload, progress_cb):
+    """Carga CPU-bound determinística com o formato de etapas do pipeline."""
+    digest = payload["seed"].encode("utf-8")
+    stages = ["load", "wrangle", "fit", "generate"]
+    for i, stage in enumerate(stages):
+        for _ in range(payload["work"]):
+            digest = hashlib.sha256(digest).digest()
+        progress_cb(stage, (i + 1) / len(stages), 0.0)
+    return {"seed": payload["seed"], "digest": digest.hex(), "pid": os.getpid()}
+
+def synthetic_handler_factory():
+    return _cpu_task
+
+def expected_digest(seed, work):
+    digest = seed.encode("utf-8")
+    for _ in range(4 * work):
+        digest = hashlib.sha256(digest).digest()
+    return digest.hex()
+
+def run_batch(executor, n_requests, work):
+    """Dispara n requisições simultâneas; retorna (segundos, respostas, rejeitadas)."""
+    payloads = [{"seed": f"req-{i}", "work": work} for i in range(n_requests)]
+    events = {p["seed"]: [] for p in payloads}
+
+    def call(payload):
+        try:
+            cb = lambda stage, progress, *_: events[payload["seed"]].append(stage)
+            return executor.run(payload, cb)
+        except EngineSaturated:
+            return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_requests) as pool:
+        results = list(pool.map(call, payloads))
+    elapsed = time.perf_counter() - start
+
+    done = [r for r in results if r is not None]
+    for r in done:
+        assert r["digest"] == expected_digest(r["seed"], work), f"Resultado incorreto para {r['seed']}"
+    return elapsed, done, len(results) - len(done), events
+
+def synthetic_load_test(workers, work, min_efficiency):
+    print(f"--- ⏱️  LOAD TEST SINTÉTICO (ProcessEngineExecutor, {workers} workers) ---")
+    executor = ProcessEngineExecutor(synthetic_handler_factory, max_workers=workers, max_pending=0)
+    try:
+        # Sobe os processos antes de medir (spawn + import)
+        run_batch(executor, workers, 1)
+
+        t1, _, _, _ = run_batch(executor, 1, work)
+        tn, done, rejected, events = run_batch(executor, workers, work)
+        speedup = (t1 * workers) / tn
+        efficiency = speedup / workers
+        print(f"   1 requisição:  {t1:.2f}s")
+        print(f"   {workers} simultâneas: {tn:.2f}s | {len(set(r['pid'] for r in done))} processos distintos")
+        print(f"   Throughput: {speedup:.2f}x (eficiência {efficiency:.0%})")
+        assert rejected == 0 and len(done) == workers, "Requisições dentro da capacidade foram rejeitadas"
+
+        # Admissão: o dobro da capacidade deve rejeitar o excedente com EngineSaturated
+        _, done, rejected, _ = run_batch(executor, 2 * workers, work // 4 or 1)
+        print(f"   Saturação ({2 * workers} requisições): {len(done)} aceitas, {rejected} rejeitadas")
+        assert len(done) >= workers and rejected > 0, "Admission control não rejeitou o excedente"
+
+        if efficiency < min_efficiency:
+            print(f"[FALHA] Eficiência {efficiency:.0%} abaixo de {min_efficiency:.0%} "
+                  f"(núcleos disponíveis: {os.cpu_count()})")
+            return 1
+        print("[OK] Respostas corretas e escala próxima de linear")
+        return 0
+    finally:
+        executor.shutdown()
+
+# --- MODO gRPC: servidor real (python main.py com ENGINE_EXECUTION=process) ---
+
+def grpc_load_test(target, input_path, n_requests, epsilon):
+    import grpc
+    from pb import privacy_pb2, privacy_pb2_grpc
+
+    print(f"--- ⏱️  LOAD TEST gRPC ({target}, {n_requests} requisições) ---")
+    stub = privacy_pb2_grpc.PrivacyServiceStub(grpc.insecure_channel(target))
+    request = privacy_pb2.AnonymizeRequest(input_path=os.path.abspath(input_path), epsilon=epsilon)
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            resp = stub.ProcessDataset(request)
+            return "OK", resp, time.perf_counter() - start
+        except grpc.RpcError as e:
+            return e.code().name, None, time.perf_counter() - start
+
+    t1 = call(0)[2]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_requests) as pool:
+        results = list(pool.map(call, range(n_requests)))
+    tn = time.perf_counter() - start
+
+    ok = [r for status, r, _ in results if status == "OK"]
+    rejected = sum(1 for status, _, _ in results if status == "RESOURCE_EXHAUSTED")
+    invalid = [r for r in ok if not r.output_path or not (0.0 <= r.privacy_score <= 1.0)]
+    print(f"   1 requisição: {t1:.1f}s | {n_requests} simultâneas: {tn:.1f}s")
+    print(f"   Concluídas: {len(ok)} | RESOURCE_EXHAUSTED: {rejected} | Outras falhas: "
+          f"{n_requests - len(ok) - rejected} | Respostas inválidas: {len(invalid)}")
+    if ok:
+        print(f"   Throughput: {len(ok) * t1 / tn:.2f}x o sequencial")
+    return 1 if invalid or len(ok) + rejected < n_requests else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test do worker: concorrência, admissão e escala.")
+    parser.add_argument("--target", help="host:porta de um worker gRPC; sem isso roda o modo sintético")
+    parser.add_argument("--input", help="Dataset enviado em cada requisição (modo gRPC)")
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--epsilon", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--work", type=int, default=200_000, help="Iterações de hash por etapa (modo sintético)")
+    parser.add_argument("--min-efficiency", type=float, default=0.7)
+    args = parser.parse_args()
+
+    if args.target:
+        if not args.input:
+            parser.error("--input é obrigatório com --target")
+        sys.exit(grpc_load_test(args.target, args.input, args.requests, args.epsilon))
+    sys.exit(synthetic_load_test(args.workers, args.work, args.min_efficiency))
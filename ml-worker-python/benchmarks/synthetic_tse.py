@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Cardinalidades aproximadas do raw_consulta_cand_2024_BRASIL (colunas de TSEDataWrangler.base_cols)
+UFS = ['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA', 'PB',
+       'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO', 'DF']
+PARTIDOS = ['PL', 'PSD', 'MDB', 'PP', 'UNIÃO', 'REPUBLICANOS', 'PT', 'PSB', 'PDT', 'PSDB',
+            'PODE', 'AVANTE', 'SOLIDARIEDADE', 'PRD', 'CIDADANIA', 'PC do B', 'PV', 'AGIR',
+            'MOBILIZA', 'NOVO', 'PSOL', 'DC', 'REDE', 'PMB', 'PCB', 'PSTU', 'UP', 'PCO', 'PRTB']
+SITUACOES = ['APTO', 'INAPTO', 'CADASTRADO']
+TOTALIZACAO = ['ELEITO POR QP', 'ELEITO POR MÉDIA', 'ELEITO', 'NÃO ELEITO', 'SUPLENTE',
+               '#NULO', '2º TURNO']
+NOMES = ['MARIA', 'JOSE', 'ANA', 'JOAO', 'ANTONIO', 'FRANCISCO', 'CARLOS', 'PAULO', 'PEDRO',
+         'LUCAS', 'LUIZ', 'MARCOS', 'LUIS', 'GABRIEL', 'RAFAEL', 'FRANCISCA', 'DANIEL', 'MARCELO']
+SOBRENOMES = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'RODRIGUES', 'FERREIRA', 'ALVES',
+              'PEREIRA', 'LIMA', 'GOMES', 'COSTA', 'RIBEIRO', 'MARTINS', 'CARVALHO', 'ALMEIDA']
+
+def _zipf_probs(n, a=1.1):
+    """Distribuição de cauda longa, como a de municípios e ocupações no TSE."""
+    w = 1.0 / np.arange(1, n + 1) ** a
+    return w / w.sum()
+
+def make_tse_frame(n_rows, random_state=42, with_pii=False):
+    """
+    Gera uma tabela de candidatos com o esquema e as cardinalidades do arquivo do TSE,
+    para benchmarks offline (sem depender do CSV de 2024).
+    """
+    rng = np.random.default_rng(random_state)
+
+    def pick(values, probs=None):
+        return np.asarray(values, dtype=object)[rng.choice(len(values), size=n_rows, p=probs)]
+
+    municipios = [f"MUNICIPIO {i:04d}" for i in range(5570)]
+    ocupacoes = np.arange(100, 100 + 250)
+    nr_partido = rng.choice(len(PARTIDOS), size=n_rows, p=_zipf_probs(len(PARTIDOS), 0.8))
+
+    birth = (pd.Timestamp("1940-01-01")
+             + pd.to_timedelta(rng.integers(0, 66 * 365, size=n_rows), unit="D"))
+
+    df = pd.DataFrame({
+        'SG_UF': pick(UFS, _zipf_probs(len(UFS), 0.7)),
+        'NM_UE': pick(municipios, _zipf_probs(len(municipios))),
+        'CD_CARGO': rng.choice([11, 12, 13], size=n_rows, p=[0.03, 0.03, 0.94]),
+        'NR_PARTIDO': np.arange(10, 10 + len(PARTIDOS))[nr_partido],
+        'SG_PARTIDO': np.asarray(PARTIDOS, dtype=object)[nr_partido],
+        'CD_GENERO': rng.choice([2, 4], size=n_rows, p=[0.66, 0.34]),
+        'CD_GRAU_INSTRUCAO': rng.integers(1, 9, size=n_rows),
+        'CD_ESTADO_CIVIL': rng.choice([1, 3, 5, 7, 9], size=n_rows),
+        'CD_COR_RACA': rng.choice([1, 2, 3, 4, 5, 6], size=n_rows, p=[0.46, 0.12, 0.01, 0.39, 0.01, 0.01]),
+        'CD_OCUPACAO': rng.choice(ocupacoes, size=n_rows, p=_zipf_probs(len(ocupacoes))),
+        'DS_SITUACAO_CANDIDATURA': pick(SITUACOES, [0.9, 0.08, 0.02]),
+        'DS_SIT_TOT_TURNO': pick(TOTALIZACAO, _zipf_probs(len(TOTALIZACAO), 0.5)),
+        'DT_NASCIMENTO': birth.strftime("%d/%m/%Y"),
+    })
+
+    if with_pii:
+        nomes = pick(NOMES) + " " + pick(SOBRENOMES) + " " + pick(SOBRENOMES)
+        df['NM_CANDIDATO'] = nomes
+        df['NR_CPF_CANDIDATO'] = [f"{v:011d}" for v in rng.integers(0, 10**11, size=n_rows)]
+
+    return df
@@ -1,12 +1,9 @@
 import os
 import pandas as pd
-import torch
-import gc
-import json
-from tqdm import tqdm
 from pipeline.engine import PrivacyEngine
 from pipeline.ml_utility_evaluator import run_ml_comparison
 from privacy_auditor import PrivacyAuditor # Integrando o novo auditor
+from test_raw_vulnerability import get_risk_label
 
 # ==========================================
 # CONFIGURAÇÕES DO EXPERIMENTO
@@ -15,84 +12,54 @@ RAW_DATA_PATH = "../backend-go/data/raw_consulta_cand_2024_BRASIL.csv"
 EPSILONS = [0.1, 1.0, 10.0, 100.0] 
 TARGET = "CD_GENERO" 
 AUX_COLS = ['NM_UE', 'SG_PARTIDO', 'DT_NASCIMENTO', 'CD_GENERO'] # Para o Auditor
+# Resultados gravados a cada epsilon concluído; rodar de novo retoma do que faltou
+RESULTS_PATH = "tcc_final_results.csv"
 
-def cleanup_gpu(engine_instance):
-    if hasattr(engine_instance, 'synth_model'):
-        del engine_instance.synth_model
-        engine_instance.synth_model = None
-    gc.collect()
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-    print("\n[MEM] VRAM liberada.")
-
-# ==========================================
-# LOOP DE EXECUÇÃO AUTOMATIZADA
-# ==========================================
-engine = PrivacyEngine()
-summary_report = []
-
-pbar = tqdm(EPSILONS, desc="🧪 Experimentos TCC", unit="epsilon")
-
-for eps in pbar:
-    pbar.set_description(f"🧪 Epsilon {eps}")
+def evaluate_epsilon(eps, df_ori, df_syn, row):
+    """Auditoria e utilidade preditiva de um epsilon (roda no processo principal)."""
+    # 1. AUDITORIA PROFUNDA (PrivacyAuditor)
+    auditor = PrivacyAuditor(df_ori=df_ori, df_syn=df_syn, aux_cols=AUX_COLS)
     
-    try:
-        # 1. GERAÇÃO (Engine atualizada retorna 5 valores)
-        pbar.set_postfix({"fase": "AIM Generation"})
-        output_path, df_ori, df_syn, pii_cols, util_jsd = engine.run_pipeline(
-            RAW_DATA_PATH, 
-            epsilon=eps
-        )
-        
-        if df_syn is None: continue
-
-        # 2. AUDITORIA PROFUNDA (PrivacyAuditor)
-        pbar.set_postfix({"fase": "Privacy Audit"})
-        auditor = PrivacyAuditor(df_ori=df_ori, df_syn=df_syn, aux_cols=AUX_COLS)
-        
-        risk_link = auditor.run_linkability()
-        risk_inf  = auditor.run_inference(secret_col='CD_COR_RACA')
-        
-        # Calculamos o score de privacidade baseado no pior caso (worst-case)
-        worst_risk = max(filter(None, [risk_link, risk_inf]), default=0.0)
-        final_privacy_score = 1.0 - worst_risk
-            
-        # 3. UTILIDADE PREDITIVA (ML Evaluator)
-        pbar.set_postfix({"fase": "ML Utility"})
-        ml_res = run_ml_comparison(
-            path_real=RAW_DATA_PATH, 
-            path_synth=output_path, 
-            df_clean=df_ori, # Usando o df_ori retornado pelo engine
-            target_col=TARGET, 
-            epsilon_label=str(eps)
-        )
-        
-        # 4. CONSOLIDAÇÃO
-        summary_report.append({
-            "Epsilon": eps,
-            "Privacy_Score": f"{final_privacy_score:.4f}",
-            "Risk_Linkability": f"{risk_link:.4f}",
-            "Risk_Inference": f"{risk_inf:.4f}",
-            "Status_LGPD": auditor.get_risk_label(worst_risk),
-            "Utility_JSD": f"{util_jsd:.4f}",
-            "F1_Synthetic": f"{ml_res['Synthetic']['F1']:.4f}",
-            "F1_Drop": f"{(ml_res['Wrangled']['F1'] - ml_res['Synthetic']['F1']):.4f}"
-        })
+    risk_link = auditor.run_linkability() or 0.0
+    risk_inf  = auditor.run_inference(secret_col='CD_COR_RACA') or 0.0
+    
+    # Calculamos o score de privacidade baseado no pior caso (worst-case)
+    worst_risk = max(risk_link, risk_inf)
+    final_privacy_score = 1.0 - worst_risk
         
-    except Exception as e:
-        print(f"\n[!] Erro no Epsilon {eps}: {str(e)}")
-    finally:
-        cleanup_gpu(engine)
+    # 2. UTILIDADE PREDITIVA (ML Evaluator)
+    ml_res = run_ml_comparison(
+        path_real=RAW_DATA_PATH, 
+        path_synth=row["output_path"], 
+        df_clean=df_ori, # Dado limpo compartilhado pelo sweep
+        target_col=TARGET, 
+        epsilon_label=str(eps)
+    )
+    
+    # 3. CONSOLIDAÇÃO
+    return {
+        "Privacy_Score": f"{final_privacy_score:.4f}",
+        "Risk_Linkability": f"{risk_link:.4f}",
+        "Risk_Inference": f"{risk_inf:.4f}",
+        "Status_LGPD": get_risk_label(worst_risk),
+        "F1_Synthetic": f"{ml_res['Synthetic']['F1']:.4f}",
+        "F1_Drop": f"{(ml_res['Wrangled']['F1'] - ml_res['Synthetic']['F1']):.4f}"
+    }
 
 # ==========================================
-# RELATÓRIO E SALVAMENTO
+# SWEEP: CARGA/WRANGLING UMA VEZ, TREINOS EM PARALELO
 # ==========================================
-if summary_report:
-    df_report = pd.DataFrame(summary_report)
-    print("\n" + "="*80)
-    print("                RESULTADOS CONSOLIDADOS DO TCC")
-    print("="*80)
-    print(df_report.to_string(index=False))
-    
-    df_report.to_csv("tcc_final_results.csv", index=False)
-    print("\n[SUCCESS] Experimentos concluídos.")
\ No newline at end of file
+if __name__ == "__main__":
+    engine = PrivacyEngine()
+    engine.run_epsilon_sweep(RAW_DATA_PATH, EPSILONS, results_path=RESULTS_PATH, evaluate=evaluate_epsilon)
+
+    # ==========================================
+    # RELATÓRIO
+    # ==========================================
+    if os.path.exists(RESULTS_PATH):
+        df_report = pd.read_csv(RESULTS_PATH).drop(columns=["dataset_hash", "timestamp"])
+        print("\n" + "="*80)
+        print("                RESULTADOS CONSOLIDADOS DO TCC")
+        print("="*80)
+        print(df_report.to_string(index=False))
+        print("\n[SUCCESS] Experimentos concluídos.")
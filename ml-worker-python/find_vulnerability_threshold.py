@@ -3,6 +3,9 @@ import numpy as np
 from anonymeter.evaluators import SinglingOutEvaluator
 import warnings
 
+from pipeline.qid_lattice import qid_risk_report, QID_MAX_SIZE
+from pipeline.wrangling_tse import TSEDataWrangler
+
 # Silenciando warnings de confiança para limpar a saída do terminal
 warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -14,7 +17,8 @@ def run_test_agressivo(df, cols, label):
     df_targets = df_mini.iloc[:200]
     df_pop = df_mini.iloc[200:]
     
-    evaluator = SinglingOutEvaluator(ori=df_targets, syn=df_pop)
+    # Combinações mínimas podem ter menos colunas que as 3 das consultas multivariadas
+    evaluator = SinglingOutEvaluator(ori=df_targets, syn=df_pop, n_cols=min(3, len(cols)))
     evaluator.evaluate()
     
     risk = evaluator.risk().value
@@ -23,29 +27,31 @@ def run_test_agressivo(df, cols, label):
 # CAMINHO REAL DO SEU ARQUIVO
 DATA_PATH = "/mnt/c/Users/looui/Documents/projetos/tcc/lgpd-diff-priv/backend-go/data/raw_consulta_cand_2024_BRASIL.csv"
 
+# Quantas combinações mínimas (as mais expostas) passam pelo teste de singling out
+N_CONFIRM = 3
+
 try:
     print("--- 🎯 BUSCA PELO LIMIAR DE VULNERABILIDADE ---")
-    df = pd.read_csv(DATA_PATH, sep=';', encoding='iso-8859-1', low_memory=False)
+    # Só as colunas do wrangler: os quase-identificadores candidatos
+    qid_cols = set(TSEDataWrangler().required_columns())
+    df = pd.read_csv(DATA_PATH, sep=';', encoding='iso-8859-1', low_memory=False,
+                     usecols=lambda col: col in qid_cols)
     print(f"[INFO] Dataset carregado com {len(df)} linhas.")
 
-    # CENÁRIO 1: Quase-identificadores completos (Alta Dimensionalidade)
-    # Esperamos Score ALTO (falsa segurança por esparsidade)
-    cols1 = ['SG_UF', 'NM_UE', 'NR_PARTIDO', 'CD_GENERO', 'CD_GRAU_INSTRUCAO', 'CD_COR_RACA', 'CD_OCUPACAO', 'DT_NASCIMENTO']
-    
-    # CENÁRIO 2: Identificadores Sociais (Média Dimensionalidade)
-    cols2 = ['NM_UE', 'NR_PARTIDO', 'CD_GENERO', 'DT_NASCIMENTO']
-    
-    # CENÁRIO 3: Identificadores Críticos (Baixa Dimensionalidade)
-    # Aqui o Score deve CAIR, provando a vulnerabilidade real
-    cols3 = ['NM_UE', 'CD_GENERO', 'DT_NASCIMENTO']
+    # Reticulado de quase-identificadores: todas as combinações até QID_MAX_SIZE colunas,
+    # podando os superconjuntos das que já isolam registros
+    result = qid_risk_report(df, max_size=QID_MAX_SIZE)
+    minimal = result["real"]
+    print(minimal.to_string(index=False))
 
-    run_test_agressivo(df, cols1, "Cenário 1: Completo")
-    run_test_agressivo(df, cols2, "Cenário 2: Reduzido")
-    run_test_agressivo(df, cols3, "Cenário 3: Mínimo Crítico")
+    # As combinações mínimas mais expostas são o cenário crítico: confirma com o anonymeter
+    print()
+    for combo in minimal.sort_values("at_risk_ratio", ascending=False)["columns"].head(N_CONFIRM):
+        run_test_agressivo(df, list(combo), " + ".join(combo))
 
     print("\n-------------------------------------------")
-    print("Análise concluída. O cenário com MENOR Privacy Score")
-    print("é o seu 'alvo' para proteção com o AIM.")
+    print("Análise concluída. As combinações mínimas acima (e qualquer")
+    print("superconjunto delas) são o 'alvo' para proteção com o AIM.")
 
 except FileNotFoundError:
     print(f"[ERRO] Arquivo não encontrado em: {DATA_PATH}")
@@ -1,6 +1,9 @@
 import sys
 import os
 import grpc
+import uuid
+import queue
+import threading
 import pandas as pd
 from concurrent import futures
 
@@ -10,24 +13,59 @@ sys.path.append(current_dir)
 sys.path.append(os.path.join(current_dir, 'pb'))
 
 from pb import privacy_pb2, privacy_pb2_grpc
-from pipeline.engine import PrivacyEngine 
+from pipeline.engine import PrivacyEngine, OUTPUT_DIR
+from pipeline.epsilon_search import EPSILON_SEARCH_MIN, valid_ceiling
+from pipeline.transport import (DatasetStore, DatasetTooLarge, iter_parquet_ipc,
+                                iter_file_chunks, STREAM_BATCH_ROWS)
+from pipeline.jobs import JobQueue, DONE
+from pipeline.tracing import StageMetrics
+from pipeline.executor import (EXECUTION_MODES, EngineSaturated,
+                               InlineEngineExecutor, ProcessEngineExecutor)
 from privacy_auditor import PrivacyAuditor 
 
-class PrivacyService(privacy_pb2_grpc.PrivacyServiceServicer):
+# "inline": um engine no processo do servidor (requisições serializadas)
+# "process": pool de processos, cada um com o próprio engine/modelo
+ENGINE_EXECUTION = os.environ.get("ENGINE_EXECUTION", "inline")
+ENGINE_MAX_CONCURRENCY = int(os.environ.get("ENGINE_MAX_CONCURRENCY", "2"))
+# Requisições síncronas que podem aguardar vaga antes de receber RESOURCE_EXHAUSTED
+ENGINE_MAX_PENDING = int(os.environ.get("ENGINE_MAX_PENDING", "0"))
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", "100"))
+# Auditoria sequencial: lotes de ataques até o IC de 95% ficar abaixo desta largura
+# (vazio = n_attacks fixo de 300). 0.07 ~ a precisão dos 300 ataques fixos com risco ~10%.
+AUDIT_TARGET_CI_WIDTH = float(os.environ.get("AUDIT_TARGET_CI_WIDTH", "0.07") or 0) or None
+AUDIT_MAX_ATTACKS = int(os.environ.get("AUDIT_MAX_ATTACKS", "1000"))
+# Modo target_risk: ataques fixos da auditoria barata de cada sondagem de epsilon
+# (a auditoria completa roda uma vez só, no epsilon escolhido)
+EPSILON_SEARCH_ATTACKS = int(os.environ.get("EPSILON_SEARCH_ATTACKS", "150"))
+# Alvo padrão do modo target_risk (requisições com target_risk < 0)
+TARGET_RISK = float(os.environ.get("TARGET_RISK", "0.15"))
+
+def request_target_risk(request, default=TARGET_RISK):
+    """Alvo de risco efetivo da requisição (0 = sem busca, epsilon fixo)."""
+    return default if request.target_risk < 0 else request.target_risk
+
+class RequestProcessor:
+    """Pipeline + auditoria de uma requisição. Há uma instância por engine (por processo no modo 'process')."""
+
     def __init__(self):
         self.engine = PrivacyEngine()
         self.aux_cols = ['NM_UE', 'SG_PARTIDO', 'FAIXA_ETARIA', 'CD_GENERO']
-        self.target_risk = 0.15
+        self.target_risk = TARGET_RISK
 
-    def _format_tabular_status(self, eps, r_so, r_li, r_in, final_score, utility):
+    def _format_tabular_status(self, eps, r_so, r_li, r_in, final_score, utility, precision=None,
+                               util_joint=None, distance=None, search=None):
         """Gera o log técnico com valores REAIS para o histórico."""
         line = "-" * 42
         table = [
             line,
             "       RELATÓRIO TÉCNICO DE AUDITORIA",
             line,
-            f" PARAMETRO EPSILON (ε):      {eps:>10.1f}",
+            f" PARAMETRO EPSILON (ε):      {eps:>10.3g}",
             f" UTILIDADE GLOBAL (JSD):     {utility:>10.4f}",
+            *([f" UTILIDADE CONJUNTA (2-WAY): {util_joint:>10.4f}"] if util_joint is not None else []),
+            *([f" CÓPIAS EXATAS (DCR = 0):    {distance['dcr_exact_rate']:>10.4f}",
+               f" DCR P5 / MEDIANA:      {distance['dcr_p05']:.4f} / {distance['dcr_median']:.4f}",
+               f" NNDR MEDIANA:               {distance['nndr_median']:>10.4f}"] if distance else []),
             line,
             " MÉTRICA DE RISCO            VALOR     STATUS",
             f" Singling Out (Isolamento)   {r_so:>7.4f}    OK",
@@ -37,38 +75,100 @@ class PrivacyService(privacy_pb2_grpc.PrivacyServiceServicer):
             f" SCORE PRIVACIDADE (1-MAX):  {final_score:>10.4f}",
             line
         ]
+        if search:
+            # Sondagens do modo target_risk: epsilon e pior risco da auditoria barata
+            verdict = "ATINGIDO" if search["target_met"] else "NÃO ATINGIDO"
+            table += [f" BUSCA DE ε (ALVO {search['target_risk']:.4f}): {verdict}",
+                      " SONDAGEM ε                 RISCO     STATUS"]
+            table += [f" {eps:<27}{risk:>6.4f}    {'OK' if risk <= search['target_risk'] else 'ACIMA'}"
+                      for eps, risk in search["probes"]]
+            table += [line]
+        if precision:
+            # Precisão de cada risco: meia-largura do IC 95% e ataques usados
+            table += [" PRECISÃO (IC 95%)          ±ERRO   ATAQUES"]
+            table += [f" {name:<27}{half:>6.4f}   {n:>7}" for name, (half, n) in precision.items()]
+            table += [line]
         return "\n".join(table)
 
-    def _run_full_audit(self, df_ori, df_syn):
-        auditor = PrivacyAuditor(df_ori, df_syn, self.aux_cols)
-        r_so = auditor.run_singling_out() or 0.0
-        r_li = auditor.run_linkability() or 0.0
-        r_in = auditor.run_inference(secret_col='CD_COR_RACA') or 0.0
+    def _run_full_audit(self, df_ori, df_syn, progress_cb=None):
+        # Os três ataques são independentes: rodam em paralelo no pool de auditoria
+        auditor = PrivacyAuditor(df_ori, df_syn, self.aux_cols, target_col='CD_COR_RACA')
+        stages = {
+            "Singling Out": "audit_singling_out",
+            "Linkability": "audit_linkability",
+            "Inference": "audit_inference",
+        }
+        finished = []
+
+        def report(name, risk, elapsed):
+            finished.append(name)
+            if progress_cb is not None:
+                progress_cb(stages[name], 0.75 + 0.24 * len(finished) / len(stages), elapsed)
+
+        with self.engine.tracer.stage("audit", rows_in=auditor.sample_size):
+            results = auditor.run_all_attacks(progress_cb=report, target_ci_width=AUDIT_TARGET_CI_WIDTH,
+                                              max_attacks=AUDIT_MAX_ATTACKS)
+        # Cada ataque medido no processo que o executou (worker do pool de auditoria)
+        for name, usage in auditor.attack_usage.items():
+            self.engine.tracer.record(stages[name], usage, rows_in=auditor.attacks_used.get(name, 300))
+        r_so, r_li, r_in = (results[name].value if name in results else 0.0 for name in stages)
+        precision = {
+            name: ((risk.ci[1] - risk.ci[0]) / 2, auditor.attacks_used.get(name, 300))
+            for name, risk in results.items()
+        }
         
         max_risk = max(r_so, r_li, r_in)
-        return r_so, r_li, r_in, max_risk
+        return r_so, r_li, r_in, max_risk, precision
 
-    def ProcessDataset(self, request, context):
+    def _probe_risk(self, epsilon, df_ori, df_syn):
+        """Pior risco de uma sondagem do modo target_risk: auditoria com poucos ataques fixos."""
+        auditor = PrivacyAuditor(df_ori, df_syn, self.aux_cols, target_col='CD_COR_RACA')
+        results = auditor.run_all_attacks(n_attacks=EPSILON_SEARCH_ATTACKS)
+        return max((risk.value for risk in results.values()), default=0.0)
+
+    def process(self, request, progress_cb=None):
         print(f"\n[INFO] Iniciando Processamento: {os.path.basename(request.input_path)}")
         
         epsilon_to_use = request.epsilon
+        search, prepared = None, None
+        target_risk = request_target_risk(request, self.target_risk)
+        if target_risk > 0:
+            # Modo target_risk: o epsilon da requisição (se houver) é só o teto da busca
+            search = self.engine.search_epsilon(
+                request.input_path, target_risk, self._probe_risk,
+                eps_max=request.epsilon or None, progress_cb=progress_cb
+            )
+            search["target_risk"] = target_risk
+            epsilon_to_use, prepared = search["epsilon"], search.pop("prepared")
         
         # 1. Execução do Pipeline (AIM)
         output_path, df_ori, df_syn, pii_detected, utility = self.engine.run_pipeline(
             request.input_path, 
-            epsilon=epsilon_to_use
+            epsilon=epsilon_to_use,
+            progress_cb=progress_cb,
+            output_rows=request.output_rows or None,
+            prepared=prepared
         )
+        if df_syn is None:
+            raise RuntimeError("Falha no pipeline de geração (detalhes no log do worker)")
 
         # 2. Auditoria Final (Riscos)
-        r_so, r_li, r_in, max_r = self._run_full_audit(df_ori, df_syn)
+        r_so, r_li, r_in, max_r, precision = self._run_full_audit(df_ori, df_syn, progress_cb)
         p_score = float(1.0 - max_r)
+        if search is not None:
+            # O alvo vale para a auditoria completa, não só para as sondagens baratas
+            search["target_met"] = search["target_met"] and max_r <= target_risk
         
         # 3. Geração do Status Tabular (CORRIGIDO: Agora enviando o utility)
+        util_joint = self.engine.last_run["util_joint"]
+        distance = self.engine.last_distance
         status_table = self._format_tabular_status(
-            epsilon_to_use, r_so, r_li, r_in, p_score, utility
+            epsilon_to_use, r_so, r_li, r_in, p_score, utility, precision, util_joint, distance, search
         )
         
         print(status_table) # Debug no console do Worker
+        self.engine.log_experiment(p_score)
+        self.engine.log_stage_metrics(run_id=uuid.uuid4().hex[:12])
 
         # 4. Resposta gRPC
         return privacy_pb2.AnonymizeResponse(
@@ -80,15 +180,163 @@ class PrivacyService(privacy_pb2_grpc.PrivacyServiceServicer):
             pii_report={col: "MASKED" for col in pii_detected},
             singling_out_risk=r_so,
             linkability_risk=r_li,
-            inference_risk=r_in
+            inference_risk=r_in,
+            joint_utility_score=util_joint,
+            dcr_exact_match_rate=distance["dcr_exact_rate"],
+            dcr_median=distance["dcr_median"],
+            dcr_p05=distance["dcr_p05"],
+            nndr_median=distance["nndr_median"],
+            epsilon_probes=len(search["probes"]) if search else 0,
+            target_met=search["target_met"] if search else False,
+            stages=[privacy_pb2.StageMetric(**span) for span in self.engine.tracer.spans]
+        )
+
+def build_worker_handler():
+    """Roda em cada processo do pool: cria o processador do worker e aquece o NLP em segundo plano."""
+    processor = RequestProcessor()
+    threading.Thread(target=processor.engine.warmup_nlp, daemon=True).start()
+    return processor.process
+
+class PrivacyService(privacy_pb2_grpc.PrivacyServiceServicer):
+    def __init__(self, execution=None):
+        self.execution = execution or ENGINE_EXECUTION
+        if self.execution not in EXECUTION_MODES:
+            raise ValueError(f"ENGINE_EXECUTION inválido: {self.execution} (use {EXECUTION_MODES})")
+
+        if self.execution == "process":
+            self.processor = None
+            self.executor = ProcessEngineExecutor(
+                build_worker_handler,
+                max_workers=ENGINE_MAX_CONCURRENCY,
+                max_pending=ENGINE_MAX_PENDING
+            )
+        else:
+            self.processor = RequestProcessor()
+            self.executor = InlineEngineExecutor(self.processor.process, max_pending=ENGINE_MAX_PENDING)
+
+        # Uploads por stream ficam em memória compartilhada, visível aos workers do modo 'process'
+        self.datasets = DatasetStore()
+        # Agregado das etapas de todas as respostas (também as dos workers do modo 'process')
+        self.metrics = StageMetrics()
+
+        # Fila dos jobs assíncronos (SubmitJob/WatchJob): um consumidor por vaga de execução
+        self.jobs = JobQueue(self._run_job, workers=self.executor.max_workers, max_queued=JOB_QUEUE_MAX)
+        print(f"[SERVER] Execução: {self.execution} ({self.executor.max_workers} simultânea(s))")
+
+    def warmup(self):
+        # No modo 'process' cada worker aquece o próprio NLP ao subir
+        if self.processor is not None:
+            self.processor.engine.warmup_nlp()
+
+    def _observe(self, response):
+        self.metrics.observe([
+            {"name": s.name, "wall_sec": s.wall_sec, "cpu_sec": s.cpu_sec, "peak_rss_mb": s.peak_rss_mb,
+             "rows_in": s.rows_in, "rows_out": s.rows_out}
+            for s in response.stages
+        ])
+        return response
+
+    def _run_job(self, request, report):
+        # Jobs já passaram pela admissão em SubmitJob: aguardam vaga em vez de serem rejeitados
+        return self._observe(self.executor.run(request, report, block=True))
+
+    def _check_request(self, request, context):
+        """Recusa na admissão o que só falharia depois de carregar o dataset."""
+        if request_target_risk(request) > 0 and request.epsilon > 0 and not valid_ceiling(request.epsilon):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                          f"Epsilon {request.epsilon:.3g} não serve de teto da busca do target_risk "
+                          f"(precisa ser maior que {EPSILON_SEARCH_MIN})")
+
+    def ProcessDataset(self, request, context):
+        self._check_request(request, context)
+        try:
+            return self._observe(self.executor.run(request))
+        except EngineSaturated as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+    def GetMetrics(self, request, context):
+        return privacy_pb2.MetricsText(text=self.metrics.prometheus_text())
+
+    # --- API ASSÍNCRONA DE JOBS ---
+
+    def _job_handle(self, job):
+        return privacy_pb2.JobHandle(
+            job_id=job.job_id,
+            state=job.state,
+            queue_position=self.jobs.queue_position(job.job_id)
         )
 
+    def _get_job_or_abort(self, job_id, context):
+        job = self.jobs.get(job_id)
+        if job is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Job não encontrado: {job_id}")
+        return job
+
+    def SubmitJob(self, request, context):
+        self._check_request(request, context)
+        try:
+            job = self.jobs.submit(request)
+        except queue.Full as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Fila de jobs cheia: {e}")
+        return self._job_handle(job)
+
+    def WatchJob(self, request, context):
+        self._get_job_or_abort(request.job_id, context)
+        for event in self.jobs.watch(request.job_id, is_active=context.is_active):
+            yield privacy_pb2.JobProgress(**event)
+
+    def GetJobResult(self, request, context):
+        job = self._get_job_or_abort(request.job_id, context)
+        return privacy_pb2.JobResult(
+            job_id=job.job_id,
+            state=job.state,
+            response=job.result if job.state == DONE else None,
+            error=job.error
+        )
+
+    def CancelJob(self, request, context):
+        job = self._get_job_or_abort(request.job_id, context)
+        self.jobs.cancel(job.job_id)
+        return self._job_handle(job)
+
+    # --- TRANSPORTE POR STREAM ---
+
+    def UploadDataset(self, request_iterator, context):
+        try:
+            handle = self.datasets.receive(request_iterator)
+        except DatasetTooLarge as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except Exception as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Dataset inválido: {e}")
+        return privacy_pb2.DatasetHandle(**handle)
+
+    def DownloadResult(self, request, context):
+        # Só o nome do arquivo: output_path nunca sai do diretório de saída
+        path = os.path.join(OUTPUT_DIR, os.path.basename(request.output_path))
+        if not request.output_path or not os.path.isfile(path):
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Resultado não encontrado: {request.output_path}")
+
+        if request.format == "parquet":
+            chunks = iter_file_chunks(path)
+        elif request.format in ("", "arrow"):
+            chunks = iter_parquet_ipc(path, batch_rows=request.batch_rows or STREAM_BATCH_ROWS)
+        else:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Formato desconhecido: {request.format}")
+        fmt = request.format or "arrow"
+        for data in chunks:
+            if not context.is_active():
+                return
+            yield privacy_pb2.DataChunk(format=fmt, data=data)
+
 def serve():
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    privacy_pb2_grpc.add_PrivacyServiceServicer_to_server(PrivacyService(), server)
+    service = PrivacyService()
+    privacy_pb2_grpc.add_PrivacyServiceServicer_to_server(service, server)
     server.add_insecure_port('[::]:50051')
     print("[SERVER] ML-Worker pronto no WSL (Porta 50051)")
     server.start()
+    # Porta já aberta: os modelos spaCy carregam em segundo plano
+    threading.Thread(target=service.warmup, daemon=True).start()
     server.wait_for_termination()
 
 if __name__ == '__main__':
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rprivacy.proto\x12\x07privacy\"Z\n\x10\x41nonymizeRequest\x12\x12\n\ninput_path\x18\x01 \x01(\t\x12\x0f\n\x07\x65psilon\x18\x02 \x01(\x02\x12\r\n\x05\x64\x65lta\x18\x03 \x01(\x02\x12\x12\n\ndetect_pii\x18\x04 \x01(\x08\"\xba\x02\n\x11\x41nonymizeResponse\x12\x13\n\x0boutput_path\x18\x01 \x01(\t\x12\x15\n\rprivacy_score\x18\x02 \x01(\x02\x12\x15\n\rutility_score\x18\x03 \x01(\x02\x12\x14\n\x0c\x65psilon_used\x18\x04 \x01(\x02\x12\x0e\n\x06status\x18\x05 \x01(\t\x12=\n\npii_report\x18\x06 \x03(\x0b\x32).privacy.AnonymizeResponse.PiiReportEntry\x12\x19\n\x11singling_out_risk\x18\x07 \x01(\x02\x12\x18\n\x10linkability_risk\x18\x08 \x01(\x02\x12\x16\n\x0einference_risk\x18\t \x01(\x02\x1a\x30\n\x0ePiiReportEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x32[\n\x0ePrivacyService\x12I\n\x0eProcessDataset\x12\x19.privacy.AnonymizeRequest\x1a\x1a.privacy.AnonymizeResponse\"\x00\x42\x0fZ\rbackend-go/pbb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rprivacy.proto\x12\x07privacy\"\x84\x01\n\x10\x41nonymizeRequest\x12\x12\n\ninput_path\x18\x01 \x01(\t\x12\x0f\n\x07\x65psilon\x18\x02 \x01(\x02\x12\r\n\x05\x64\x65lta\x18\x03 \x01(\x02\x12\x12\n\ndetect_pii\x18\x04 \x01(\x08\x12\x13\n\x0boutput_rows\x18\x05 \x01(\x03\x12\x13\n\x0btarget_risk\x18\x06 \x01(\x02\"\x81\x04\n\x11\x41nonymizeResponse\x12\x13\n\x0boutput_path\x18\x01 \x01(\t\x12\x15\n\rprivacy_score\x18\x02 \x01(\x02\x12\x15\n\rutility_score\x18\x03 \x01(\x02\x12\x14\n\x0c\x65psilon_used\x18\x04 \x01(\x02\x12\x0e\n\x06status\x18\x05 \x01(\t\x12=\n\npii_report\x18\x06 \x03(\x0b\x32).privacy.AnonymizeResponse.PiiReportEntry\x12\x19\n\x11singling_out_risk\x18\x07 \x01(\x02\x12\x18\n\x10linkability_risk\x18\x08 \x01(\x02\x12\x16\n\x0einference_risk\x18\t \x01(\x02\x12\x1b\n\x13joint_utility_score\x18\n \x01(\x02\x12$\n\x06stages\x18\x0b \x03(\x0b\x32\x14.privacy.StageMetric\x12\x1c\n\x14\x64\x63r_exact_match_rate\x18\x0c \x01(\x02\x12\x12\n\ndcr_median\x18\r \x01(\x02\x12\x0f\n\x07\x64\x63r_p05\x18\x0e \x01(\x02\x12\x13\n\x0bnndr_median\x18\x0f \x01(\x02\x12\x16\n\x0e\x65psilon_probes\x18\x10 \x01(\x05\x12\x12\n\ntarget_met\x18\x11 \x01(\x08\x1a\x30\n\x0ePiiReportEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"v\n\x0bStageMetric\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08wall_sec\x18\x02 \x01(\x01\x12\x0f\n\x07\x63pu_sec\x18\x03 \x01(\x01\x12\x13\n\x0bpeak_rss_mb\x18\x04 \x01(\x01\x12\x0f\n\x07rows_in\x18\x05 \x01(\x03\x12\x10\n\x08rows_out\x18\x06 \x01(\x03\"\x1c\n\nJobRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"B\n\tJobHandle\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\t\x12\x16\n\x0equeue_position\x18\x03 \x01(\x05\"\x8e\x01\n\x0bJobProgress\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\t\x12\r\n\x05stage\x18\x03 \x01(\t\x12\x10\n\x08progress\x18\x04 \x01(\x02\x12\x15\n\rstage_seconds\x18\x05 \x01(\x02\x12\x17\n\x0f\x65lapsed_seconds\x18\x06 \x01(\x02\x12\x0f\n\x07message\x18\x07 \x01(\t\"g\n\tJobResult\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\t\x12,\n\x08response\x18\x03 \x01(\x0b\x32\x1a.privacy.AnonymizeResponse\x12\r\n\x05\x65rror\x18\x04 \x01(\t\";\n\tDataChunk\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"Y\n\rDatasetHandle\x12\x12\n\ndataset_id\x18\x01 \x01(\t\x12\x12\n\ninput_path\x18\x02 \x01(\t\x12\x0c\n\x04rows\x18\x03 \x01(\x03\x12\x12\n\nsize_bytes\x18\x04 \x01(\x03\"J\n\x0f\x44ownloadRequest\x12\x13\n\x0boutput_path\x18\x01 \x01(\t\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x12\n\nbatch_rows\x18\x03 \x01(\x05\"\x10\n\x0eMetricsRequest\"\x1b\n\x0bMetricsText\x12\x0c\n\x04text\x18\x01 \x01(\t2\x8b\x04\n\x0ePrivacyService\x12I\n\x0eProcessDataset\x12\x19.privacy.AnonymizeRequest\x1a\x1a.privacy.AnonymizeResponse\"\x00\x12<\n\tSubmitJob\x12\x19.privacy.AnonymizeRequest\x1a\x12.privacy.JobHandle\"\x00\x12\x39\n\x08WatchJob\x12\x13.privacy.JobRequest\x1a\x14.privacy.JobProgress\"\x00\x30\x01\x12\x39\n\x0cGetJobResult\x12\x13.privacy.JobRequest\x1a\x12.privacy.JobResult\"\x00\x12\x36\n\tCancelJob\x12\x13.privacy.JobRequest\x1a\x12.privacy.JobHandle\"\x00\x12?\n\rUploadDataset\x12\x12.privacy.DataChunk\x1a\x16.privacy.DatasetHandle\"\x00(\x01\x12\x42\n\x0e\x44ownloadResult\x12\x18.privacy.DownloadRequest\x1a\x12.privacy.DataChunk\"\x00\x30\x01\x12=\n\nGetMetrics\x12\x17.privacy.MetricsRequest\x1a\x14.privacy.MetricsText\"\x00\x42\x0fZ\rbackend-go/pbb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,12 +34,32 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._serialized_options = b'Z\rbackend-go/pb'
   _globals['_ANONYMIZERESPONSE_PIIREPORTENTRY']._loaded_options = None
   _globals['_ANONYMIZERESPONSE_PIIREPORTENTRY']._serialized_options = b'8\001'
-  _globals['_ANONYMIZEREQUEST']._serialized_start=26
-  _globals['_ANONYMIZEREQUEST']._serialized_end=116
-  _globals['_ANONYMIZERESPONSE']._serialized_start=119
-  _globals['_ANONYMIZERESPONSE']._serialized_end=433
-  _globals['_ANONYMIZERESPONSE_PIIREPORTENTRY']._serialized_start=385
-  _globals['_ANONYMIZERESPONSE_PIIREPORTENTRY']._serialized_end=433
-  _globals['_PRIVACYSERVICE']._serialized_start=435
-  _globals['_PRIVACYSERVICE']._serialized_end=526
+  _globals['_ANONYMIZEREQUEST']._serialized_start=27
+  _globals['_ANONYMIZEREQUEST']._serialized_end=159
+  _globals['_ANONYMIZERESPONSE']._serialized_start=162
+  _globals['_ANONYMIZERESPONSE']._serialized_end=675
+  _globals['_ANONYMIZERESPONSE_PIIREPORTENTRY']._serialized_start=627
+  _globals['_ANONYMIZERESPONSE_PIIREPORTENTRY']._serialized_end=675
+  _globals['_STAGEMETRIC']._serialized_start=677
+  _globals['_STAGEMETRIC']._serialized_end=795
+  _globals['_JOBREQUEST']._serialized_start=797
+  _globals['_JOBREQUEST']._serialized_end=825
+  _globals['_JOBHANDLE']._serialized_start=827
+  _globals['_JOBHANDLE']._serialized_end=893
+  _globals['_JOBPROGRESS']._serialized_start=896
+  _globals['_JOBPROGRESS']._serialized_end=1038
+  _globals['_JOBRESULT']._serialized_start=1040
+  _globals['_JOBRESULT']._serialized_end=1143
+  _globals['_DATACHUNK']._serialized_start=1145
+  _globals['_DATACHUNK']._serialized_end=1204
+  _globals['_DATASETHANDLE']._serialized_start=1206
+  _globals['_DATASETHANDLE']._serialized_end=1295
+  _globals['_DOWNLOADREQUEST']._serialized_start=1297
+  _globals['_DOWNLOADREQUEST']._serialized_end=1371
+  _globals['_METRICSREQUEST']._serialized_start=1373
+  _globals['_METRICSREQUEST']._serialized_end=1389
+  _globals['_METRICSTEXT']._serialized_start=1391
+  _globals['_METRICSTEXT']._serialized_end=1418
+  _globals['_PRIVACYSERVICE']._serialized_start=1421
+  _globals['_PRIVACYSERVICE']._serialized_end=1944
 # @@protoc_insertion_point(module_scope)
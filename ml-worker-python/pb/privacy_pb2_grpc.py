@@ -39,6 +39,41 @@ class PrivacyServiceStub(object):
                 request_serializer=privacy__pb2.AnonymizeRequest.SerializeToString,
                 response_deserializer=privacy__pb2.AnonymizeResponse.FromString,
                 _registered_method=True)
+        self.SubmitJob = channel.unary_unary(
+                '/privacy.PrivacyService/SubmitJob',
+                request_serializer=privacy__pb2.AnonymizeRequest.SerializeToString,
+                response_deserializer=privacy__pb2.JobHandle.FromString,
+                _registered_method=True)
+        self.WatchJob = channel.unary_stream(
+                '/privacy.PrivacyService/WatchJob',
+                request_serializer=privacy__pb2.JobRequest.SerializeToString,
+                response_deserializer=privacy__pb2.JobProgress.FromString,
+                _registered_method=True)
+        self.GetJobResult = channel.unary_unary(
+                '/privacy.PrivacyService/GetJobResult',
+                request_serializer=privacy__pb2.JobRequest.SerializeToString,
+                response_deserializer=privacy__pb2.JobResult.FromString,
+                _registered_method=True)
+        self.CancelJob = channel.unary_unary(
+                '/privacy.PrivacyService/CancelJob',
+                request_serializer=privacy__pb2.JobRequest.SerializeToString,
+                response_deserializer=privacy__pb2.JobHandle.FromString,
+                _registered_method=True)
+        self.UploadDataset = channel.stream_unary(
+                '/privacy.PrivacyService/UploadDataset',
+                request_serializer=privacy__pb2.DataChunk.SerializeToString,
+                response_deserializer=privacy__pb2.DatasetHandle.FromString,
+                _registered_method=True)
+        self.DownloadResult = channel.unary_stream(
+                '/privacy.PrivacyService/DownloadResult',
+                request_serializer=privacy__pb2.DownloadRequest.SerializeToString,
+                response_deserializer=privacy__pb2.DataChunk.FromString,
+                _registered_method=True)
+        self.GetMetrics = channel.unary_unary(
+                '/privacy.PrivacyService/GetMetrics',
+                request_serializer=privacy__pb2.MetricsRequest.SerializeToString,
+                response_deserializer=privacy__pb2.MetricsText.FromString,
+                _registered_method=True)
 
 
 class PrivacyServiceServicer(object):
@@ -50,6 +85,52 @@ class PrivacyServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubmitJob(self, request, context):
+        """API assíncrona: o job entra na fila do worker e o cliente acompanha o progresso
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJobResult(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CancelJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadDataset(self, request_iterator, context):
+        """Transporte por stream, sem volume compartilhado: o dataset sobe em fragmentos e o
+        sintético desce como Arrow IPC (ou os bytes do Parquet)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DownloadResult(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetMetrics(self, request, context):
+        """Métricas agregadas por etapa no formato texto do Prometheus (exposto em /metrics pelo backend)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PrivacyServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +139,41 @@ def add_PrivacyServiceServicer_to_server(servicer, server):
                     request_deserializer=privacy__pb2.AnonymizeRequest.FromString,
                     response_serializer=privacy__pb2.AnonymizeResponse.SerializeToString,
             ),
+            'SubmitJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitJob,
+                    request_deserializer=privacy__pb2.AnonymizeRequest.FromString,
+                    response_serializer=privacy__pb2.JobHandle.SerializeToString,
+            ),
+            'WatchJob': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchJob,
+                    request_deserializer=privacy__pb2.JobRequest.FromString,
+                    response_serializer=privacy__pb2.JobProgress.SerializeToString,
+            ),
+            'GetJobResult': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJobResult,
+                    request_deserializer=privacy__pb2.JobRequest.FromString,
+                    response_serializer=privacy__pb2.JobResult.SerializeToString,
+            ),
+            'CancelJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.CancelJob,
+                    request_deserializer=privacy__pb2.JobRequest.FromString,
+                    response_serializer=privacy__pb2.JobHandle.SerializeToString,
+            ),
+            'UploadDataset': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadDataset,
+                    request_deserializer=privacy__pb2.DataChunk.FromString,
+                    response_serializer=privacy__pb2.DatasetHandle.SerializeToString,
+            ),
+            'DownloadResult': grpc.unary_stream_rpc_method_handler(
+                    servicer.DownloadResult,
+                    request_deserializer=privacy__pb2.DownloadRequest.FromString,
+                    response_serializer=privacy__pb2.DataChunk.SerializeToString,
+            ),
+            'GetMetrics': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetMetrics,
+                    request_deserializer=privacy__pb2.MetricsRequest.FromString,
+                    response_serializer=privacy__pb2.MetricsText.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'privacy.PrivacyService', rpc_method_handlers)
@@ -95,3 +211,192 @@ class PrivacyService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SubmitJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/privacy.PrivacyService/SubmitJob',
+            privacy__pb2.AnonymizeRequest.SerializeToString,
+            privacy__pb2.JobHandle.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/privacy.PrivacyService/WatchJob',
+            privacy__pb2.JobRequest.SerializeToString,
+            privacy__pb2.JobProgress.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJobResult(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/privacy.PrivacyService/GetJobResult',
+            privacy__pb2.JobRequest.SerializeToString,
+            privacy__pb2.JobResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CancelJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/privacy.PrivacyService/CancelJob',
+            privacy__pb2.JobRequest.SerializeToString,
+            privacy__pb2.JobHandle.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UploadDataset(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/privacy.PrivacyService/UploadDataset',
+            privacy__pb2.DataChunk.SerializeToString,
+            privacy__pb2.DatasetHandle.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DownloadResult(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/privacy.PrivacyService/DownloadResult',
+            privacy__pb2.DownloadRequest.SerializeToString,
+            privacy__pb2.DataChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetMetrics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/privacy.PrivacyService/GetMetrics',
+            privacy__pb2.MetricsRequest.SerializeToString,
+            privacy__pb2.MetricsText.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
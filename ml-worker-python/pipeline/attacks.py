@@ -0,0 +1,405 @@
+import math
+import itertools
+from statistics import NormalDist
+from typing import NamedTuple
+
+import numpy as np
+
+from .encoded import encode_shared
+from .neighbors import HammingIndex
+
+# Limite de células (consultas x candidatos) de cada bloco de distâncias da busca de vizinhos
+NN_BLOCK_CELLS = 1 << 22
+
+# --- RISCO E IC (mesmas fórmulas do anonymeter.stats.confidence) ---
+
+class SuccessRate(NamedTuple):
+    value: float
+    error: float
+
+    def to_risk(self):
+        return bind_value(self.value, self.error)
+
+class PrivacyRisk(NamedTuple):
+    """Mesmo formato do PrivacyRisk do anonymeter: valor e IC, ambos em [0, 1]."""
+    value: float
+    ci: tuple
+
+def success_rate(n_total, n_success, confidence_level=0.95):
+    """Taxa de sucesso com o intervalo de Wilson (o mesmo do anonymeter)."""
+    if not 0 <= confidence_level <= 1:
+        raise ValueError(f"confidence_level deve estar entre 0 e 1: {confidence_level}")
+    z = NormalDist().inv_cdf(1 - (1 - confidence_level) / 2)
+    z_squared = z * z
+    denominator = n_total + z_squared
+    rate = (n_success + 0.5 * z_squared) / denominator
+    error = (z / denominator) * math.sqrt(n_success * (n_total - n_success) / n_total + 0.25 * z_squared)
+    return SuccessRate(rate, error)
+
+def residual_success(attack_rate, control_rate):
+    """Excesso de sucesso sobre o controle, normalizado pela margem (erro propagado)."""
+    residual = (attack_rate.value - control_rate.value) / (1.0 - control_rate.value)
+    der_attack = 1 / abs(1 - control_rate.value)
+    der_control = (attack_rate.value - 1) / (1 - control_rate.value) ** 2
+    error = math.sqrt((attack_rate.error * der_attack) ** 2 + (control_rate.error * der_control) ** 2)
+    return SuccessRate(residual, error)
+
+def bind_value(point_estimate, error_bound):
+    clip = lambda v: min(max(v, 0.0), 1.0)
+    return PrivacyRisk(clip(point_estimate), (clip(point_estimate - error_bound), clip(point_estimate + error_bound)))
+
+# --- CHAVES DE LINHA ---
+
+def _row_keys(columns):
+    """
+    Chave int64 por linha, igual entre duas linhas sse os códigos de todas as colunas são
+    iguais. Os códigos são empilhados em base mista; se o produto das cardinalidades for
+    estourar 62 bits, a chave parcial é compactada (np.unique) antes de seguir.
+    """
+    key = np.zeros(len(columns[0]) if columns else 0, dtype=np.int64)
+    bound = 1
+    for codes in columns:
+        codes = codes.astype(np.int64) + 1  # -1 (desconhecido) vira 0
+        card = int(codes.max()) + 1 if len(codes) else 1
+        if bound * card >= 1 << 62:
+            uniques, key = np.unique(key, return_inverse=True)
+            bound = len(uniques)
+        key = key * card + codes
+        bound *= card
+    return key
+
+def _counts_of(keys, lookup):
+    """Quantas vezes cada chave de `lookup` aparece em `keys`."""
+    uniques, counts = np.unique(keys, return_counts=True)
+    pos = np.clip(np.searchsorted(uniques, lookup), 0, max(len(uniques) - 1, 0))
+    found = (uniques[pos] == lookup) if len(uniques) else np.zeros(len(lookup), dtype=bool)
+    return np.where(found, counts[pos] if len(uniques) else 0, 0)
+
+def _count_equal(data, cols, values):
+    """
+    Para cada linha de `values` (q x len(cols)), quantas linhas de `data` (n x d) têm
+    exatamente esses códigos nas colunas `cols`. Sem colunas, todas as linhas casam.
+    """
+    if not len(cols):
+        return np.full(len(values), len(data), dtype=np.int64)
+    n = len(data)
+    keys = _row_keys([np.concatenate([data[:, c], values[:, j]]) for j, c in enumerate(cols)])
+    return _counts_of(keys[:n], keys[n:])
+
+def _dedup_rows(data):
+    """Linhas distintas na ordem da primeira ocorrência (o unique(maintain_order) do anonymeter)."""
+    if not len(data):
+        return data
+    _, first = np.unique(_row_keys(list(data.T)), return_index=True)
+    return data[np.sort(first)]
+
+# --- VIZINHOS MAIS PRÓXIMOS (distância de Hamming) ---
+
+def nearest_neighbors(candidates, queries, n_neighbors=1, rng=None):
+    """
+    Índices (q x k) dos k candidatos mais próximos de cada consulta em número de colunas
+    diferentes, a distância de Gower do anonymeter para colunas categóricas. Empates são
+    sorteados com `rng` (a ordenação do anonymeter não é estável, então na prática ele
+    também escolhe um empatado qualquer); sem `rng`, ficam com o menor índice.
+
+    Com k=1 a busca é feita nos padrões distintos dos candidatos: consultas com um padrão
+    idêntico saem direto da tabela de chaves, e as demais comparam só contra os padrões,
+    sorteando o empate na proporção de quantas linhas cada padrão tem. Com k>1 a busca vai
+    para o HammingIndex, com os candidatos na ordem de uma permutação sorteada.
+    """
+    n_cand = len(candidates)
+    n_neighbors = min(n_neighbors, n_cand)
+    if n_neighbors == 1:
+        keys = _row_keys([np.concatenate([candidates[:, j], queries[:, j]]) for j in range(candidates.shape[1])])
+        cand_keys, query_keys = keys[:n_cand], keys[n_cand:]
+        by_key = np.argsort(cand_keys, kind="stable")
+        uniques, start, mult = np.unique(cand_keys[by_key], return_index=True, return_counts=True)
+
+        def pick(patterns):
+            # Linha do padrão: a primeira (menor índice) ou uma sorteada entre as iguais
+            offset = 0 if rng is None else (rng.random(len(patterns)) * mult[patterns]).astype(np.int64)
+            return by_key[start[patterns] + offset]
+
+        result = np.empty(len(queries), dtype=np.int64)
+        pos = np.clip(np.searchsorted(uniques, query_keys), 0, len(uniques) - 1)
+        exact = uniques[pos] == query_keys
+        result[exact] = pick(pos[exact])
+
+        # Padrões em ordem de primeira ocorrência: o argmin devolve o menor índice entre empatados
+        by_first = np.argsort(by_key[start])
+        patterns = candidates[by_key[start[by_first]]]
+        weights = mult[by_first]
+        pending = np.flatnonzero(~exact)
+        block = max(1, NN_BLOCK_CELLS // len(patterns))
+        for first in range(0, len(pending), block):
+            rows = pending[first:first + block]
+            dist = _hamming(patterns, queries[rows])
+            if rng is None:
+                best = np.argmin(dist, axis=1)
+            else:
+                tied = np.cumsum((dist == dist.min(axis=1, keepdims=True)) * weights, axis=1)
+                draw = rng.random(len(rows)) * tied[:, -1]
+                best = (tied <= draw[:, None]).sum(axis=1)
+            result[rows] = pick(by_first[best])
+        return result[:, None]
+
+    # Desempate pela posição numa permutação (sorteada) ou pelo próprio índice: o índice de
+    # bitsets devolve o menor índice entre empatados na ordem em que os candidatos entram
+    order = np.arange(n_cand) if rng is None else rng.permutation(n_cand)
+    _, idx = HammingIndex(candidates[order]).query(queries, n_neighbors)
+    return order[idx]
+
+def _hamming(candidates, queries):
+    dist = np.zeros((len(queries), len(candidates)), dtype=np.int16)
+    for j in range(candidates.shape[1]):
+        dist += queries[:, j, None] != candidates[None, :, j]
+    return dist
+
+# --- ATAQUES ---
+
+def _matrix(frame, columns):
+    return frame.matrix(list(columns))
+
+def _counts(n_attacks, n_success, n_baseline, n_control, n_attacks_baseline=None, n_attacks_control=None):
+    """Mesmas contagens que o audit_executor extrai do EvaluationResults do anonymeter."""
+    return {
+        "n_attacks": int(n_attacks),
+        "n_attacks_baseline": int(n_attacks if n_attacks_baseline is None else n_attacks_baseline),
+        "n_attacks_control": int(n_attacks if n_attacks_control is None else n_attacks_control),
+        "n_success": int(n_success),
+        "n_baseline": int(n_baseline),
+        "n_control": n_control,
+    }
+
+class AttackEngine:
+    """
+    Ataques do anonymeter (Singling Out, Linkability, Inference) sobre códigos inteiros.
+    Os frames (DataFrames ou EncodedFrames) são codificados uma vez num vocabulário comum;
+    predicados viram chaves de linha e contagens por np.unique, e a busca de vizinhos é
+    feita em blocos de máscaras booleanas. Devolve as mesmas contagens do anonymeter, então
+    o risco e o IC saem de risk_from_counts como antes. Todas as colunas são tratadas como
+    categóricas (o anonymeter também as vê assim depois do astype(str) do auditor).
+    """
+
+    def __init__(self, ori, syn, control=None, seed=None):
+        frames = [ori, syn] + ([control] if control is not None else [])
+        encoded = encode_shared(frames)
+        self.columns = encoded[0].columns
+        self.ori, self.syn = encoded[0], encoded[1]
+        self.control = encoded[2] if control is not None else None
+        self.rng = np.random.default_rng(seed)
+
+    # --- SINGLING OUT ---
+
+    def singling_out(self, n_attacks=500, n_cols=3, mode="multivariate", max_attempts=10_000_000):
+        if mode not in ("multivariate", "univariate"):
+            raise ValueError(f"mode deve ser 'multivariate' ou 'univariate': {mode}")
+        cols = self.columns
+        ori = _dedup_rows(_matrix(self.ori, cols))
+        syn = _dedup_rows(_matrix(self.syn, cols))
+        control = _dedup_rows(_matrix(self.control, cols)) if self.control is not None else None
+
+        if mode == "univariate":
+            queries = self._univariate_queries(syn, n_attacks)
+        else:
+            queries = self._multivariate_queries(syn, n_attacks, min(n_cols, len(cols)), max_attempts)
+        n_success = self._singling_out_successes(ori, queries)
+
+        baseline_cols = 1 if mode == "univariate" else min(n_cols, len(cols))
+        n_baseline = self._baseline_singling_out(ori, syn, n_attacks, baseline_cols)
+
+        n_control = None
+        if control is not None:
+            n_control = float(self._singling_out_successes(control, queries))
+            # Mesma correção do anonymeter quando o controle tem outro tamanho
+            if len(control) != len(ori):
+                model = self._fit_correction(control, queries)
+                n_control *= model(len(ori)) / model(len(control))
+        return _counts(n_attacks, n_success, n_baseline, n_control)
+
+    def _univariate_queries(self, syn, n_queries):
+        """Valores que aparecem uma única vez numa coluna do sintético, embaralhados."""
+        queries = []
+        for j in range(syn.shape[1]):
+            values, counts = np.unique(syn[:, j], return_counts=True)
+            queries += [((j,), (v,)) for v in values[counts == 1]]
+        order = self.rng.permutation(len(queries))
+        return [queries[i] for i in order[:n_queries]]
+
+    def _multivariate_queries(self, syn, n_queries, n_cols, max_attempts, batch_size=1000):
+        """
+        Registros e colunas sorteados do sintético; fica a consulta (igualdade nas colunas)
+        que isola exatamente um registro dele. As contagens no sintético de cada combinação
+        de colunas são calculadas uma vez, então cada lote é só uma consulta de tabela.
+        """
+        n_rows, n_total_cols = syn.shape
+        if max_attempts is not None:
+            batch_size = min(batch_size, max_attempts)
+        n_subsets = math.comb(n_total_cols, n_cols)
+        unique_in_syn = {}  # colunas -> linhas do sintético isoladas pelos seus próprios valores
+        seen, queries = set(), []
+        attempts = 0
+        while len(queries) < n_queries and n_rows:
+            # Todas as consultas possíveis já saíram: novas tentativas só repetiriam
+            if len(unique_in_syn) == n_subsets and len(seen) >= sum(int(v.sum()) for v in unique_in_syn.values()):
+                break
+            if max_attempts is not None and attempts >= max_attempts:
+                break
+            rows = self.rng.integers(0, n_rows, size=batch_size)
+            chosen = np.sort(np.argsort(self.rng.random((batch_size, n_total_cols)), axis=1)[:, :n_cols], axis=1)
+            groups = _row_keys(list(chosen.T))
+            singles = np.zeros(batch_size, dtype=bool)
+            for group in np.unique(groups):
+                members = np.flatnonzero(groups == group)
+                subset = tuple(int(j) for j in chosen[members[0]])
+                if subset not in unique_in_syn:
+                    keys = _row_keys([syn[:, j] for j in subset])
+                    unique_in_syn[subset] = _counts_of(keys, keys) == 1
+                singles[members] = unique_in_syn[subset][rows[members]]
+            for i in np.flatnonzero(singles):
+                subset = tuple(int(j) for j in chosen[i])
+                # A consulta isola a linha, então (colunas, linha) a identifica
+                if (subset, int(rows[i])) in seen:
+                    continue
+                seen.add((subset, int(rows[i])))
+                queries.append((subset, tuple(syn[rows[i], list(subset)])))
+                if len(queries) >= n_queries:
+                    break
+            attempts += batch_size
+        if len(queries) < n_queries:
+            print(f"[ATTACK] Singling Out: só {len(queries)} de {n_queries} consultas isolam um registro do sintético")
+        return queries
+
+    @staticmethod
+    def _group_queries(queries):
+        groups = {}
+        for k, (subset, values) in enumerate(queries):
+            groups.setdefault(subset, ([], []))
+            groups[subset][0].append(k)
+            groups[subset][1].append(values)
+        return groups
+
+    def _query_counts(self, data, queries):
+        counts = np.zeros(len(queries), dtype=np.int64)
+        for subset, (positions, values) in self._group_queries(queries).items():
+            counts[positions] = _count_equal(data, list(subset), np.array(values, dtype=np.int64))
+        return counts
+
+    def _singling_out_successes(self, data, queries):
+        return int((self._query_counts(data, queries) == 1).sum()) if queries else 0
+
+    def _baseline_singling_out(self, ori, syn, n_attacks, n_cols):
+        """
+        Consultas aleatórias (valor sorteado entre os do sintético, operador == ou !=).
+        A contagem de uma conjunção com != sai por inclusão-exclusão sobre as colunas negadas:
+        #(A e não B) = #(A) - #(A e B).
+        """
+        n_total_cols = syn.shape[1]
+        uniques = [np.unique(syn[:, j]) for j in range(n_total_cols)]
+        counts = np.zeros(n_attacks, dtype=np.int64)
+        terms = []  # (ataque, sinal, colunas, valores)
+        for k in range(n_attacks):
+            subset = sorted(self.rng.choice(n_total_cols, size=n_cols, replace=False).tolist())
+            values, negated = {}, []
+            for j in subset:
+                values[j] = int(self.rng.choice(uniques[j]))
+                if self.rng.random() < 0.5:
+                    negated.append(j)
+            equal = [j for j in subset if j not in negated]
+            for r in range(len(negated) + 1):
+                for extra in itertools.combinations(negated, r):
+                    term_cols = tuple(sorted(equal + list(extra)))
+                    terms.append((k, (-1) ** r, term_cols, tuple(values[j] for j in term_cols)))
+        term_counts = self._query_counts(ori, [(cols, vals) for _, _, cols, vals in terms])
+        for (k, sign, _, _), count in zip(terms, term_counts):
+            counts[k] += sign * count
+        return int((counts == 1).sum())
+
+    def _fit_correction(self, control, queries, n_repeat=5, n_meas=10):
+        """Modelo de quantas consultas isolam alguém em função do tamanho do frame (Cohen e Nissim)."""
+        from scipy.optimize import curve_fit
+
+        def integral(n, w_min, w_max):
+            return ((n * w_min + 1) * (1 - w_min) ** n - (n * w_max + 1) * (1 - w_max) ** n) / (n + 1)
+
+        def model(x, w_eff, norm):
+            return norm * integral(x, 0, w_eff)
+
+        sizes, successes = [], []
+        for n_rows in np.linspace(min(1000, len(control)), len(control), n_meas).astype(int):
+            for _ in range(n_repeat):
+                sample = control[self.rng.choice(len(control), size=n_rows, replace=False)]
+                successes.append(self._singling_out_successes(sample, queries))
+                sizes.append(n_rows)
+        sizes, successes = np.array(sizes), np.array(successes)
+        w_guess = 1 / np.max(sizes)
+        norm_guess = 1 / integral(np.max(sizes), 0, w_guess)
+        popt, _ = curve_fit(model, xdata=sizes, ydata=successes, bounds=(0, (1, np.inf)), p0=(w_guess, norm_guess))
+        return lambda x: model(x, *popt)
+
+    # --- LINKABILITY ---
+
+    def linkability(self, aux_cols, n_attacks=500, n_neighbors=1):
+        cols_a, cols_b = list(aux_cols[0]), list(aux_cols[1])
+        n_attacks = min(n_attacks, len(self.ori))
+        n_syn = len(self.syn)
+        k = min(n_neighbors, n_syn)
+
+        # Baseline: dois conjuntos de k sintéticos sorteados por alvo
+        random_a = np.array([self.rng.choice(n_syn, size=k, replace=False) for _ in range(n_attacks)])
+        random_b = np.array([self.rng.choice(n_syn, size=k, replace=False) for _ in range(n_attacks)])
+        n_baseline = _count_links(random_a, random_b)
+
+        n_success = self._link(self.ori, cols_a, cols_b, n_attacks, k)
+        n_control = None
+        if self.control is not None:
+            n_control = self._link(self.control, cols_a, cols_b, min(n_attacks, len(self.control)), k)
+        return _counts(n_attacks, n_success, n_baseline, n_control)
+
+    def _link(self, frame, cols_a, cols_b, n_attacks, k):
+        targets = self.rng.choice(len(frame), size=n_attacks, replace=False)
+        idx_a = nearest_neighbors(_matrix(self.syn, cols_a), _matrix(frame, cols_a)[targets], k, self.rng)
+        idx_b = nearest_neighbors(_matrix(self.syn, cols_b), _matrix(frame, cols_b)[targets], k, self.rng)
+        return _count_links(idx_a, idx_b)
+
+    # --- INFERENCE ---
+
+    def inference(self, aux_cols, secret, n_attacks=500, regression=False):
+        if regression:
+            raise ValueError("O motor nativo só faz inferência categórica (regression=False)")
+        if secret not in self.columns:
+            raise ValueError(f"Coluna secreta '{secret}' não encontrada")
+        aux_cols = list(aux_cols)
+        n_ori = min(n_attacks, len(self.ori))
+        n_base = min(len(self.syn), n_ori)
+        n_ctrl = -1 if self.control is None else min(n_attacks, len(self.control))
+
+        # Baseline: segredos de registros sintéticos sorteados, sem olhar os auxiliares
+        targets = self.rng.choice(len(self.ori), size=n_base, replace=False)
+        guesses = self.syn.codes[secret][self.rng.choice(len(self.syn), size=n_base, replace=False)]
+        n_baseline = int((guesses == self.ori.codes[secret][targets]).sum())
+
+        n_success = self._infer(self.ori, aux_cols, secret, n_ori)
+        n_control = None if self.control is None else self._infer(self.control, aux_cols, secret, n_ctrl)
+        return _counts(n_ori, n_success, n_baseline, n_control, n_attacks_baseline=n_base, n_attacks_control=n_ctrl)
+
+    def _infer(self, frame, aux_cols, secret, n_attacks):
+        """Palpite = segredo do sintético mais próximo nos auxiliares."""
+        targets = self.rng.choice(len(frame), size=n_attacks, replace=False)
+        nearest = nearest_neighbors(_matrix(self.syn, aux_cols), _matrix(frame, aux_cols)[targets], 1, self.rng)[:, 0]
+        return int((self.syn.codes[secret][nearest] == frame.codes[secret][targets]).sum())
+
+def _count_links(idx_a, idx_b):
+    """Alvos cujas duas metades têm ao menos um vizinho sintético em comum."""
+    if idx_a.shape[1] == 1:
+        return int((idx_a[:, 0] == idx_b[:, 0]).sum())
+    return sum(bool(set(a) & set(b)) for a, b in zip(idx_a.tolist(), idx_b.tolist()))
+
+def run_attack(kind, ori, syn, control=None, mode=None, seed=None, **params):
+    """Ponto de entrada do audit_executor: roda um ataque e devolve as contagens brutas."""
+    engine = AttackEngine(ori, syn, control=control, seed=seed)
+    if kind == "singling_out":
+        return engine.singling_out(mode=mode or "multivariate", **params)
+    if kind == "linkability":
+        return engine.linkability(**params)
+    return engine.inference(**params)
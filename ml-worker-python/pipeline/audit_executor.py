@@ -0,0 +1,305 @@
+import os
+import uuid
+import threading
+import warnings
+import multiprocessing as mp
+from typing import NamedTuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pyarrow as pa
+
+from .attacks import run_attack, success_rate, residual_success
+from .encoded import EncodedFrame
+from .transport import share_table, read_shared_table
+from .tracing import measure, merge_usage
+
+# Processos do pool de auditoria (0 ou 1 = execução sequencial no próprio processo)
+AUDIT_WORKERS = int(os.environ.get("AUDIT_WORKERS", str(min(3, os.cpu_count() or 1))))
+
+ATTACK_KINDS = ("singling_out", "linkability", "inference")
+
+# Quem executa os ataques: o anonymeter (padrão) ou, se pedido, o motor vetorizado de pipeline/attacks.py
+ATTACK_ENGINES = ("anonymeter", "native")
+AUDIT_ENGINE = os.environ.get("AUDIT_ENGINE", "anonymeter")
+
+def attack_task(kind, name=None, ori="ori", syn="syn", control=None, engine=None, **params):
+    """
+    Descreve um ataque do anonymeter. `ori`, `syn` e `control` são chaves do dict de frames
+    passado ao executor; `params` vai para o construtor do avaliador (n_attacks, aux_cols, secret...),
+    menos `mode` (univariate/multivariate do Singling Out), que vai para o evaluate().
+    `engine` escolhe entre o anonymeter e o motor nativo (padrão: AUDIT_ENGINE).
+    """
+    if kind not in ATTACK_KINDS:
+        raise ValueError(f"Ataque desconhecido: {kind}")
+    engine = engine or AUDIT_ENGINE
+    if engine not in ATTACK_ENGINES:
+        raise ValueError(f"Motor de auditoria desconhecido: {engine}")
+    return {"kind": kind, "name": name or kind, "ori": ori, "syn": syn, "control": control,
+            "engine": engine, "params": params}
+
+class AdaptiveRisk(NamedTuple):
+    """Risco de uma auditoria sequencial e a precisão efetivamente alcançada."""
+    risk: object          # PrivacyRisk (value, ci)
+    n_attacks: int        # Ataques usados (soma dos lotes)
+    ci_width: float
+    converged: bool       # True se o IC ficou abaixo da largura alvo antes do orçamento acabar
+
+def _evaluate(task, frames):
+    """Roda o ataque (anonymeter ou motor nativo) e devolve as contagens brutas de sucesso."""
+    kind, params = task["kind"], dict(task["params"])
+    ori, syn = frames[task["ori"]], frames[task["syn"]]
+    control = frames[task["control"]] if task["control"] else None
+
+    if task.get("engine", "anonymeter") == "native":
+        return run_attack(kind, ori, syn, control=control, **params)
+
+    from anonymeter.evaluators import SinglingOutEvaluator, LinkabilityEvaluator, InferenceEvaluator
+    warnings.filterwarnings("ignore")
+    # O anonymeter só trabalha com texto
+    ori, syn = (f.to_frame() if isinstance(f, EncodedFrame) else f for f in (ori, syn))
+    if isinstance(control, EncodedFrame):
+        control = control.to_frame()
+
+    if kind == "singling_out":
+        mode = params.pop("mode", "multivariate")
+        evaluator = SinglingOutEvaluator(ori=ori, syn=syn, control=control, **params)
+        evaluator.evaluate(mode=mode)
+    elif kind == "linkability":
+        evaluator = LinkabilityEvaluator(ori=ori, syn=syn, control=control, **params)
+        # Paralelismo vem do pool de auditoria; joblib interno só competiria pelos mesmos núcleos
+        evaluator.evaluate(n_jobs=1)
+    else:
+        evaluator = InferenceEvaluator(ori=ori, syn=syn, control=control, **params)
+        evaluator.evaluate()
+
+    # Contagens (e não o PrivacyRisk) para que lotes sucessivos possam ser somados
+    res = evaluator.results()
+    n_ori = getattr(res, "n_attacks_ori", None) or getattr(res, "n_attacks", 0)
+    return {
+        "n_attacks": n_ori,
+        "n_attacks_baseline": getattr(res, "n_attacks_baseline", n_ori),
+        "n_attacks_control": getattr(res, "n_attacks_control", n_ori),
+        "n_success": res.n_success,
+        "n_baseline": res.n_baseline,
+        "n_control": res.n_control,
+    }
+
+def merge_counts(total, counts):
+    if total is None:
+        return dict(counts)
+    merged = {k: total[k] + counts[k] for k in total if k != "n_control"}
+    merged["n_control"] = None if total["n_control"] is None else total["n_control"] + counts["n_control"]
+    return merged
+
+def risk_from_counts(counts, confidence_level=0.95):
+    """Mesmo cálculo do EvaluationResults.risk() do anonymeter (IC de Wilson), a partir das contagens."""
+    attack_rate = success_rate(n_total=counts["n_attacks"], n_success=counts["n_success"],
+                               confidence_level=confidence_level)
+    if counts["n_control"] is None:
+        return attack_rate.to_risk()
+    control_rate = success_rate(n_total=counts["n_attacks_control"], n_success=counts["n_control"],
+                                confidence_level=confidence_level)
+    return residual_success(attack_rate=attack_rate, control_rate=control_rate).to_risk()
+
+# --- MEMÓRIA COMPARTILHADA ---
+
+def _share_frame(df):
+    """
+    Serializa o frame uma única vez, em Arrow IPC, num bloco de memória compartilhada.
+    Um EncodedFrame vai como colunas de dicionário (códigos + vocabulário, sem os rótulos por linha).
+    """
+    encoded = isinstance(df, EncodedFrame)
+    table = df.to_arrow() if encoded else pa.Table.from_pandas(df, preserve_index=False)
+    shm, meta = share_table(table, name=f"audit_{uuid.uuid4().hex[:16]}")
+    return shm, {**meta, "encoded": encoded}
+
+def _read_shared_frame(meta):
+    # Uma cópia dos bytes por worker: o DataFrame não pode apontar para um bloco que será liberado
+    table = read_shared_table(meta)
+    return EncodedFrame.from_arrow(table) if meta.get("encoded") else table.to_pandas()
+
+# --- LADO DO WORKER ---
+
+_frame_cache = {}
+
+def _init_audit_worker(threads_per_worker):
+    # Antes de importar anonymeter/polars: limita os threads internos de cada processo
+    for var in ("POLARS_MAX_THREADS", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads_per_worker))
+
+def _run_shared_task(task, frame_metas):
+    # Frames de auditorias anteriores não servem mais (os blocos já foram liberados)
+    live = {meta["name"] for meta in frame_metas.values()}
+    for name in list(_frame_cache):
+        if name not in live:
+            del _frame_cache[name]
+
+    frames = {}
+    for key in {task["ori"], task["syn"], task["control"]} - {None}:
+        meta = frame_metas[key]
+        if meta["name"] not in _frame_cache:
+            _frame_cache[meta["name"]] = _read_shared_frame(meta)
+        frames[key] = _frame_cache[meta["name"]]
+
+    # O worker roda uma tarefa por vez: CPU e pico de RSS do processo são os do ataque
+    with measure() as usage:
+        counts = _evaluate(task, frames)
+    return task["name"], counts, usage
+
+# --- EXECUTOR ---
+
+class AuditExecutor:
+    """
+    Distribui ataques independentes (e colunas secretas) por um pool de processos.
+    Os frames são serializados uma vez em memória compartilhada; cada worker os lê
+    uma vez por auditoria, em vez de receber uma cópia serializada por tarefa.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = AUDIT_WORKERS if max_workers is None else max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=mp.get_context("spawn"),
+                    initializer=_init_audit_worker,
+                    initargs=(threads,),
+                )
+            return self._pool
+
+    @contextmanager
+    def _session(self, frames, tasks):
+        """
+        Prepara os frames uma única vez (memória compartilhada no modo pool) e devolve
+        `execute(lote, callback)`, que roda um lote de tarefas chamando
+        `callback(nome, contagens, uso)` a cada conclusão, com `uso` no formato de
+        tracing.measure (wall_sec, cpu_sec, peak_rss_mb). Ataques que falham são logados.
+        """
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            def execute_inline(batch, callback):
+                for task in batch:
+                    try:
+                        with measure() as usage:
+                            counts = _evaluate(task, frames)
+                    except Exception as e:
+                        print(f"[AUDIT] Falha no ataque {task['name']}: {e}")
+                        continue
+                    callback(task["name"], counts, usage)
+            yield execute_inline
+            return
+
+        used = {task["ori"] for task in tasks} | {task["syn"] for task in tasks} | \
+               {task["control"] for task in tasks if task["control"]}
+        blocks, metas = [], {}
+        try:
+            for key in used:
+                shm, metas[key] = _share_frame(frames[key])
+                blocks.append(shm)
+            pool = self._get_pool()
+
+            def execute_pool(batch, callback):
+                futures = {pool.submit(_run_shared_task, task, metas): task["name"] for task in batch}
+                for future in as_completed(futures):
+                    try:
+                        name, counts, usage = future.result()
+                    except Exception as e:
+                        print(f"[AUDIT] Falha no ataque {futures[future]}: {e}")
+                        continue
+                    callback(name, counts, usage)
+            yield execute_pool
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def run(self, frames, tasks, progress_cb=None, confidence_level=0.95, usage=None):
+        """
+        Executa as tarefas e devolve {nome: PrivacyRisk}. Ataques que falham ficam de fora
+        do resultado. `progress_cb(nome, risk, segundos)` é chamado a cada conclusão.
+        Com o dict `usage`, o tempo/CPU/pico de RSS de cada ataque é gravado nele por nome.
+        """
+        results = {}
+
+        def collect(name, counts, task_usage):
+            results[name] = risk_from_counts(counts, confidence_level)
+            if usage is not None:
+                usage[name] = task_usage
+            if progress_cb is not None:
+                progress_cb(name, results[name], task_usage["wall_sec"])
+
+        with self._session(frames, tasks) as execute:
+            execute(tasks, collect)
+        # Mesma ordem das tarefas, independente da ordem de conclusão
+        return {task["name"]: results[task["name"]] for task in tasks if task["name"] in results}
+
+    def run_adaptive(self, frames, tasks, target_ci_width=0.05, batch_size=100, max_attacks=1000,
+                     confidence_level=0.95, progress_cb=None, usage=None):
+        """
+        Auditoria sequencial: roda lotes de `batch_size` ataques, soma as contagens e para cada
+        ataque quando a largura do IC fica <= `target_ci_width` ou o orçamento `max_attacks`
+        acaba. Devolve {nome: AdaptiveRisk}; `progress_cb(nome, AdaptiveRisk, segundos)`.
+        `usage` como em run(), somado sobre os lotes.
+        """
+        totals = {task["name"]: None for task in tasks}
+        spent = {task["name"]: None for task in tasks}
+        results = {}
+        active = list(tasks)
+
+        def accumulate(name, counts, task_usage):
+            totals[name] = merge_counts(totals[name], counts)
+            spent[name] = merge_usage(spent[name], task_usage)
+
+        with self._session(frames, tasks) as execute:
+            while active:
+                batch, before = [], {}
+                for task in active:
+                    before[task["name"]] = totals[task["name"]]["n_attacks"] if totals[task["name"]] else 0
+                    n = min(batch_size, max_attacks - before[task["name"]])
+                    batch.append({**task, "params": {**task["params"], "n_attacks": n}})
+                execute(batch, accumulate)
+
+                still_active = []
+                for task in active:
+                    name, counts = task["name"], totals[task["name"]]
+                    if counts is None or counts["n_attacks"] == 0:
+                        continue  # Ataque falhou no primeiro lote
+                    risk = risk_from_counts(counts, confidence_level)
+                    width = risk.ci[1] - risk.ci[0]
+                    converged = width <= target_ci_width
+                    # Sem ataques novos neste lote (falha ou dados esgotados): encerra com o que tem
+                    stalled = counts["n_attacks"] == before[name]
+                    if converged or stalled or counts["n_attacks"] >= max_attacks:
+                        results[name] = AdaptiveRisk(risk, counts["n_attacks"], width, converged)
+                        if usage is not None:
+                            usage[name] = spent[name]
+                        if progress_cb is not None:
+                            progress_cb(name, results[name], spent[name]["wall_sec"])
+                    else:
+                        still_active.append(task)
+                active = still_active
+
+        return {task["name"]: results[task["name"]] for task in tasks if task["name"] in results}
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+_SHARED_EXECUTOR = None
+_SHARED_EXECUTOR_LOCK = threading.Lock()
+
+def get_audit_executor():
+    """Pool de auditoria compartilhado pelo processo (os workers mantêm anonymeter importado)."""
+    global _SHARED_EXECUTOR
+    if _SHARED_EXECUTOR is None:
+        with _SHARED_EXECUTOR_LOCK:
+            if _SHARED_EXECUTOR is None:
+                _SHARED_EXECUTOR = AuditExecutor()
+    return _SHARED_EXECUTOR
@@ -0,0 +1,204 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Versão do layout do sidecar .encoded.parquet (incrementar ao mudar os metadados)
+ENCODED_FORMAT_VERSION = 1
+_META_VERSION = b"encoded_format_version"
+_META_FINGERPRINT = b"encoded_fingerprint"
+_META_EXTRA = b"encoded_metadata"
+
+def encoded_path(dataset_path, variant=None):
+    """Sidecar ao lado do dataset, como o stats_path: base.parquet -> base[.variant].encoded.parquet."""
+    base = os.path.splitext(dataset_path)[0]
+    return f"{base}.{variant}.encoded.parquet" if variant else f"{base}.encoded.parquet"
+
+def code_dtype(cardinality):
+    """Menor inteiro com sinal que comporta os códigos (-1 fica reservado para desconhecido)."""
+    return np.int16 if cardinality < np.iinfo(np.int16).max else np.int32
+
+def factorize_str(values):
+    """
+    Códigos e rótulos em texto de uma coluna, iguais aos de values.astype(str) (NaN vira
+    'nan', e None também), mas convertendo só os valores distintos: 2 e '2' caem no mesmo rótulo.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    label_codes, labels = pd.factorize(pd.Series(uniques, dtype=object).astype(str).to_numpy())
+    return label_codes[codes], np.asarray(labels, dtype=object)
+
+class EncodedFrame:
+    """
+    Representação canônica de um frame categórico: por coluna, um array de códigos
+    int16/int32 e o vocabulário (rótulos em texto) a que eles apontam. Frames codificados
+    juntos (encode_shared, encode) compartilham o vocabulário, então os códigos já servem
+    direto de features (sklearn) e de chaves de contagem sem novo LabelEncoder/astype(str).
+    """
+
+    def __init__(self, codes, vocab, index=None, metadata=None):
+        self.codes = dict(codes)
+        self.vocab = dict(vocab)
+        n_rows = len(next(iter(self.codes.values()))) if self.codes else 0
+        self.index = pd.RangeIndex(n_rows) if index is None else index
+        self.metadata = dict(metadata or {})  # Gravado no sidecar junto com os códigos (JSON)
+
+    @property
+    def columns(self):
+        return list(self.codes)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.codes.values())
+
+    @classmethod
+    def from_frame(cls, df, columns=None, sort=False):
+        return encode_shared([df], columns=columns, sort=sort)[0]
+
+    # --- RECODIFICAÇÃO ---
+
+    def encode(self, df, unseen=-1):
+        """Codifica outro frame no vocabulário deste (ver encode_frame)."""
+        return encode_frame(df, self.vocab, unseen=unseen)
+
+    def select(self, columns):
+        return EncodedFrame({c: self.codes[c] for c in columns}, {c: self.vocab[c] for c in columns},
+                            index=self.index)
+
+    def drop(self, columns):
+        return self.select([c for c in self.columns if c not in set(columns)])
+
+    def take(self, rows):
+        rows = np.asarray(rows)
+        return EncodedFrame({c: v[rows] for c, v in self.codes.items()}, self.vocab, index=self.index[rows])
+
+    def sample(self, n, random_state=42):
+        """Mesmas linhas que DataFrame.sample(n, random_state) escolheria."""
+        rows = np.random.RandomState(random_state).permutation(len(self))[:n]
+        return self.take(rows)
+
+    # --- SAÍDAS ---
+
+    def codes_frame(self, columns=None):
+        """DataFrame de códigos inteiros (features dos modelos de ML)."""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({c: self.codes[c] for c in columns}, index=self.index)
+
+    def matrix(self, columns=None):
+        """Matriz n x d de códigos (int32), para buscas de vizinhos e contagens por padrão."""
+        columns = self.columns if columns is None else columns
+        if not columns:
+            return np.zeros((len(self), 0), dtype=np.int32)
+        return np.column_stack([self.codes[c].astype(np.int32, copy=False) for c in columns])
+
+    def to_frame(self, columns=None):
+        """Frame de texto (object), para quem precisa dos rótulos (AIM, anonymeter, Presidio)."""
+        columns = self.columns if columns is None else columns
+        data = {}
+        for col in columns:
+            # Rótulo extra no fim: códigos -1 (desconhecidos) decodificam como NaN
+            labels = np.append(self.vocab[col], np.nan).astype(object)
+            data[col] = labels[self.codes[col]]
+        return pd.DataFrame(data, index=self.index)
+
+    # --- SIDECAR PARQUET ---
+
+    def to_arrow(self):
+        arrays = []
+        for col in self.columns:
+            codes = self.codes[col]
+            indices = pa.array(codes, mask=codes < 0)
+            arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(self.vocab[col], type=pa.string())))
+        return pa.Table.from_arrays(arrays, names=self.columns)
+
+    @classmethod
+    def from_arrow(cls, table):
+        codes, vocab = {}, {}
+        table = table.unify_dictionaries().combine_chunks()
+        for name, column in zip(table.column_names, table.columns):
+            array = column.chunk(0) if column.num_chunks else pa.array([], type=pa.string())
+            if not pa.types.is_dictionary(array.type):
+                array = array.dictionary_encode()
+            vocab[name] = np.asarray(array.dictionary.to_pylist(), dtype=object)
+            dtype = code_dtype(len(vocab[name]))
+            codes[name] = array.indices.fill_null(-1).to_numpy(zero_copy_only=False).astype(dtype)
+        return cls(codes, vocab)
+
+    def save(self, path, fingerprint=None):
+        """Parquet com as colunas como dicionário: os vocabulários vão uma vez por row group."""
+        table = self.to_arrow()
+        metadata = {_META_VERSION: str(ENCODED_FORMAT_VERSION).encode(),
+                    _META_EXTRA: json.dumps(self.metadata, ensure_ascii=False).encode("utf-8")}
+        if fingerprint:
+            metadata[_META_FINGERPRINT] = fingerprint.encode()
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, use_dictionary=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, columns=None, fingerprint=None):
+        """Lê o sidecar; retorna None se for de outra versão ou de outro dado (`fingerprint`)."""
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(_META_VERSION) != str(ENCODED_FORMAT_VERSION).encode():
+            return None
+        if fingerprint and metadata.get(_META_FINGERPRINT) != fingerprint.encode():
+            return None
+        names = pq.read_schema(path).names if columns is None else columns
+        encoded = cls.from_arrow(pq.read_table(path, columns=names, read_dictionary=names))
+        encoded.metadata = json.loads(metadata.get(_META_EXTRA, b"{}").decode("utf-8"))
+        return encoded
+
+def sidecar_metadata(path):
+    """Metadados extras gravados no sidecar (ex.: colunas PII detectadas), sem ler os códigos."""
+    metadata = pq.read_schema(path).metadata or {}
+    return json.loads(metadata.get(_META_EXTRA, b"{}").decode("utf-8"))
+
+def _column_codes(frame, col):
+    # Um EncodedFrame já está fatorado: nenhuma passada sobre as linhas
+    if isinstance(frame, EncodedFrame):
+        return frame.codes[col], frame.vocab[col]
+    return factorize_str(frame[col])
+
+def _remap(local, labels, index, dtype, unseen=-1):
+    """Traduz códigos locais para as posições de `labels` em `index` (-1 segue -1)."""
+    remap = index.get_indexer(labels)
+    remap[remap < 0] = unseen
+    return np.append(remap, -1).astype(dtype)[local]
+
+def encode_frame(df, vocab, unseen=-1):
+    """
+    Codifica df (DataFrame ou EncodedFrame) num vocabulário já fixado ({coluna: rótulos}).
+    Rótulos desconhecidos recebem o código `unseen` (-1 por padrão).
+    """
+    codes = {}
+    for col, labels_ref in vocab.items():
+        local, labels = _column_codes(df, col)
+        codes[col] = _remap(local, labels, pd.Index(labels_ref, dtype=object),
+                            code_dtype(len(labels_ref)), unseen=unseen)
+    return EncodedFrame(codes, vocab, index=df.index)
+
+def encode_shared(frames, columns=None, sort=False):
+    """
+    Codifica vários frames (DataFrames ou EncodedFrames) com um vocabulário comum por coluna:
+    a união dos rótulos. Com `sort`, o vocabulário é ordenado e os códigos ficam iguais aos
+    de um LabelEncoder ajustado na concatenação dos frames convertida para texto.
+    """
+    if columns is None:
+        columns = [c for c in frames[0].columns if all(c in df.columns for df in frames)]
+    codes = [{} for _ in frames]
+    vocab = {}
+    for col in columns:
+        parts = [_column_codes(df, col) for df in frames]
+        union = pd.Index(np.concatenate([labels for _, labels in parts]), dtype=object).unique()
+        if sort:
+            union = union.sort_values()
+        vocab[col] = np.asarray(union, dtype=object)
+        for k, (local, labels) in enumerate(parts):
+            codes[k][col] = _remap(local, labels, union, code_dtype(len(union)))
+    return [EncodedFrame(c, vocab, index=df.index) for c, df in zip(codes, frames)]
@@ -1,187 +1,820 @@
 import pandas as pd
 import torch
 import os
+import re
+import threading
 import csv
 import datetime
 import time
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import joblib
 import itertools
-from scipy.spatial.distance import jensenshannon
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from synthcity.plugins import Plugins
-from presidio_analyzer import AnalyzerEngine, PatternRecognizer, Pattern
+from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine, PatternRecognizer, Pattern
 from presidio_analyzer.nlp_engine import NlpEngineProvider
 
 # Importação do wrangler ajustado
-from .wrangling_tse import apply_wrangling
+from .wrangling_tse import apply_wrangling, TSEDataWrangler, WRANGLER_ARTIFACT_VERSION, WRANGLER_CACHE_DIR
+from .loader import load_tse_sample
+from .transport import DATASET_SCHEME
+from .fingerprint import dataset_fingerprint
+from .model_cache import ModelCache
+from .jobs import JobCancelled
+from .executor import in_engine_worker, engine_cpu_budget
+from .utility import utility_report, utility_report_from_stats, summarize_utility
+from .neighbors import distance_report, summarize_distance
+from .epsilon_search import EpsilonBracket, EPSILON_SEARCH_MAX
+from .stats_store import load_or_build, stats_path, CLEAN_VARIANT
+from .tracing import StageTracer, STAGE_METRICS_LOG, STAGE_FIELDS
+from .encoded import EncodedFrame, encoded_path
+from .marginal_synth import MarginalSynthesizer
 
-class PrivacyEngine:
-    def __init__(self):
-        # 1. Configuração do motor NLP para detecção de PII
-        configuration = {
-            "nlp_engine_name": "spacy",
-            "models": [
-                {"lang_code": "pt", "model_name": "pt_core_news_lg"},
-                {"lang_code": "en", "model_name": "en_core_web_lg"}
-            ],
-            "ner_model_configuration": {
-                "labels_to_ignore": ["MISC", "ORG", "PER", "LOC"] 
-            }
+# Fração do job concluída ao fim de cada etapa (o treino domina o tempo total;
+# o restante até 1.0 fica para a auditoria feita pelo serviço)
+PIPELINE_PROGRESS = {
+    "load": 0.05,
+    "wrangle": 0.15,
+    "search": 0.55,
+    "fit": 0.60,
+    "generate": 0.68,
+    "utility": 0.72,
+    "distance": 0.74,
+    "save": 0.75,
+}
+
+# Contagens de 1 e 2 vias do dado limpo, salvas ao lado do dataset de entrada.
+# Opcional ("1" liga): por padrão nada é gravado no diretório do dado
+DATASET_STATS = os.environ.get("DATASET_STATS", "0") == "1"
+# Dado limpo codificado (códigos + vocabulário) em um .encoded.parquet ao lado da entrada:
+# execuções seguintes com o mesmo dado pulam o wrangling e a detecção de PII ("1" liga)
+DATASET_ENCODED = os.environ.get("DATASET_ENCODED", "0") == "1"
+
+# Diretório dos sintéticos gerados (servidos também pelo DownloadResult)
+OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "output")
+
+# Acima deste número de linhas o sintético é gerado em lotes, cada um gravado como
+# um row group do Parquet de saída (memória constante para qualquer tamanho pedido)
+GENERATION_CHUNK_ROWS = int(os.environ.get("GENERATION_CHUNK_ROWS", "50000"))
+
+# Histórico de execuções em CSV (opcional: vazio desativa; ex.: EXPERIMENTS_LOG=experiments_log.csv)
+EXPERIMENTS_LOG = os.environ.get("EXPERIMENTS_LOG", "")
+
+# Processos do sweep de epsilons (0 = automático: 1 com GPU ou dentro de um worker do modo
+# 'process', senão um por epsilon até os núcleos da execução, ver executor.engine_cpu_budget)
+SWEEP_WORKERS = int(os.environ.get("SWEEP_WORKERS", "0"))
+# Colunas fixas do CSV do sweep; `evaluate` pode acrescentar outras na primeira linha
+SWEEP_FIELDS = ["timestamp", "dataset_hash", "epsilon", "util_marginal", "util_joint",
+                "train_sec", "gen_sec", "rows", "output_path"]
+
+# Regex de CPF compartilhada entre o reconhecedor do Presidio e a varredura vetorizada
+CPF_REGEX = r"\d{3}\.\d{3}\.\d{3}-\d{2}|\d{11}"
+# Mesmas flags globais aplicadas pelo PatternRecognizer do Presidio
+PRESIDIO_REGEX_FLAGS = re.DOTALL | re.MULTILINE | re.IGNORECASE
+
+# Motor de síntese: "aim" (plugin do synthcity) ou "marginal" (MarginalSynthesizer, NumPy em CPU)
+SYNTH_ENGINES = ("aim", "marginal")
+SYNTH_ENGINE = os.environ.get("SYNTH_ENGINE", "aim")
+
+# Modelos AIM treinados, chaveados por (hash do dado limpo, hiperparâmetros), com LRU em disco
+MODEL_CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", os.path.join("models", "aim_cache"))
+MODEL_CACHE_MAX_MB = int(os.environ.get("MODEL_CACHE_MAX_MB", "2048"))
+
+# Perfis do motor NLP. "full" replica a configuração histórica (pt + en);
+# "pt_only" carrega só o modelo português, que é o único idioma usado na análise.
+NLP_PROFILES = {
+    "full": [
+        {"lang_code": "pt", "model_name": "pt_core_news_lg"},
+        {"lang_code": "en", "model_name": "en_core_web_lg"}
+    ],
+    "pt_only": [
+        {"lang_code": "pt", "model_name": "pt_core_news_lg"}
+    ],
+}
+NER_LABELS_TO_IGNORE = ["MISC", "ORG", "PER", "LOC"]
+# Componentes do spaCy removidos no perfil "pt_only": o parser não é lido pelo Presidio
+# e todos os rótulos do NER português já são ignorados acima.
+PT_ONLY_DISABLED_PIPES = ["parser", "ner"]
+
+# Um único AnalyzerEngine por perfil e por processo, construído sob demanda
+_ANALYZERS = {}
+_ANALYZERS_LOCK = threading.Lock()
+
+def get_shared_analyzer(profile="full"):
+    """Retorna o analyzer do perfil, carregando os modelos spaCy só na primeira chamada."""
+    analyzer = _ANALYZERS.get(profile)
+    if analyzer is None:
+        with _ANALYZERS_LOCK:
+            analyzer = _ANALYZERS.get(profile)
+            if analyzer is None:
+                analyzer = _build_analyzer(profile)
+                _ANALYZERS[profile] = analyzer
+    return analyzer
+
+def _build_analyzer(profile):
+    """Configuração do motor NLP para detecção de PII."""
+    if profile not in NLP_PROFILES:
+        raise ValueError(f"Perfil NLP desconhecido: {profile}. Use um de {list(NLP_PROFILES)}")
+
+    print(f"[NLP] Carregando modelos spaCy (perfil: {profile})...")
+    start = time.perf_counter()
+    configuration = {
+        "nlp_engine_name": "spacy",
+        "models": NLP_PROFILES[profile],
+        "ner_model_configuration": {
+            "labels_to_ignore": NER_LABELS_TO_IGNORE
         }
-        
-        provider = NlpEngineProvider(nlp_configuration=configuration)
-        nlp_engine = provider.create_engine()
-        self.analyzer = AnalyzerEngine(nlp_engine=nlp_engine, default_score_threshold=0.4)
-        
-        self._add_cpf_recognizer()
+    }
+
+    provider = NlpEngineProvider(nlp_configuration=configuration)
+    nlp_engine = provider.create_engine()
+    if profile == "pt_only":
+        nlp = nlp_engine.nlp["pt"]
+        for pipe in PT_ONLY_DISABLED_PIPES:
+            if pipe in nlp.pipe_names:
+                nlp.remove_pipe(pipe)
+
+    analyzer = AnalyzerEngine(nlp_engine=nlp_engine, default_score_threshold=0.4)
+    _add_cpf_recognizer(analyzer)
+    print(f"[NLP] Analyzer pronto em {time.perf_counter() - start:.1f}s")
+    return analyzer
+
+def _add_cpf_recognizer(analyzer):
+    """Adiciona suporte a CPFs ao analisador de PII."""
+    cpf_pattern = Pattern(name="cpf_pattern", regex=CPF_REGEX, score=0.8)
+    cpf_recognizer = PatternRecognizer(supported_entity="CPF", patterns=[cpf_pattern], supported_language="pt")
+    analyzer.registry.add_recognizer(cpf_recognizer)
+
+class PrivacyEngine:
+    def __init__(self, nlp_profile=None, synth_engine=None):
+        # O motor NLP só é carregado no primeiro uso (ver a propriedade analyzer)
+        self.nlp_profile = nlp_profile or os.environ.get("PII_NLP_PROFILE", "full")
+        self.synth_engine = synth_engine or SYNTH_ENGINE
+        if self.synth_engine not in SYNTH_ENGINES:
+            raise ValueError(f"Motor de síntese desconhecido: {self.synth_engine}. Use um de {SYNTH_ENGINES}")
         
         self.last_df_clean = None  
+        self.last_utility = None
+        self.last_distance = None
+        self.last_stats = None
+        self.last_encoded = None
+        self.last_run = None
+        self.tracer = StageTracer()
         self.synth_model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Num worker do modo 'process' o treino fica na fatia de núcleos do worker
+        if in_engine_worker():
+            torch.set_num_threads(engine_cpu_budget())
+        self.model_cache = ModelCache(MODEL_CACHE_DIR, max_bytes=MODEL_CACHE_MAX_MB * 1024**2) if MODEL_CACHE_DIR else None
         print(f"[INFO] Motor configurado para PORTUGUÊS usando: {self.device}")
 
+    @property
+    def analyzer(self):
+        """AnalyzerEngine do Presidio, compartilhado por todos os engines do processo."""
+        return get_shared_analyzer(self.nlp_profile)
+
+    def warmup_nlp(self):
+        """Força o carregamento do motor NLP (útil em segundo plano após subir o servidor)."""
+        return self.analyzer
+
     # --- MÉTODO MAESTRO ---
 
-    def run_pipeline(self, input_path, epsilon=1.0):
+    def run_pipeline(self, input_path, epsilon=1.0, progress_cb=None, output_rows=None, prepared=None):
+        """
+        Executa o pipeline completo. `progress_cb(stage, progress, stage_seconds)` é chamado
+        ao fim de cada etapa (usado pela API de jobs para o streaming de progresso).
+        `output_rows` define o tamanho do sintético publicado (padrão: o da amostra de treino);
+        acima de GENERATION_CHUNK_ROWS ele é gerado em lotes direto para o Parquet, e o
+        df_synthetic devolvido (utilidade/auditoria) é o primeiro lote do tamanho da amostra.
+        Tempo, CPU, pico de RSS e linhas de cada etapa ficam em self.tracer (ver tracing.py).
+        `prepared` = (df_clean, pii_cols) de um search_epsilon: carga e wrangling são pulados
+        e as etapas continuam no mesmo tracer da busca.
+        """
+        if prepared is None:
+            self.tracer = StageTracer()
+        tracer = self.tracer
+        report = _stage_reporter(progress_cb)
+
         try:
-            # 1. Carga e Amostragem (Garante performance no treinamento)
-            df_raw = self._load_data(input_path)
-            df_working = self._sample_data(df_raw)
-            
-            # 2. Preprocessamento Agressivo (Wrangling) e Detecção de PII
-            # Alterado de "raw" para "intensive" para derrubar o risco de inferência na GUI
-            df_clean, pii_cols = self._preprocess_and_clean(df_working, strategy="high_fidelity")
-            self.last_df_clean = df_clean.copy() 
+            # 1-2. Carga, Wrangling e Detecção de PII (feitos uma vez só no modo target_risk)
+            if prepared is None:
+                df_clean, pii_cols = self._prepare_input(input_path, report)
+            else:
+                df_clean, pii_cols = prepared
 
             # 3. Treinamento do Modelo Generativo (AIM - Adaptive Independence Model)
-            train_time = self._train_model(df_clean, epsilon)
+            with tracer.stage("fit", rows_in=len(df_clean)):
+                train_time = self._train_model(df_clean, epsilon)
+            report("fit", PIPELINE_PROGRESS["fit"])
             
             # 4. Geração do Dataset Sintético
-            df_synthetic, gen_time = self._generate_data(df_clean)
+            count = output_rows or len(df_clean)
+            output_path = None
+            with tracer.stage("generate") as span:
+                if count > GENERATION_CHUNK_ROWS:
+                    output_path = self._output_path(input_path)
+                    df_synthetic, gen_time = self._generate_to_parquet(df_clean, count, output_path, report=report)
+                else:
+                    df_synthetic, gen_time = self._generate_data(df_clean, count=count)
+                span["rows_out"] = count
+            report("generate", PIPELINE_PROGRESS["generate"])
 
             # 5. Cálculo de Utilidade Estatística (Jensen-Shannon Distance)
-            util_marginal, _ = self.calculate_utility(df_clean, df_synthetic)
+            with tracer.stage("utility", rows_in=len(df_synthetic)):
+                util_marginal, util_joint = self.calculate_utility(df_clean, df_synthetic, stats=self.last_stats)
+            self.last_run = {"epsilon": epsilon, "train_sec": train_time, "gen_sec": gen_time,
+                             "rows": len(df_synthetic), "util_marginal": util_marginal, "util_joint": util_joint}
+            report("utility", PIPELINE_PROGRESS["utility"])
 
-            # 6. Salvamento do Resultado
-            output_path = self._save_output(df_synthetic, input_path)
+            # 5b. Distância ao registro real mais próximo (DCR/NNDR)
+            with tracer.stage("distance", rows_in=len(df_synthetic)):
+                self.last_run.update(self.calculate_distance(df_clean, df_synthetic))
+            report("distance", PIPELINE_PROGRESS["distance"])
+
+            # 6. Salvamento do Resultado (a geração em lotes já gravou o arquivo)
+            if output_path is None:
+                with tracer.stage("save", rows_in=len(df_synthetic)) as span:
+                    output_path = self._save_output(df_synthetic, input_path)
+                    span["rows_out"] = len(df_synthetic)
+            report("save", PIPELINE_PROGRESS["save"])
             
-            print(f"[DONE] Pipeline de Geração Finalizado!")
+            print(f"[DONE] Pipeline de Geração Finalizado! ({tracer.summary()})")
             
             return output_path, df_clean, df_synthetic, pii_cols, util_marginal
 
+        except JobCancelled:
+            # Cancelamento não é falha: propaga para a fila de jobs encerrar o job
+            raise
         except Exception as e:
             print(f"[ERROR] Falha crítica no Pipeline: {str(e)}")
             import traceback
             traceback.print_exc()
             return "", None, None, [], 0.0
 
+    def _prepare_input(self, input_path, report):
+        """Carga amostrada, wrangling e detecção de PII: (df_clean, colunas PII removidas)."""
+        # 1. Carga e Amostragem em streaming (Garante performance no treinamento)
+        with self.tracer.stage("load") as span:
+            df_working = self._load_data(input_path, strategy="high_fidelity")
+            span["rows_in"] = df_working.attrs.get("source_rows", len(df_working))
+            span["rows_out"] = len(df_working)
+        report("load", PIPELINE_PROGRESS["load"])
+
+        # 2. Preprocessamento Agressivo (Wrangling) e Detecção de PII
+        # Alterado de "raw" para "intensive" para derrubar o risco de inferência na GUI
+        strategy = "high_fidelity"
+        df_clean, pii_cols = self._preprocess_and_clean(
+            df_working, strategy=strategy,
+            **self._sidecar_files(input_path, strategy)
+        )
+        self.last_df_clean = df_clean.copy()
+        report("wrangle", PIPELINE_PROGRESS["wrangle"])
+        return df_clean, pii_cols
+
+    def _sweep_workers(self):
+        """Processos do sweep e da busca de epsilon quando o chamador não fixa `max_workers`."""
+        if SWEEP_WORKERS:
+            return SWEEP_WORKERS
+        # O AIM com CUDA disputa a GPU; o motor marginal não a usa (um processo por epsilon)
+        on_gpu = self.device == "cuda" and self.synth_engine == "aim"
+        # Num worker do modo 'process' as execuções simultâneas já ocupam os núcleos:
+        # abrir outro pool de processos só multiplicaria os treinos disputando a máquina
+        if on_gpu or in_engine_worker():
+            return 1
+        return engine_cpu_budget()
+
+    def search_epsilon(self, input_path, target_risk, evaluate, eps_max=None, progress_cb=None,
+                       max_workers=None):
+        """
+        Modo target_risk: procura o maior epsilon cujo pior risco fica abaixo de `target_risk`
+        (bracketing/bisseção em escala log, ver EpsilonBracket). Carga, wrangling e PII são
+        feitos uma vez; cada sondagem só treina e gera (em processos paralelos, como no sweep)
+        e `evaluate(epsilon, df_clean, df_syn)` devolve o pior risco de uma auditoria barata.
+
+        Retorna {"epsilon", "target_met", "probes": [(epsilon, risco)], "prepared"}; o
+        `prepared` vai para run_pipeline(prepared=...), que roda o epsilon escolhido sem
+        refazer o wrangling e reaproveita o modelo já treinado na sondagem (cache de modelos).
+        """
+        self.tracer = StageTracer()
+        report = _stage_reporter(progress_cb)
+        df_clean, pii_cols = self._prepare_input(input_path, report)
+        bracket = EpsilonBracket(target_risk, eps_max=eps_max or EPSILON_SEARCH_MAX)
+
+        if max_workers is None:
+            max_workers = self._sweep_workers()
+        workers = max(1, min(max_workers, bracket.max_probes))
+        print(f"[SEARCH] Alvo de risco {target_risk} em [{bracket.eps_min}, {bracket.eps_max}] "
+              f"(até {bracket.max_probes} sondagens, {workers} por rodada)")
+
+        def record(epsilon, fit):
+            # `fit()` devolve o sintético da sondagem; uma falha descarta só esta sondagem, como no sweep
+            try:
+                risk = evaluate(epsilon, df_clean, fit())
+            except JobCancelled:
+                raise
+            except Exception as e:
+                print(f"[SEARCH] Falha no epsilon {epsilon}: {e}")
+                bracket.discard(epsilon)
+                return
+            bracket.record(epsilon, risk)
+            verdict = "ok" if risk <= target_risk else "acima do alvo"
+            print(f"[SEARCH] Epsilon {epsilon}: pior risco {risk:.4f} ({verdict})")
+            progress = PIPELINE_PROGRESS["wrangle"] + (PIPELINE_PROGRESS["search"] - PIPELINE_PROGRESS["wrangle"]) \
+                * bracket.spent() / bracket.max_probes
+            report("search", progress, f"ε {epsilon}: risco {risk:.4f}")
+
+        def fit_inline(epsilon):
+            self._train_model(df_clean, epsilon)
+            return self._generate_data(df_clean)[0]
+
+        pool = None
+        try:
+            with self.tracer.stage("search", rows_in=len(df_clean)) as span:
+                if workers > 1:
+                    threads = max(1, engine_cpu_budget() // workers)
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                               initializer=_init_sweep_worker,
+                                               initargs=(df_clean, threads, self.synth_engine))
+                # Cada rodada sonda até `workers` epsilons dentro do intervalo atual
+                while epsilons := bracket.next_probes(workers):
+                    if pool is None:
+                        for eps in epsilons:
+                            record(eps, lambda: fit_inline(eps))
+                        continue
+                    futures = {pool.submit(_sweep_fit, eps): eps for eps in epsilons}
+                    for future in as_completed(futures):
+                        record(futures[future], lambda: future.result()[0])
+                span["rows_out"] = len(bracket.probes)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        epsilon, target_met = bracket.best()
+        probes = sorted(bracket.probes.items())
+        print(f"[SEARCH] Epsilon escolhido: {epsilon} ({'alvo atingido' if target_met else 'alvo NÃO atingido'}, "
+              f"{len(probes)} sondagens" + (f", {len(bracket.failed)} com falha)" if bracket.failed else ")"))
+        return {"epsilon": epsilon, "target_met": target_met, "probes": probes, "prepared": (df_clean, pii_cols)}
+
+    def run_epsilon_sweep(self, input_path, epsilons, results_path="epsilon_sweep.csv",
+                          strategy="high_fidelity", preprocess=True, output_dir="output",
+                          evaluate=None, max_workers=None):
+        """
+        Roda o pipeline para vários epsilons com uma única carga, wrangling, detecção de PII
+        e contagem do dado limpo; só o treino/geração do AIM se repete, em processos paralelos.
+
+        Cada epsilon concluído vira uma linha de `results_path` assim que termina. Epsilons
+        que já estão no CSV para o mesmo dado limpo são pulados, então rodar de novo após uma
+        queda retoma de onde parou. `evaluate(epsilon, df_clean, df_syn, row)` pode devolver
+        colunas extras (auditoria, ML) para a linha. Com `preprocess=False` o arquivo é usado
+        como já limpo. Retorna as linhas geradas nesta chamada.
+        """
+        start = time.perf_counter()
+        self.tracer = StageTracer()
+        if preprocess:
+            df_working = self._load_data(input_path, strategy=strategy)
+            df_clean, _ = self._preprocess_and_clean(
+                df_working, strategy=strategy,
+                **self._sidecar_files(input_path, strategy)
+            )
+        else:
+            df_clean = load_tse_sample(input_path)
+            on_disk = not input_path.startswith(DATASET_SCHEME)
+            # A amostra tem store próprio: o <base>.stats.npz é o do arquivo inteiro (linha de comando)
+            stats_file = stats_path(input_path, variant=CLEAN_VARIANT) if DATASET_STATS and on_disk else None
+            self.last_stats = load_or_build(df_clean, stats_file)
+        print(f"[SWEEP] Dado preparado uma vez em {time.perf_counter() - start:.1f}s ({len(df_clean)} linhas)")
+
+        data_hash = dataset_fingerprint(df_clean)
+        done = _completed_epsilons(results_path, data_hash)
+        pending = [eps for eps in epsilons if float(eps) not in done]
+        if len(pending) < len(epsilons):
+            print(f"[SWEEP] Retomando: {len(epsilons) - len(pending)} epsilon(s) já em {results_path}")
+        if not pending:
+            return []
+
+        if max_workers is None:
+            max_workers = self._sweep_workers()
+        workers = max(1, min(max_workers, len(pending)))
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        rows = []
+
+        def finish(epsilon, df_syn, train_sec, gen_sec):
+            util_marginal, util_joint = self.calculate_utility(df_clean, df_syn, stats=self.last_stats)
+            os.makedirs(output_dir, exist_ok=True)
+            output_path = os.path.join(output_dir, f"{base}_eps_{epsilon}_synthetic.parquet")
+            df_syn.to_parquet(output_path)
+            row = {
+                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "dataset_hash": data_hash,
+                "epsilon": float(epsilon),
+                "util_marginal": f"{util_marginal:.4f}",
+                "util_joint": f"{util_joint:.4f}",
+                "train_sec": f"{train_sec:.2f}",
+                "gen_sec": f"{gen_sec:.2f}",
+                "rows": len(df_syn),
+                "output_path": output_path,
+            }
+            if evaluate is not None:
+                try:
+                    row.update(evaluate(epsilon, df_clean, df_syn, row) or {})
+                except Exception as e:
+                    # Sem linha no CSV: a próxima execução refaz este epsilon (o modelo fica no cache)
+                    print(f"[SWEEP] Falha na avaliação do epsilon {epsilon}: {e}")
+                    return
+            _append_csv_row(results_path, row, SWEEP_FIELDS + [k for k in row if k not in SWEEP_FIELDS])
+            rows.append(row)
+            print(f"[SWEEP] Epsilon {epsilon} concluído ({len(done) + len(rows)}/{len(done) + len(pending)})")
+
+        print(f"[SWEEP] {len(pending)} epsilon(s) em {workers} processo(s): {pending}")
+        if workers == 1:
+            for eps in pending:
+                try:
+                    train_sec = self._train_model(df_clean, eps)
+                    df_syn, gen_sec = self._generate_data(df_clean)
+                except Exception as e:
+                    print(f"[SWEEP] Falha no epsilon {eps}: {e}")
+                    continue
+                finish(eps, df_syn, train_sec, gen_sec)
+            return rows
+
+        # 'spawn' pelo mesmo motivo do executor do serviço (threads/CUDA no processo pai);
+        # o dado limpo vai uma vez para cada worker, não uma vez por epsilon
+        threads = max(1, engine_cpu_budget() // workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_sweep_worker,
+                                 initargs=(df_clean, threads, self.synth_engine)) as pool:
+            futures = {pool.submit(_sweep_fit, eps): eps for eps in pending}
+            for future in as_completed(futures):
+                eps = futures[future]
+                try:
+                    df_syn, train_sec, gen_sec = future.result()
+                except Exception as e:
+                    print(f"[SWEEP] Falha no epsilon {eps}: {e}")
+                    continue
+                finish(eps, df_syn, train_sec, gen_sec)
+        return rows
+
     # --- MÉTODOS AUXILIARES ---
 
-    def _load_data(self, path):
-        """Carrega os dados tratando o encoding Latin-1 comum no TSE."""
-        ext = os.path.splitext(path)[1].lower()
-        if ext == '.parquet':
-            return pd.read_parquet(path)
-        # O padrão do TSE é ponto e vírgula com encoding ISO-8859-1
-        return pd.read_csv(path, sep=';', encoding='iso-8859-1', low_memory=False)
-
-    def _sample_data(self, df):
-        """Limita o processamento a 100k linhas para viabilizar o treinamento em tempo real."""
-        if len(df) > 100000:
-            print(f"[INFO] Dataset grande ({len(df)} linhas). Amostrando 100.000 para o AIM.")
-            return df.sample(n=10000, random_state=42).reset_index(drop=True)
-        return df.copy()
-
-    def _preprocess_and_clean(self, df, strategy="intensive"):
-        """Aplica as regras de generalização e detecta colunas sensíveis."""
+    def _load_data(self, path, strategy="high_fidelity"):
+        """
+        Carrega os dados tratando o encoding Latin-1 comum no TSE.
+        Lê só as colunas usadas pelo wrangler e amostra durante a leitura (ver loader.py).
+        """
+        columns = TSEDataWrangler(strategy=strategy).required_columns()
+        return load_tse_sample(path, columns=columns)
+
+    def _preprocess_and_clean(self, df, strategy="intensive", stats_file=None, encoded_file=None):
+        """
+        Aplica as regras de generalização e detecta colunas sensíveis. Com `stats_file`,
+        as contagens do dado limpo vão para um SufficientStats (reaproveitado se o arquivo
+        já descreve exatamente este dado), lido depois pela cardinalidade e pela utilidade.
+        Com `encoded_file`, o dado limpo codificado (self.last_encoded) fica salvo com as
+        colunas PII detectadas; se o arquivo já descreve este dado, wrangling e PII são pulados.
+        """
         print(f"[WRANGLING] Aplicando estratégia: {strategy.upper()}")
-        
-        # Chama o wrangler que criamos para o TSE
-        df_wrangled = apply_wrangling(df, strategy=strategy)
-        
+        fingerprint = None
+        if encoded_file:
+            fingerprint = (f"{dataset_fingerprint(df)}:{strategy}:{self.nlp_profile}"
+                           f":v{WRANGLER_ARTIFACT_VERSION}")
+        encoded = self._load_encoded(encoded_file, fingerprint)
+
+        if encoded is not None:
+            with self.tracer.stage("wrangle", rows_in=len(df)) as span:
+                pii_cols = encoded.metadata.get("pii_columns", [])
+                df_wrangled = df_final = encoded.to_frame()
+                span["rows_out"] = len(df_final)
+        else:
+            # Chama o wrangler que criamos para o TSE (códigos + vocabulário, decodificado uma vez)
+            with self.tracer.stage("wrangle", rows_in=len(df)) as span:
+                encoded = apply_wrangling(df, strategy=strategy, cache_dir=WRANGLER_CACHE_DIR, encoded=True)
+                df_wrangled = encoded.to_frame()
+                span["rows_out"] = len(df_wrangled)
+
+            # Detecta PIIs remanescentes (como nomes que escaparam da lista)
+            with self.tracer.stage("pii", rows_in=len(df_wrangled)):
+                pii_cols = self.detect_pii_columns(df_wrangled)
+
+            df_final = df_wrangled.drop(columns=pii_cols)
+            # Colunas PII não vão para o sidecar, só os nomes (para pular a detecção na próxima vez)
+            encoded = encoded.drop(pii_cols)
+            encoded.metadata = {"strategy": strategy, "pii_columns": pii_cols}
+            if encoded_file:
+                encoded.save(encoded_file, fingerprint=fingerprint)
+        self.last_encoded = encoded
+        # Colunas PII não entram no store: o arquivo fica em disco ao lado do dataset
+        with self.tracer.stage("stats", rows_in=len(df_final)):
+            self.last_stats = load_or_build(df_final, stats_file) if stats_file else None
+
         # Analisa cardinalidade para o log do terminal
-        self.analyze_cardinality(df_wrangled)
-        
-        # Detecta PIIs remanescentes (como nomes que escaparam da lista)
-        pii_cols = self.detect_pii_columns(df_wrangled)
-        
-        df_final = df_wrangled.drop(columns=pii_cols)
+        with self.tracer.stage("cardinality", rows_in=len(df_wrangled)):
+            self.analyze_cardinality(df_wrangled, stats=self.last_stats)
         print(f"[INFO] Colunas PII removidas: {pii_cols}")
         
         return df_final, pii_cols
 
+    def _sidecar_files(self, input_path, strategy):
+        """Arquivos de estatísticas e do dado codificado ao lado da entrada (se ligados)."""
+        # Uploads por stream (dataset://) não têm diretório: nada é gravado ao lado deles
+        on_disk = not input_path.startswith(DATASET_SCHEME)
+        return {
+            "stats_file": stats_path(input_path, variant=strategy) if DATASET_STATS and on_disk else None,
+            "encoded_file": encoded_path(input_path, variant=strategy) if DATASET_ENCODED and on_disk else None,
+        }
+
+    def _load_encoded(self, path, fingerprint):
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            encoded = EncodedFrame.load(path, fingerprint=fingerprint)
+        except Exception as e:
+            print(f"[ENCODED] Sidecar ilegível ({e}); refazendo o wrangling")
+            return None
+        if encoded is not None:
+            print(f"[ENCODED] Dado limpo reaproveitado de {os.path.basename(path)} "
+                  f"({len(encoded)} linhas, {encoded.nbytes / 1024**2:.1f} MB em códigos)")
+        return encoded
+
     def _train_model(self, df_clean, epsilon):
-        """Instancia e treina o plugin AIM do Synthcity."""
-        self.synth_model = Plugins().get(
-            "aim", 
-            epsilon=float(epsilon), 
-            delta=1e-6,
-            max_cells=50000, 
-            degree=2,
-            device=self.device,
-            random_state=42
-        )
-        print(f"[IA] Treinando AIM (Epsilon={epsilon}) em {self.device}...")
+        """
+        Instancia e treina o sintetizador do motor configurado (ou reaproveita o modelo em
+        cache): o plugin AIM do Synthcity ou o MarginalSynthesizer em NumPy.
+        """
+        params = {
+            "epsilon": float(epsilon),
+            "delta": 1e-6,
+            "max_cells": 50000,
+            "random_state": 42,
+        }
+        if self.synth_engine == "aim":
+            params = {**params, "degree": 2}
+            device = self.device
+        else:
+            # O marginal mede sempre pares (grau 2) e roda só em CPU
+            device = "cpu"
+        name = "AIM" if self.synth_engine == "aim" else "Marginal"
+
+        cache_key = None
+        if self.model_cache is not None:
+            cache_key = ModelCache.make_key(dataset_fingerprint(df_clean), plugin=self.synth_engine,
+                                            device=device, **params)
+            cached = self.model_cache.get(cache_key)
+            if cached is not None:
+                print(f"[CACHE] Modelo {name} reaproveitado (Epsilon={epsilon}). Treino ignorado.")
+                self.synth_model = cached
+                return 0.0
+
+        if self.synth_engine == "aim":
+            self.synth_model = Plugins().get("aim", device=device, **params)
+        else:
+            self.synth_model = MarginalSynthesizer(**params)
+        print(f"[IA] Treinando {name} (Epsilon={epsilon}) em {device}...")
         start = time.perf_counter()
         self.synth_model.fit(df_clean)
-        return time.perf_counter() - start
+        train_time = time.perf_counter() - start
+
+        if cache_key is not None:
+            self.model_cache.put(cache_key, self.synth_model)
+        return train_time
 
-    def _generate_data(self, df_clean):
+    def _generate_data(self, df_clean, count=None):
         """Gera os dados sintéticos respeitando o orçamento de privacidade."""
         print(f"[IA] Gerando dados sintéticos...")
         start = time.perf_counter()
         # count=len(df_clean) garante que o dataset sintético tenha o mesmo tamanho do original
-        df_gen = self.synth_model.generate(count=len(df_clean)).dataframe()
+        df_gen = _generated_frame(self.synth_model.generate(count=count or len(df_clean)))
         return df_gen, time.perf_counter() - start
 
-    def calculate_utility(self, df_ori, df_syn):
-        """Calcula a fidelidade estatística entre as bases."""
-        common_cols = [c for c in df_ori.columns if c in df_syn.columns]
-        marginal_jsds = []
-        for col in common_cols:
-            p = df_ori[col].value_counts(normalize=True).sort_index()
-            q = df_syn[col].value_counts(normalize=True).sort_index()
-            p, q = p.align(q, fill_value=0)
-            marginal_jsds.append(jensenshannon(p, q, base=2))
-        
-        # Score de Utilidade: 1 - média das distâncias (Quanto mais perto de 1, melhor)
-        util_marginal = 1.0 - np.mean(marginal_jsds)
-        return util_marginal, 0.0
+    def _generate_to_parquet(self, df_clean, count, output_path, chunk_rows=GENERATION_CHUNK_ROWS,
+                             report=None):
+        """
+        Gera `count` linhas em lotes de `chunk_rows`, cada lote gravado como um row group via
+        ParquetWriter assim que fica pronto: a memória não cresce com `count`. O arquivo é
+        escrito em `<saída>.part` e só é renomeado ao final (cancelamento/falha o removem).
+        Retorna (amostra com as primeiras len(df_clean) linhas, segundos de geração).
+        """
+        print(f"[IA] Gerando {count} linhas sintéticas em lotes de {chunk_rows}...")
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        part_path = f"{output_path}.part"
+        sample, sample_rows = [], 0
+        writer, schema = None, None
+        written = 0
+        try:
+            for i, offset in enumerate(range(0, count, chunk_rows)):
+                n = min(chunk_rows, count - offset)
+                # Semente por lote: chamadas repetidas não podem devolver o mesmo lote
+                df_chunk = _generated_frame(self.synth_model.generate(count=n, random_state=42 + i))
+                if writer is None:
+                    schema = pa.Table.from_pandas(df_chunk, preserve_index=False).schema
+                    writer = pq.ParquetWriter(part_path, schema)
+                writer.write_table(pa.Table.from_pandas(df_chunk, schema=schema, preserve_index=False))
+                written += len(df_chunk)
+
+                if sample_rows < len(df_clean):
+                    sample.append(df_chunk.iloc[:len(df_clean) - sample_rows])
+                    sample_rows += len(sample[-1])
+                if report is not None:
+                    frac = written / count
+                    progress = PIPELINE_PROGRESS["fit"] + frac * (PIPELINE_PROGRESS["generate"] - PIPELINE_PROGRESS["fit"])
+                    report("generate", progress, f"{written}/{count} linhas")
+            writer.close()
+            writer = None
+            os.replace(part_path, output_path)
+        finally:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+        print(f"[IA] {written} linhas gravadas em {output_path}")
+        df_sample = pd.concat(sample, ignore_index=True) if sample else pd.DataFrame(columns=df_clean.columns)
+        return df_sample, time.perf_counter() - start
+
+    def calculate_utility(self, df_ori, df_syn, stats=None):
+        """
+        Calcula a fidelidade estatística entre as bases: 1 - média da JSD das marginais de
+        1 via e de todos os pares (ver utility.py). O relatório completo (JSD/TVD por
+        marginal) fica em self.last_utility. Com `stats` (contagens de df_ori), o original
+        não é recontado.
+        """
+        if stats is not None:
+            report = utility_report_from_stats(stats, df_syn, joint=True)
+        else:
+            report = utility_report(df_ori, df_syn, joint=True)
+        scores = summarize_utility(report)
+        self.last_utility = {**scores, "report": report}
+        print(f"[UTILITY] Marginal (1-way): {scores['util_marginal']:.4f} | "
+              f"Conjunta (2-way): {scores['util_joint']:.4f} | TVD 2-way: {scores['tvd_joint']:.4f}")
+        return scores["util_marginal"], scores["util_joint"]
+
+    def calculate_distance(self, df_ori, df_syn):
+        """
+        DCR (fração de colunas diferentes do real mais próximo) e NNDR de cada registro
+        sintético, pelo índice de Hamming em bitsets (ver neighbors.py). O relatório por
+        registro fica em self.last_distance; retorna o resumo publicado na resposta.
+        """
+        report = distance_report(df_ori, df_syn)
+        scores = summarize_distance(report)
+        self.last_distance = {**scores, "report": report}
+        print(f"[DCR] Cópias exatas: {scores['dcr_exact_rate']:.4f} | DCR p5: {scores['dcr_p05']:.4f} | "
+              f"DCR mediana: {scores['dcr_median']:.4f} | NNDR mediana: {scores['nndr_median']:.4f}")
+        return scores
+
+    def log_experiment(self, score_total, log_path=EXPERIMENTS_LOG):
+        """Acrescenta a execução mais recente ao experiments_log.csv (mesmo esquema das rodadas anteriores)."""
+        if not self.last_run or not log_path:
+            return
+        fields = ["timestamp", "epsilon", "score_total", "score_wrangling", "dp_gain",
+                  "util_marginal", "util_joint", "train_sec", "gen_sec", "rows"]
+        run = self.last_run
+        row = {
+            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "epsilon": run["epsilon"],
+            "score_total": f"{score_total:.4f}",
+            # Scores do baseline só de wrangling não são calculados por requisição
+            "score_wrangling": "",
+            "dp_gain": "",
+            "util_marginal": f"{run['util_marginal']:.4f}",
+            "util_joint": f"{run['util_joint']:.4f}",
+            "train_sec": f"{run['train_sec']:.2f}",
+            "gen_sec": f"{run['gen_sec']:.2f}",
+            "rows": run["rows"],
+        }
+        _append_csv_row(log_path, row, fields)
+
+    def log_stage_metrics(self, run_id, log_path=STAGE_METRICS_LOG):
+        """Acrescenta uma linha por etapa da execução mais recente ao CSV de métricas."""
+        if not self.tracer.spans or not log_path:
+            return
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        epsilon = self.last_run["epsilon"] if self.last_run else ""
+        fields = ["timestamp", "run_id", "epsilon"] + STAGE_FIELDS
+        for span in self.tracer.spans:
+            row = {
+                "timestamp": timestamp,
+                "run_id": run_id,
+                "epsilon": epsilon,
+                "name": span["name"],
+                "wall_sec": f"{span['wall_sec']:.3f}",
+                "cpu_sec": f"{span['cpu_sec']:.3f}",
+                "peak_rss_mb": f"{span['peak_rss_mb']:.1f}",
+                "rows_in": span["rows_in"],
+                "rows_out": span["rows_out"],
+            }
+            _append_csv_row(log_path, row, fields)
 
-    def analyze_cardinality(self, df):
+    def analyze_cardinality(self, df, stats=None):
         """Log visual para identificar colunas que aumentam o risco de re-identificação."""
         print("\n--- 📊 ANÁLISE DE CARDINALIDADE (PÓS-WRANGLING) ---")
         for col in df.columns:
-            n_unique = df[col].nunique()
+            n_unique = stats.nunique(col) if stats is not None and col in stats.columns else df[col].nunique()
             # Se uma coluna tem muitas categorias, o risco de inferência sobe
             status = "✅ SEGURO" if n_unique < 50 else "🚨 ALTO RISCO"
             print(f"Coluna: {col:<20} | Categorias: {n_unique:<5} | Status: {status}")
         print("-" * 50)
 
-    def detect_pii_columns(self, df):
-        """Usa o Microsoft Presidio para escanear amostras em busca de dados sensíveis."""
-        pii_cols = []
-        sample_df = df.head(min(100, len(df)))
+    def detect_pii_columns(self, df, sample_size=100, batch_size=256):
+        """
+        Escaneia amostras com o Presidio em lote (mesmo resultado do laço célula a célula).
+        Os valores são deduplicados por coluna, a regex de CPF roda vetorizada e só os
+        candidatos restantes passam pelo spaCy via nlp.pipe.
+        """
+        sample_df = df.head(min(sample_size, len(df)))
+        # Se mais de 10% da amostra parecer PII, marca a coluna
+        threshold = len(sample_df) * 0.1
+
+        pii_hits = {}
+        pending = {}
         for col in df.columns:
-            pii_hits = 0
-            for val in sample_df[col]:
-                results = self.analyzer.analyze(text=str(val), language='pt', entities=[])
-                if len(results) > 0: pii_hits += 1
-            # Se mais de 10% da amostra parecer PII, marca a coluna
-            if pii_hits > (len(sample_df) * 0.1): 
-                pii_cols.append(col)
-        return pii_cols
-
-    def _add_cpf_recognizer(self):
-        """Adiciona suporte a CPFs ao analisador de PII."""
-        cpf_pattern = Pattern(name="cpf_pattern", regex=r"\d{3}\.\d{3}\.\d{3}-\d{2}|\d{11}", score=0.8)
-        cpf_recognizer = PatternRecognizer(supported_entity="CPF", patterns=[cpf_pattern], supported_language="pt")
-        self.analyzer.registry.add_recognizer(cpf_recognizer)
+            # str(val) por célula: o mesmo texto que o analyzer recebia no laço original
+            counts = sample_df[col].map(str).value_counts(sort=False)
+            is_cpf = counts.index.to_series().str.contains(
+                CPF_REGEX, flags=PRESIDIO_REGEX_FLAGS, regex=True
+            ).to_numpy()
+            pii_hits[col] = int(counts[is_cpf].sum())
+            leftover = counts[~is_cpf]
+
+            # Só vai para o NLP se o resultado da coluna ainda estiver em aberto
+            if pii_hits[col] <= threshold < pii_hits[col] + int(leftover.sum()):
+                pending[col] = leftover
+
+        if pending:
+            # Valores únicos de todas as colunas pendentes em uma única passada do nlp.pipe
+            texts = list(dict.fromkeys(v for leftover in pending.values() for v in leftover.index))
+            batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.analyzer)
+            results = batch_analyzer.analyze_iterator(texts, language='pt', batch_size=batch_size, entities=[])
+            flagged = {text for text, res in zip(texts, results) if len(res) > 0}
+            for col, leftover in pending.items():
+                pii_hits[col] += int(leftover[leftover.index.isin(flagged)].sum())
+
+        return [col for col in df.columns if pii_hits[col] > threshold]
+
+    def _output_path(self, input_path):
+        # Vale também para dataset://<id>/<arquivo> (uploads por stream) e entradas .parquet
+        filename = os.path.splitext(os.path.basename(input_path))[0] + "_synthetic.parquet"
+        return os.path.join(OUTPUT_DIR, filename)
 
     def _save_output(self, df_synth, input_path):
         """Salva o dataset resultante em formato Parquet para preservar tipos de dados."""
-        os.makedirs("output", exist_ok=True)
-        filename = os.path.basename(input_path).replace(".csv", "_synthetic.parquet")
-        output_path = os.path.join("output", filename)
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        output_path = self._output_path(input_path)
         df_synth.to_parquet(output_path)
-        return output_path
\ No newline at end of file
+        return output_path
+
+def _generated_frame(generated):
+    """O AIM devolve um DataLoader do synthcity; o MarginalSynthesizer, o DataFrame."""
+    return generated if isinstance(generated, pd.DataFrame) else generated.dataframe()
+
+def _append_csv_row(path, row, fields):
+    """Acrescenta uma linha ao CSV; se o arquivo já existe, segue o cabeçalho dele."""
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    if exists:
+        with open(path, newline="") as f:
+            fields = next(csv.reader(f), None) or fields
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        if not exists:
+            writer.writeheader()
+        writer.writerow(row)
+
+def _completed_epsilons(results_path, data_hash):
+    """Epsilons já registrados no CSV do sweep para o mesmo dado limpo."""
+    if not os.path.exists(results_path):
+        return set()
+    with open(results_path, newline="") as f:
+        return {float(row["epsilon"]) for row in csv.DictReader(f)
+                if row.get("dataset_hash") == data_hash and row.get("epsilon")}
+
+def _stage_reporter(progress_cb):
+    """`report(stage, progress, message)`: repassa ao progress_cb com a duração desde o último aviso."""
+    stage_start = [time.perf_counter()]
+
+    def report(stage, progress, message=""):
+        if progress_cb is not None:
+            now = time.perf_counter()
+            progress_cb(stage, progress, now - stage_start[0], message)
+            stage_start[0] = now
+    return report
+
+# --- WORKERS DO SWEEP (processos 'spawn') ---
+
+_sweep_df = None
+_sweep_engine = None
+
+def _init_sweep_worker(df_clean, threads, synth_engine=None):
+    global _sweep_df, _sweep_engine
+    # Divide os núcleos entre os treinos simultâneos
+    torch.set_num_threads(threads)
+    _sweep_df = df_clean
+    _sweep_engine = PrivacyEngine(synth_engine=synth_engine)
+
+def _sweep_fit(epsilon):
+    """Treina (ou reaproveita do cache) e gera para um epsilon sobre o dado compartilhado."""
+    train_sec = _sweep_engine._train_model(_sweep_df, epsilon)
+    df_syn, gen_sec = _sweep_engine._generate_data(_sweep_df)
+    _sweep_engine.synth_model = None
+    return df_syn, train_sec, gen_sec
@@ -0,0 +1,101 @@
+import os
+import math
+
+# Faixa de busca do epsilon no modo target_risk (o epsilon da requisição, se > 0, vira o teto)
+EPSILON_SEARCH_MIN = float(os.environ.get("EPSILON_SEARCH_MIN", "0.01"))
+EPSILON_SEARCH_MAX = float(os.environ.get("EPSILON_SEARCH_MAX", "100"))
+# Orçamento de sondagens (treino + geração + auditoria barata cada uma)
+EPSILON_SEARCH_MAX_PROBES = int(os.environ.get("EPSILON_SEARCH_MAX_PROBES", "8"))
+# Para quando o maior epsilon aprovado e o menor reprovado estão a menos deste fator
+EPSILON_SEARCH_RATIO = float(os.environ.get("EPSILON_SEARCH_RATIO", "1.25"))
+
+def _round_epsilon(epsilon):
+    # 3 algarismos significativos: o mesmo epsilon na sondagem e no pipeline final (chave do cache de modelos)
+    return float(f"{epsilon:.3g}")
+
+def valid_ceiling(eps_max, eps_min=EPSILON_SEARCH_MIN):
+    """Se `eps_max` pode ser o teto da busca: acima do piso depois do arredondamento."""
+    return _round_epsilon(eps_max) > _round_epsilon(eps_min)
+
+def log_grid(low, high, n):
+    """`n` epsilons igualmente espaçados em escala log estritamente entre `low` e `high`."""
+    step = (math.log(high) - math.log(low)) / (n + 1)
+    points = [_round_epsilon(math.exp(math.log(low) + step * (i + 1))) for i in range(n)]
+    return sorted({p for p in points if low < p < high})
+
+class EpsilonBracket:
+    """
+    Busca, com sondagens ruidosas do risco, o maior epsilon cujo pior risco fica abaixo de
+    `target_risk`. O risco cresce com o epsilon, então a busca mantém um intervalo [aprovado,
+    reprovado] e o estreita em escala log: cada rodada sonda `width` pontos dentro dele
+    (width=1 é a bisseção; mais pontos rodam em paralelo e estreitam mais por rodada).
+
+    Sondagens fora de ordem (ruído da auditoria barata) são resolvidas de forma
+    conservadora: o teto é o menor epsilon reprovado e o aprovado precisa estar abaixo dele.
+    Sondagens que falharam (discard) não mexem no intervalo, mas gastam o orçamento.
+    """
+
+    def __init__(self, target_risk, eps_min=EPSILON_SEARCH_MIN, eps_max=EPSILON_SEARCH_MAX,
+                 max_probes=EPSILON_SEARCH_MAX_PROBES, ratio=EPSILON_SEARCH_RATIO):
+        if not (eps_min > 0 and valid_ceiling(eps_max, eps_min)):
+            raise ValueError(f"Faixa de epsilon inválida: [{eps_min}, {eps_max}]")
+        self.target_risk = target_risk
+        self.eps_min, self.eps_max = _round_epsilon(eps_min), _round_epsilon(eps_max)
+        self.max_probes = max(2, max_probes)
+        self.ratio = ratio
+        self.probes = {}  # epsilon -> pior risco da auditoria barata
+        self.failed = set()  # Epsilons cuja sondagem falhou (não são sorteados de novo)
+
+    def record(self, epsilon, risk):
+        self.probes[epsilon] = risk
+
+    def discard(self, epsilon):
+        self.failed.add(epsilon)
+
+    def spent(self):
+        return len(self.probes) + len(self.failed)
+
+    def bracket(self):
+        """(maior epsilon aprovado abaixo do menor reprovado ou None, menor reprovado ou None)."""
+        above = [eps for eps, risk in self.probes.items() if risk > self.target_risk]
+        ceiling = min(above) if above else None
+        passed = [eps for eps, risk in self.probes.items()
+                  if risk <= self.target_risk and (ceiling is None or eps < ceiling)]
+        return (max(passed) if passed else None), ceiling
+
+    def done(self):
+        low, high = self.bracket()
+        if self.spent() >= self.max_probes:
+            return True
+        if high is not None and high <= self.eps_min:
+            return True  # Nem o menor epsilon atinge o alvo
+        if low is not None and low >= self.eps_max:
+            return True  # O teto da faixa já atinge o alvo
+        return low is not None and high is not None and high / low <= self.ratio
+
+    def next_probes(self, width=1):
+        """Próximos epsilons a sondar (até `width`, dentro do orçamento restante)."""
+        if self.done():
+            return []
+        width = max(1, min(width, self.max_probes - self.spent()))
+        low, high = self.bracket()
+        # Pontas primeiro: o teto resolve o caso "tudo aprovado", o piso o "nada aprovado"
+        ends = []
+        if high is None and self.eps_max not in self.probes:
+            ends.append(self.eps_max)
+        if low is None and self.eps_min not in self.probes:
+            ends.append(self.eps_min)
+        ends = [p for p in ends if p not in self.failed][:width]
+        # Pontos já sondados ou que falharam saem da grade: ela fica mais fina até sobrar o bastante
+        need, inner = width - len(ends), []
+        for n in range(need, need + len(self.failed) + 1 if need else 0):
+            inner = [p for p in log_grid(low or self.eps_min, high or self.eps_max, n)
+                     if p not in self.probes and p not in self.failed]
+            if len(inner) >= need:
+                break
+        return ends + inner[:need]
+
+    def best(self):
+        """Maior epsilon aprovado (ou o piso da faixa, se nenhum foi) e se o alvo foi atingido."""
+        low, _ = self.bracket()
+        return (low, True) if low is not None else (self.eps_min, False)
@@ -0,0 +1,162 @@
+import os
+import uuid
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .jobs import JobCancelled
+
+EXECUTION_MODES = ("inline", "process")
+
+class EngineSaturated(Exception):
+    """Todas as vagas de execução (e de espera) estão ocupadas; mapeada para RESOURCE_EXHAUSTED."""
+
+class InlineEngineExecutor:
+    """
+    Execução no próprio processo do servidor: um único engine, protegido por lock.
+    Seguro sob o pool de threads do gRPC, mas serializa as requisições (uma por vez).
+    """
+
+    def __init__(self, handler, max_pending=0):
+        self._handler = handler
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(1 + max_pending)
+        self.max_workers = 1
+
+    def run(self, payload, progress_cb=None, block=False):
+        if not self._slots.acquire(blocking=block):
+            raise EngineSaturated("Worker ocupado: limite de requisições simultâneas atingido")
+        try:
+            with self._lock:
+                return self._handler(payload, progress_cb)
+        finally:
+            self._slots.release()
+
+# --- LADO DO PROCESSO WORKER ---
+
+_worker_handler = None
+_worker_events = None
+_worker_cancelled = None
+_worker_cpus = None
+
+def _init_worker(handler_factory, events, cancelled, cpus):
+    """Cada processo constrói o próprio handler (e, com ele, o próprio PrivacyEngine)."""
+    global _worker_handler, _worker_events, _worker_cancelled, _worker_cpus
+    # Antes do handler: o engine criado por ele já lê a fatia de núcleos do worker
+    _worker_cpus = cpus
+    _worker_handler = handler_factory()
+    _worker_events = events
+    _worker_cancelled = cancelled
+
+def _run_task(token, payload):
+    sent = 0
+
+    def progress_cb(stage, progress, stage_seconds=0.0, message=""):
+        nonlocal sent
+        if _worker_cancelled.get(token):
+            raise JobCancelled(token)
+        _worker_events.put((token, (stage, progress, stage_seconds, message)))
+        sent += 1
+
+    # Devolve quantos eventos foram enviados para o processo principal esperar a entrega de todos
+    return _worker_handler(payload, progress_cb), sent
+
+def in_engine_worker():
+    """True dentro de um processo do ProcessEngineExecutor."""
+    return _worker_cpus is not None
+
+def engine_cpu_budget():
+    """
+    Núcleos de uma execução do engine: num worker do modo 'process', a fatia dele
+    (os workers simultâneos dividem a máquina); fora do pool, a máquina inteira.
+    """
+    return _worker_cpus or os.cpu_count() or 1
+
+class ProcessEngineExecutor:
+    """
+    Execução em um pool de processos: cada worker tem o próprio engine e estado de modelo,
+    e o treino (CPU-bound) escapa do GIL. Usa 'spawn' porque fork com threads do gRPC
+    (e com CUDA inicializado) não é seguro.
+
+    O progresso volta ao processo principal por uma fila do Manager; o cancelamento vai no
+    sentido inverso por um dict compartilhado, checado pelo worker a cada etapa.
+    """
+
+    def __init__(self, handler_factory, max_workers=2, max_pending=0):
+        self.max_workers = max_workers
+        self._handler_factory = handler_factory
+        self._ctx = mp.get_context("spawn")
+        self._manager = self._ctx.Manager()
+        self._events = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._callbacks = {}
+        self._delivered = {}
+        self._delivered_cond = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool()
+        threading.Thread(target=self._dispatch_events, name="engine-progress", daemon=True).start()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._ctx,
+            initializer=_init_worker,
+            initargs=(self._handler_factory, self._events, self._cancelled,
+                      max(1, (os.cpu_count() or 1) // self.max_workers)),
+        )
+
+    def run(self, payload, progress_cb=None, block=False):
+        if not self._slots.acquire(blocking=block):
+            raise EngineSaturated(f"Worker ocupado: {self.max_workers} processos em uso e fila cheia")
+
+        token = uuid.uuid4().hex
+        if progress_cb is not None:
+            self._callbacks[token] = progress_cb
+            self._delivered[token] = 0
+        try:
+            with self._pool_lock:
+                pool = self._pool
+            result, sent = pool.submit(_run_task, token, payload).result()
+            if progress_cb is not None:
+                with self._delivered_cond:
+                    self._delivered_cond.wait_for(lambda: self._delivered[token] >= sent, timeout=5.0)
+            return result
+        except BrokenProcessPool:
+            # Um worker morreu (ex.: OOM). Recria o pool para as próximas requisições.
+            print("[EXECUTOR] Pool de processos quebrado; recriando workers")
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+            raise
+        finally:
+            self._callbacks.pop(token, None)
+            self._delivered.pop(token, None)
+            self._cancelled.pop(token, None)
+            self._slots.release()
+
+    def _dispatch_events(self):
+        while True:
+            try:
+                token, args = self._events.get()
+            except (EOFError, OSError):
+                return  # Manager encerrado (shutdown)
+            callback = self._callbacks.get(token)
+            if callback is None:
+                continue
+            try:
+                callback(*args)
+            except JobCancelled:
+                # O job foi cancelado no processo principal: avisa o worker
+                self._cancelled[token] = True
+            except Exception as e:
+                print(f"[EXECUTOR] Erro no callback de progresso: {e}")
+            with self._delivered_cond:
+                if token in self._delivered:
+                    self._delivered[token] += 1
+                self._delivered_cond.notify_all()
+
+    def shutdown(self):
+        self._pool.shutdown(cancel_futures=True)
+        self._manager.shutdown()
@@ -0,0 +1,16 @@
+import hashlib
+import pandas as pd
+
+def dataset_fingerprint(df, columns=None):
+    """
+    Hash de conteúdo de um DataFrame (nomes de colunas + valores, ignorando o índice).
+    Usado como chave dos artefatos em cache (vocabulários do wrangler, modelos AIM).
+    """
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(str(len(df)).encode("utf-8"))
+    if len(df.columns) > 0:
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
@@ -0,0 +1,178 @@
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+
+# Estados de um job (strings, espelhando os campos `state` do privacy.proto)
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+TERMINAL_STATES = (DONE, FAILED, CANCELLED)
+
+class JobCancelled(Exception):
+    """Levantada no próximo checkpoint de etapa de um job cancelado."""
+
+class Job:
+    def __init__(self, payload):
+        self.job_id = uuid.uuid4().hex
+        self.payload = payload
+        self.state = QUEUED
+        self.result = None
+        self.error = ""
+        self.events = []  # Histórico de progresso, reenviado a quem começa a assistir depois
+        self.cancel_event = threading.Event()
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+class JobQueue:
+    """
+    Fila de jobs em processo: threads consumidoras executam `handler(payload, report)` e
+    cada chamada a `report` vira um evento de progresso para os observadores do job.
+    O cancelamento é cooperativo: `report` levanta JobCancelled no próximo checkpoint.
+    Com `max_queued` > 0, `submit` levanta queue.Full quando há jobs demais aguardando.
+    """
+
+    def __init__(self, handler, workers=1, max_queued=0, max_finished=200):
+        self._handler = handler
+        self.max_queued = max_queued
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._pending = []  # Ordem de chegada dos jobs ainda em QUEUED (posição na fila)
+        self._cond = threading.Condition()
+        self.max_finished = max_finished
+        for i in range(workers):
+            threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True).start()
+
+    # --- API PÚBLICA ---
+
+    def submit(self, payload):
+        job = Job(payload)
+        with self._cond:
+            if self.max_queued and len(self._pending) >= self.max_queued:
+                raise queue.Full(f"{len(self._pending)} jobs aguardando na fila")
+            self._jobs[job.job_id] = job
+            self._pending.append(job.job_id)
+            self._append_event(job, stage="queued", progress=0.0)
+            self._prune()
+        self._queue.put(job.job_id)
+        print(f"[JOBS] Job {job.job_id} enfileirado (posição {self.queue_position(job.job_id)})")
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """Posição 1-based entre os jobs aguardando; 0 se o job já saiu da fila."""
+        with self._cond:
+            try:
+                return self._pending.index(job_id) + 1
+            except ValueError:
+                return 0
+
+    def cancel(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in TERMINAL_STATES:
+                return job
+            job.cancel_event.set()
+            if job.state == QUEUED:
+                # Ainda não começou: encerra já, o worker apenas descarta ao retirar da fila
+                self._pending.remove(job_id)
+                self._finish(job, CANCELLED, stage="cancelled")
+        print(f"[JOBS] Cancelamento solicitado: {job_id}")
+        return job
+
+    def watch(self, job_id, is_active=lambda: True, poll_interval=1.0):
+        """
+        Gera os eventos de progresso do job (desde o início) até ele terminar.
+        `is_active` permite encerrar cedo quando o cliente do stream desconecta.
+        """
+        sent = 0
+        while True:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                while sent == len(job.events) and job.state not in TERMINAL_STATES:
+                    self._cond.wait(timeout=poll_interval)
+                    if not is_active():
+                        return
+                new_events = job.events[sent:]
+                sent = len(job.events)
+                finished = job.state in TERMINAL_STATES
+            for event in new_events:
+                yield event
+            if finished:
+                return
+
+    # --- EXECUÇÃO ---
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None or job.state != QUEUED:
+                    continue
+                self._pending.remove(job_id)
+                job.state = RUNNING
+                job.started_at = time.time()
+                self._append_event(job, stage="started", progress=0.0)
+
+            def report(stage, progress, stage_seconds=0.0, message=""):
+                if job.cancel_event.is_set():
+                    raise JobCancelled(job.job_id)
+                with self._cond:
+                    self._append_event(job, stage, progress, stage_seconds, message)
+
+            try:
+                result = self._handler(job.payload, report)
+                with self._cond:
+                    job.result = result
+                    self._finish(job, DONE, stage="done")
+                print(f"[JOBS] Job {job_id} concluído em {job.elapsed():.1f}s")
+            except JobCancelled:
+                with self._cond:
+                    self._finish(job, CANCELLED, stage="cancelled")
+                print(f"[JOBS] Job {job_id} cancelado após {job.elapsed():.1f}s")
+            except Exception as e:
+                with self._cond:
+                    job.error = str(e)
+                    self._finish(job, FAILED, stage="failed", message=str(e))
+                print(f"[JOBS] Job {job_id} falhou: {e}")
+
+    # Os métodos abaixo assumem self._cond adquirido
+
+    def _append_event(self, job, stage, progress, stage_seconds=0.0, message=""):
+        job.events.append({
+            "job_id": job.job_id,
+            "state": job.state,
+            "stage": stage,
+            "progress": float(progress),
+            "stage_seconds": float(stage_seconds),
+            "elapsed_seconds": float(job.elapsed()),
+            "message": message,
+        })
+        self._cond.notify_all()
+
+    def _finish(self, job, state, stage, message=""):
+        job.state = state
+        job.finished_at = time.time()
+        progress = 1.0 if state == DONE else (job.events[-1]["progress"] if job.events else 0.0)
+        self._append_event(job, stage, progress, message=message)
+
+    def _prune(self):
+        """Esquece os jobs finalizados mais antigos além de max_finished."""
+        finished = [jid for jid, j in self._jobs.items() if j.state in TERMINAL_STATES]
+        for jid in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[jid]
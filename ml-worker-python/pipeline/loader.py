@@ -0,0 +1,118 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .transport import DATASET_SCHEME, dataset_name, apply_shared_table
+
+# Acima deste tamanho o dataset é amostrado para viabilizar o treinamento em tempo real
+SAMPLE_THRESHOLD = 100000
+SAMPLE_SIZE = 10000
+CSV_CHUNKSIZE = 200000
+
+def load_tse_sample(path, columns=None, threshold=SAMPLE_THRESHOLD, sample_size=SAMPLE_SIZE,
+                    random_state=42, chunksize=CSV_CHUNKSIZE):
+    """
+    Carrega só as colunas pedidas e amostra durante a leitura, sem materializar o arquivo inteiro.
+    Se o arquivo tiver mais de `threshold` linhas, retorna `sample_size` linhas uniformes;
+    caso contrário, retorna todas.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if path.startswith(DATASET_SCHEME):
+        df, total = _sample_shared(path, columns, threshold, sample_size, random_state)
+    elif ext == '.parquet':
+        df, total = _sample_parquet(path, columns, threshold, sample_size, random_state)
+    else:
+        df, total = _sample_csv(path, columns, threshold, sample_size, random_state, chunksize)
+
+    if total > threshold:
+        print(f"[INFO] Dataset grande ({total} linhas). Amostrando {len(df)} para o AIM.")
+    df = df.reset_index(drop=True)
+    # Tamanho do arquivo antes da amostragem (lido pelo tracing de etapas)
+    df.attrs["source_rows"] = int(total)
+    return df
+
+def _sample_csv(path, columns, threshold, sample_size, random_state, chunksize):
+    """
+    Reservoir sampling por chaves aleatórias (bottom-k): cada linha recebe uma chave
+    uniforme e o reservatório guarda as `threshold` menores. As `sample_size` menores
+    chaves desse reservatório formam uma amostra uniforme do arquivo todo.
+    """
+    rng = np.random.default_rng(random_state)
+    wanted = None if columns is None else set(columns)
+    usecols = None if wanted is None else (lambda c: c in wanted)
+
+    # O padrão do TSE é ponto e vírgula com encoding ISO-8859-1.
+    # dtype=str: o wrangler normaliza tudo para texto de qualquer forma.
+    reader = pd.read_csv(path, sep=';', encoding='iso-8859-1', usecols=usecols,
+                         dtype=str, chunksize=chunksize)
+
+    reservoir, keys = None, np.empty(0)
+    total = 0
+    for chunk in reader:
+        total += len(chunk)
+        chunk_keys = rng.random(len(chunk))
+        if reservoir is None:
+            reservoir, keys = chunk, chunk_keys
+        else:
+            reservoir = pd.concat([reservoir, chunk], ignore_index=True)
+            keys = np.concatenate([keys, chunk_keys])
+        if len(reservoir) > threshold:
+            keep = np.argpartition(keys, threshold)[:threshold]
+            reservoir, keys = reservoir.iloc[keep].reset_index(drop=True), keys[keep]
+
+    if reservoir is None:
+        return pd.DataFrame(columns=columns or []), 0
+    if total > threshold:
+        keep = np.argsort(keys, kind='stable')[:sample_size]
+        return reservoir.iloc[keep], total
+    # Arquivo pequeno: preserva a ordem original das linhas
+    return reservoir, total
+
+def _sample_parquet(path, columns, threshold, sample_size, random_state):
+    """
+    Projeção de colunas via pyarrow + amostragem por row group: sorteia os índices
+    globais das linhas e lê apenas os row groups que contêm alguma delas, um por vez.
+    """
+    pf = pq.ParquetFile(path)
+    if columns is not None:
+        columns = [c for c in columns if c in pf.schema_arrow.names]
+    total = pf.metadata.num_rows
+
+    if total <= threshold:
+        return pf.read(columns=columns).to_pandas(), total
+
+    rng = np.random.default_rng(random_state)
+    picked = np.sort(rng.choice(total, size=sample_size, replace=False))
+
+    parts = []
+    offset = 0
+    for rg in range(pf.num_row_groups):
+        n_rows = pf.metadata.row_group(rg).num_rows
+        lo, hi = np.searchsorted(picked, [offset, offset + n_rows])
+        if hi > lo:
+            table = pf.read_row_group(rg, columns=columns)
+            parts.append(table.take(picked[lo:hi] - offset).to_pandas())
+        offset += n_rows
+
+    df = pd.concat(parts, ignore_index=True)
+    # Embaralha de forma reprodutível para não herdar a ordem física do arquivo
+    return df.sample(frac=1.0, random_state=random_state), total
+
+def _sample_shared(path, columns, threshold, sample_size, random_state):
+    """
+    Dataset recebido por stream (transport.py): lido sem cópia da memória compartilhada;
+    só as linhas sorteadas são materializadas. Mesma amostra que o Parquet equivalente.
+    """
+    def sample(table):
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        total = table.num_rows
+        if total <= threshold:
+            return table.to_pandas(), total
+        rng = np.random.default_rng(random_state)
+        picked = np.sort(rng.choice(total, size=sample_size, replace=False))
+        df = table.take(picked).to_pandas()
+        return df.sample(frac=1.0, random_state=random_state), total
+
+    return apply_shared_table(dataset_name(path), sample)
@@ -0,0 +1,221 @@
+import math
+import itertools
+import numpy as np
+
+from .encoded import EncodedFrame
+
+# Fração do orçamento (rho) de cada fase: marginais de 1 via, escolha dos pares e medição dos pares
+BUDGET_SPLIT = (1 / 3, 1 / 3, 1 / 3)
+# Iterações do IPF que ajusta cada tabela de 2 vias às marginais estimadas dos seus nós
+CALIBRATION_ITERS = 20
+
+# --- CONTABILIDADE DE PRIVACIDADE (zCDP) ---
+
+def cdp_rho(epsilon, delta):
+    """Maior rho tal que rho-zCDP implica (epsilon, delta)-DP: eps = rho + 2*sqrt(rho*ln(1/delta))."""
+    log_inv = math.log(1 / delta)
+    return (math.sqrt(log_inv + epsilon) - math.sqrt(log_inv)) ** 2
+
+def gaussian_sigma(rho, sensitivity=1.0):
+    """Desvio do mecanismo gaussiano com custo rho (sensibilidade L2 = 1 para contagens)."""
+    return sensitivity * math.sqrt(1 / (2 * rho))
+
+def _project_simplex(values):
+    """Contagens ruidosas -> distribuição (negativos zerados; tudo zero vira uniforme)."""
+    p = np.clip(values, 0, None)
+    total = p.sum()
+    return p / total if total > 0 else np.full(len(p), 1 / len(p))
+
+class MarginalSynthesizer:
+    """
+    Sintetizador categórico com privacidade diferencial em NumPy, alternativa ao AIM do
+    synthcity (SYNTH_ENGINE=marginal). Sobre os códigos inteiros do dado limpo:
+
+    1. mede todas as marginais de 1 via com o mecanismo gaussiano;
+    2. escolhe uma árvore de pares (como o MST) com o mecanismo exponencial, premiando os
+       pares mais distantes da independência; pares acima de `max_cells` ficam de fora;
+    3. mede as marginais de 2 vias da árvore, também com ruído gaussiano;
+    4. calibra a árvore de junção (cliques = arestas, separadores = nós): cada nó combina
+       as suas medições por variância inversa e cada aresta é ajustada por IPF a esses
+       nós, então os cliques concordam nos separadores;
+    5. gera por amostragem ancestral: a raiz pela marginal, cada filho pela condicional
+       P(filho | pai) da aresta, numa busca binária vetorizada.
+
+    As fases dividem rho-zCDP (convertido de epsilon/delta) segundo BUDGET_SPLIT. Tudo
+    roda em CPU, sem torch; o modelo é só arrays NumPy (cabe no ModelCache).
+    """
+
+    def __init__(self, epsilon=1.0, delta=1e-6, max_cells=50000, random_state=42):
+        self.epsilon = float(epsilon)
+        self.delta = float(delta)
+        self.max_cells = int(max_cells)
+        self.random_state = random_state
+        self.columns = []
+        self.vocab = {}
+        self.edges = []  # (pai, filho) em ordem de amostragem
+        self.roots = []
+        self.node_marginals = {}
+        self.conditionals = {}  # filho -> P(filho | pai), matriz card_pai x card_filho
+        self._rng = None
+
+    # --- TREINO ---
+
+    def fit(self, df):
+        encoded = df if isinstance(df, EncodedFrame) else EncodedFrame.from_frame(df)
+        self.columns = list(encoded.columns)
+        self.vocab = dict(encoded.vocab)
+        rng = np.random.default_rng(self.random_state)
+        self._rng = rng
+
+        codes = {c: encoded.codes[c].astype(np.int64) for c in self.columns}
+        cards = {c: len(self.vocab[c]) for c in self.columns}
+        n_cols = len(self.columns)
+        rho = cdp_rho(self.epsilon, self.delta)
+        rho_one, rho_select, rho_two = (rho * share for share in BUDGET_SPLIT)
+
+        # 1. Marginais de 1 via (sensibilidade L2 = 1 cada)
+        sigma_one = gaussian_sigma(rho_one / n_cols)
+        noisy_one = {c: np.bincount(codes[c], minlength=cards[c]) + rng.normal(0, sigma_one, cards[c])
+                     for c in self.columns}
+        n_est = max(1.0, float(np.mean([v.sum() for v in noisy_one.values()])))
+        independent = {c: _project_simplex(noisy_one[c]) for c in self.columns}
+
+        # 2. Árvore de pares: Kruskal com o mecanismo exponencial em cada rodada
+        candidates = [(a, b) for a, b in itertools.combinations(self.columns, 2)
+                      if cards[a] * cards[b] <= self.max_cells]
+        pair_counts = {(a, b): self._pair_counts(codes[a], codes[b], cards[a], cards[b]) for a, b in candidates}
+        # Distância L1 entre o par real e o produto das marginais ruidosas (sensibilidade 1)
+        scores = {(a, b): float(np.abs(pair_counts[(a, b)] - n_est * np.outer(independent[a], independent[b])).sum())
+                  for a, b in candidates}
+        tree = self._select_tree(candidates, scores, n_cols - 1, rho_select, rng)
+
+        # 3. Marginais de 2 vias da árvore
+        noisy_two, sigma_two = {}, None
+        if tree:
+            sigma_two = gaussian_sigma(rho_two / len(tree))
+            for a, b in tree:
+                noisy_two[(a, b)] = pair_counts[(a, b)] + rng.normal(0, sigma_two, pair_counts[(a, b)].shape)
+
+        # 4. Calibração da árvore de junção
+        self.node_marginals = self._estimate_nodes(noisy_one, sigma_one, noisy_two, sigma_two, cards)
+        joints = {edge: self._calibrate(noisy_two[edge], self.node_marginals[edge[0]],
+                                        self.node_marginals[edge[1]]) for edge in tree}
+        self._orient(tree, joints)
+        print(f"[SYNTH] Marginal treinado: {n_cols} colunas, {len(tree)} pares, rho={rho:.4f}")
+        return self
+
+    @staticmethod
+    def _pair_counts(codes_a, codes_b, card_a, card_b):
+        return np.bincount(codes_a * card_b + codes_b, minlength=card_a * card_b).reshape(card_a, card_b).astype(float)
+
+    @staticmethod
+    def _select_tree(candidates, scores, n_edges, rho, rng):
+        """Árvore (floresta, se faltar par permitido) de até n_edges arestas, rho-zCDP no total."""
+        if not candidates or n_edges <= 0:
+            return []
+        # O mecanismo exponencial com parâmetro eps é eps^2/8-zCDP
+        eps_round = math.sqrt(8 * rho / n_edges)
+        component = {}
+
+        def find(col):
+            while component.get(col, col) != col:
+                col = component[col]
+            return col
+
+        tree = []
+        for _ in range(n_edges):
+            options = [pair for pair in candidates if find(pair[0]) != find(pair[1])]
+            if not options:
+                break
+            utility = np.array([scores[pair] for pair in options])
+            # Gumbel-max: amostra exata de exp(eps * score / 2) normalizado
+            chosen = options[int(np.argmax(eps_round * utility / 2 + rng.gumbel(size=len(options))))]
+            component[find(chosen[0])] = find(chosen[1])
+            tree.append(chosen)
+        return tree
+
+    def _estimate_nodes(self, noisy_one, sigma_one, noisy_two, sigma_two, cards):
+        """Média por variância inversa da medição de 1 via e das somas das arestas que tocam o nó."""
+        marginals = {}
+        for col in self.columns:
+            weighted, weights = noisy_one[col] / sigma_one ** 2, 1 / sigma_one ** 2
+            for (a, b), table in noisy_two.items():
+                if col == a:
+                    var = sigma_two ** 2 * cards[b]
+                    weighted, weights = weighted + table.sum(axis=1) / var, weights + 1 / var
+                elif col == b:
+                    var = sigma_two ** 2 * cards[a]
+                    weighted, weights = weighted + table.sum(axis=0) / var, weights + 1 / var
+            marginals[col] = _project_simplex(weighted / weights)
+        return marginals
+
+    @staticmethod
+    def _calibrate(noisy, p_a, p_b, iters=CALIBRATION_ITERS):
+        """IPF da tabela ruidosa (sem negativos) até bater com as marginais dos dois nós."""
+        joint = np.clip(noisy, 0, None)
+        total = joint.sum()
+        joint = joint / total if total > 0 else np.zeros_like(joint)
+        # Uma fração ínfima da independência garante suporte em toda linha/coluna com massa
+        joint = joint + 1e-9 * np.outer(p_a, p_b)
+        for _ in range(iters):
+            joint *= (p_a / np.maximum(joint.sum(axis=1), 1e-300))[:, None]
+            joint *= (p_b / np.maximum(joint.sum(axis=0), 1e-300))[None, :]
+        return joint
+
+    def _orient(self, tree, joints):
+        """Enraíza cada componente e guarda P(filho | pai) na ordem de amostragem (BFS)."""
+        neighbors = {c: [] for c in self.columns}
+        for a, b in tree:
+            neighbors[a].append((b, joints[(a, b)]))
+            neighbors[b].append((a, joints[(a, b)].T))
+        self.edges, self.roots, self.conditionals = [], [], {}
+        visited = set()
+        for root in self.columns:
+            if root in visited:
+                continue
+            self.roots.append(root)
+            visited.add(root)
+            queue = [root]
+            while queue:
+                parent = queue.pop(0)
+                for child, joint in neighbors[parent]:
+                    if child in visited:
+                        continue
+                    rows = joint.sum(axis=1, keepdims=True)
+                    # Pai sem massa na aresta: o filho segue a própria marginal
+                    cond = np.where(rows > 0, joint / np.maximum(rows, 1e-300), self.node_marginals[child])
+                    self.conditionals[child] = cond
+                    self.edges.append((parent, child))
+                    visited.add(child)
+                    queue.append(child)
+
+    # --- GERAÇÃO ---
+
+    def generate(self, count, random_state=None):
+        """DataFrame de `count` linhas (rótulos em texto, colunas na ordem do treino)."""
+        rng = np.random.default_rng(random_state) if random_state is not None else self._rng
+        if rng is None:
+            rng = self._rng = np.random.default_rng(self.random_state)
+        codes = {}
+        for root in self.roots:
+            cdf = np.cumsum(self.node_marginals[root])
+            codes[root] = np.minimum(np.searchsorted(cdf, rng.random(count) * cdf[-1], side="right"),
+                                     len(cdf) - 1)
+        for parent, child in self.edges:
+            codes[child] = self._sample_conditional(self.conditionals[child], codes[parent], rng)
+        encoded = EncodedFrame({c: codes[c] for c in self.columns}, self.vocab)
+        return encoded.to_frame()
+
+    @staticmethod
+    def _sample_conditional(cond, parent_codes, rng):
+        """
+        Um sorteio por linha de P(filho | pai) sem laço: a CDF de cada linha da condicional
+        é deslocada pelo código do pai (linha k ocupa [k, k+1]) e uma única searchsorted
+        na CDF achatada resolve todas as linhas.
+        """
+        n_parent, n_child = cond.shape
+        cdf = np.cumsum(cond, axis=1)
+        cdf = cdf / np.maximum(cdf[:, -1:], 1e-300)
+        flat = (cdf + np.arange(n_parent)[:, None]).ravel()
+        idx = np.searchsorted(flat, parent_codes + rng.random(len(parent_codes)), side="right")
+        return np.clip(idx - parent_codes * n_child, 0, n_child - 1)
@@ -4,26 +4,25 @@ import joblib
 import os
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, f1_score
-from sklearn.preprocessing import LabelEncoder
+from .encoded import encode_shared
 from sklearn.model_selection import train_test_split
 
 def run_ml_comparison(path_real, path_synth, df_clean, target_col, epsilon_label):
     print(f"\n Avaliando Utilidade Preditiva [Target: {target_col} | Epsilon: {epsilon_label}]")
-    os.makedirs("models/evaluators", exist_index=True)
+    os.makedirs("models/evaluators", exist_ok=True)
     
     # 1. Carregamento
     df_real = pd.read_csv(path_real, sep=';', encoding='iso-8859-1', low_memory=False).sample(100000, random_state=42)
     df_synth = pd.read_parquet(path_synth)
-    df_wrangled = df_clean.copy() # O dado que veio do wrangling no pipeline
+    # O dado que veio do wrangling no pipeline: DataFrame ou o EncodedFrame do engine (last_encoded)
+    df_wrangled = df_clean
 
     # 2. Pré-processamento (Label Encoding Uniforme)
-    combined = pd.concat([df_real, df_synth, df_wrangled], axis=0).astype(str)
-    for col in df_real.columns:
-        le = LabelEncoder()
-        le.fit(combined[col])
-        df_real[col] = le.transform(df_real[col].astype(str))
-        df_synth[col] = le.transform(df_synth[col].astype(str))
-        df_wrangled[col] = le.transform(df_wrangled[col].astype(str))
+    # Vocabulário comum ordenado: mesmos códigos de um LabelEncoder na concatenação, sem
+    # concatenar nem converter as três bases inteiras para texto. Só entram as colunas
+    # presentes nas três (o real cru tem colunas que o wrangling descartou)
+    df_real, df_synth, df_wrangled = (encoded.codes_frame() for encoded in encode_shared(
+        [df_real, df_synth, df_wrangled], sort=True))
 
     # 3. Preparação (Split Real para Teste Final)
     X_r = df_real.drop(columns=[target_col])
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import joblib
+
+# Versão do formato da chave (incrementar se a serialização ou os parâmetros mudarem)
+MODEL_CACHE_VERSION = 1
+
+class ModelCache:
+    """
+    Cache de modelos treinados endereçado por conteúdo, com despejo LRU limitado por tamanho.
+    A chave combina o hash do dataset limpo com os hiperparâmetros que afetam o treino;
+    o "uso recente" é o mtime do arquivo, atualizado a cada acerto.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024**3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data_hash, **params):
+        payload = json.dumps({"v": MODEL_CACHE_VERSION, "data": data_hash, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.joblib")
+
+    def get(self, key):
+        """Retorna o modelo em cache ou None. Entradas corrompidas são descartadas."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            model = joblib.load(path)
+        except Exception as e:
+            print(f"[CACHE] Entrada inválida descartada ({os.path.basename(path)}): {e}")
+            self._remove(path)
+            return None
+        # Marca como usado recentemente para a política LRU
+        now = time.time()
+        os.utime(path, (now, now))
+        return model
+
+    def put(self, key, model):
+        """Grava o modelo de forma atômica e aplica o limite de tamanho."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Remove os modelos menos usados até o cache caber em max_bytes."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".joblib"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            # O mais recente nunca é despejado, mesmo que sozinho ultrapasse o limite
+            for _, size, path in sorted(entries)[:-1]:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                print(f"[CACHE] Despejado (LRU): {os.path.basename(path)}")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .encoded import encode_shared
+
+# Threads da busca (0 = todos os núcleos); o NumPy solta o GIL nas operações sobre os blocos
+HAMMING_THREADS = int(os.environ.get("HAMMING_THREADS", "0"))
+# Bytes de cada plano do contador por bloco de consultas (cada consulta ocupa n_candidatos/8):
+# blocos que cabem no cache L2 rendem mais que blocos grandes
+BLOCK_BYTES = 1 << 18
+# Candidatos por fragmento do índice (limita a memória dos bitsets de colunas de alta cardinalidade)
+SHARD_ROWS = 1 << 18
+
+_ONE = np.uint64(1)
+# Sequência de De Bruijn B(2, 6): (2^i * _DEBRUIJN) >> 58 é distinto para cada i em 0..63
+# (np.bitwise_count só existe no NumPy >= 2, e o anonymeter fixa numpy<1.27)
+_DEBRUIJN = np.uint64(0x03F79D71B4CB0A89)
+_DEBRUIJN_SHIFT = np.uint64(58)
+_DEBRUIJN_TABLE = np.zeros(64, dtype=np.int64)
+_DEBRUIJN_TABLE[[((1 << i) * 0x03F79D71B4CB0A89 % (1 << 64)) >> 58 for i in range(64)]] = np.arange(64)
+
+def _lowest_bits(words):
+    """Posição (0-63) do bit menos significativo de cada palavra não nula."""
+    low = words & (~words + _ONE)
+    return _DEBRUIJN_TABLE[(low * _DEBRUIJN) >> _DEBRUIJN_SHIFT], low
+
+class _Shard:
+    """
+    Um fragmento de candidatos em bitsets: para cada coluna e cada valor, um bitset (em
+    palavras de 64 bits) com as linhas que têm aquele valor, ou seja, o one-hot transposto.
+    Somar os bitsets dos valores de uma consulta num contador bit a bit (um plano por bit
+    da contagem) dá o número de colunas iguais de 64 candidatos por operação.
+    """
+
+    def __init__(self, codes):
+        self.n_rows, self.n_cols = codes.shape
+        self.n_words = -(-self.n_rows // 64)
+        rows = np.arange(self.n_rows)
+        word, bit = rows >> 6, np.left_shift(_ONE, (rows & 63).astype(np.uint64))
+        self.bitsets = []
+        for j in range(self.n_cols):
+            values = codes[:, j].astype(np.int64) + 1  # -1 (desconhecido) ocupa a linha 0
+            # Uma linha a mais, sempre vazia, para valores que não aparecem neste fragmento
+            table = np.zeros((int(values.max(initial=0)) + 2, self.n_words), dtype=np.uint64)
+            np.bitwise_or.at(table, (values, word), bit)
+            self.bitsets.append(table)
+        self.valid = np.zeros(self.n_words, dtype=np.uint64)
+        np.bitwise_or.at(self.valid, word, bit)
+        self.n_planes = int(self.n_cols).bit_length()
+
+    def _match_planes(self, queries):
+        """Contador de colunas iguais (qb x palavras por plano, bit menos significativo primeiro)."""
+        shape = (len(queries), self.n_words)
+        planes = [np.zeros(shape, dtype=np.uint64) for _ in range(self.n_planes)]
+        carry, spare = np.empty(shape, dtype=np.uint64), np.empty(shape, dtype=np.uint64)
+        for j in range(self.n_cols):
+            table = self.bitsets[j]
+            values = queries[:, j].astype(np.int64) + 1
+            values = np.where((values >= 0) & (values < len(table) - 1), values, len(table) - 1)
+            np.take(table, values, axis=0, out=carry)
+            # Soma com vai-um, no lugar: a j-ésima coluna só alcança os bit_length(j+1) primeiros planos
+            for p in range((j + 1).bit_length()):
+                np.bitwise_and(planes[p], carry, out=spare)
+                np.bitwise_xor(planes[p], carry, out=planes[p])
+                carry, spare = spare, carry
+        return planes
+
+    def _best_level(self, planes, alive):
+        """Maior contagem entre os candidatos vivos e o bitset dos que a atingem (por consulta)."""
+        best = np.zeros(len(alive), dtype=np.int64)
+        level = alive.copy()
+        for p in range(len(planes) - 1, -1, -1):
+            narrowed = level & planes[p]
+            hit = narrowed.any(axis=1)
+            level[hit] = narrowed[hit]
+            best += hit.astype(np.int64) << p
+        return best, level
+
+    def topk(self, queries, k):
+        """Distâncias e índices (qb x k) dos k mais próximos neste fragmento; empates pelo menor índice."""
+        n_queries = len(queries)
+        dist = np.full((n_queries, k), self.n_cols + 1, dtype=np.int64)
+        index = np.full((n_queries, k), -1, dtype=np.int64)
+        if not self.n_rows:
+            return dist, index
+        planes = self._match_planes(queries)
+        alive = np.broadcast_to(self.valid, (n_queries, self.n_words)).copy()
+        filled = np.zeros(n_queries, dtype=np.int64)
+        rows = np.arange(n_queries)
+        while True:
+            pending = filled < k
+            if not pending.any() or not alive[pending].any():
+                break
+            best, level = self._best_level(planes, alive)
+            alive &= ~level
+            # Candidatos do nível, do menor índice ao maior, até completar k por consulta
+            while True:
+                take = (filled < k) & level.any(axis=1)
+                if not take.any():
+                    break
+                r = rows[take]
+                w = np.argmax(level[r] != 0, axis=1)
+                bit, low = _lowest_bits(level[r, w])
+                level[r, w] ^= low
+                dist[r, filled[r]] = self.n_cols - best[r]
+                index[r, filled[r]] = w * 64 + bit
+                filled[r] += 1
+        return dist, index
+
+class HammingIndex:
+    """
+    Índice de vizinhos mais próximos para registros categóricos (matriz n x d de códigos,
+    ver EncodedFrame.matrix) na distância de Hamming: o número de colunas diferentes, a
+    mesma distância de Gower que o anonymeter usa para colunas categóricas.
+
+    Cada fragmento de até SHARD_ROWS candidatos guarda os bitsets one-hot de cada valor
+    (_Shard); uma consulta soma os d bitsets dos seus valores num contador bit a bit e tira
+    os k maiores níveis sem nunca materializar a matriz consultas x candidatos. As consultas
+    repetidas são resolvidas uma vez e os blocos de consultas (BLOCK_BYTES) rodam em threads.
+    """
+
+    def __init__(self, candidates, shard_rows=SHARD_ROWS, threads=None):
+        candidates = np.asarray(candidates)
+        self.n_rows, self.n_cols = candidates.shape
+        self.threads = threads or HAMMING_THREADS or os.cpu_count() or 1
+        self.shards = [(start, _Shard(candidates[start:start + shard_rows]))
+                       for start in range(0, max(self.n_rows, 1), shard_rows)]
+
+    def query(self, queries, k=1):
+        """
+        (distâncias, índices), ambos q x k, dos k candidatos mais próximos de cada consulta,
+        ordenados por distância e, nos empates, pelo menor índice.
+        """
+        queries = np.asarray(queries)
+        k = min(k, self.n_rows)
+        if not len(queries) or k <= 0:
+            return np.zeros((len(queries), max(k, 0)), np.int64), np.zeros((len(queries), max(k, 0)), np.int64)
+        # Consultas idênticas têm os mesmos vizinhos: só os padrões distintos são buscados
+        patterns, inverse = np.unique(queries, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        dist = np.empty((len(patterns), k), dtype=np.int64)
+        index = np.empty((len(patterns), k), dtype=np.int64)
+        n_words = max(shard.n_words for _, shard in self.shards)
+        block_rows = int(np.clip(BLOCK_BYTES // max(n_words * 8, 1), 8, 1024))
+
+        def run(start):
+            block = patterns[start:start + block_rows]
+            dist[start:start + len(block)], index[start:start + len(block)] = self._block_topk(block, k)
+
+        starts = range(0, len(patterns), block_rows)
+        if self.threads > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=self.threads) as pool:
+                list(pool.map(run, starts))
+        else:
+            for start in starts:
+                run(start)
+        return dist[inverse], index[inverse]
+
+    def _block_topk(self, block, k):
+        if len(self.shards) == 1:
+            return self.shards[0][1].topk(block, k)
+        parts = [(shard.topk(block, k), start) for start, shard in self.shards]
+        dist = np.concatenate([d for (d, _), _ in parts], axis=1)
+        index = np.concatenate([np.where(i >= 0, i + start, self.n_rows) for (_, i), start in parts], axis=1)
+        # Mesma ordem de um índice único: distância e depois o índice global
+        order = np.lexsort((index, dist), axis=1)[:, :k]
+        return np.take_along_axis(dist, order, axis=1), np.take_along_axis(index, order, axis=1)
+
+# --- MÉTRICAS DE DISTÂNCIA ENTRE REGISTROS ---
+
+def distance_report(df_ori, df_syn, columns=None, threads=None):
+    """
+    Distância de cada registro sintético ao registro real mais próximo (DCR, fração de
+    colunas diferentes) e a razão entre o vizinho mais próximo e o segundo (NNDR). NNDR
+    perto de 0 indica um sintético muito mais perto de um real específico que de qualquer
+    outro; quando os dois vizinhos empatam (inclusive em distância 0) a razão é 1.
+    """
+    ori, syn = encode_shared([df_ori, df_syn], columns=columns)
+    n_cols = len(ori.columns)
+    dist, _ = HammingIndex(ori.matrix(), threads=threads).query(syn.matrix(), k=2)
+    first = dist[:, 0]
+    second = dist[:, 1] if dist.shape[1] > 1 else first
+    dcr = first / max(n_cols, 1)
+    nndr = np.where(second > 0, first / np.maximum(second, 1), 1.0)
+    return {"columns": ori.columns, "dcr": dcr, "nndr": nndr}
+
+def summarize_distance(report):
+    """Resumo publicado na resposta: cópias exatas, DCR (p5 e mediana) e NNDR mediana."""
+    dcr, nndr = report["dcr"], report["nndr"]
+    if not len(dcr):
+        return {"dcr_exact_rate": 0.0, "dcr_p05": 0.0, "dcr_median": 0.0, "nndr_median": 0.0}
+    return {
+        "dcr_exact_rate": float(np.mean(dcr == 0)),
+        "dcr_p05": float(np.quantile(dcr, 0.05)),
+        "dcr_median": float(np.median(dcr)),
+        "nndr_median": float(np.median(nndr)),
+    }
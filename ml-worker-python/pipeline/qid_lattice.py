@@ -0,0 +1,127 @@
+import time
+import math
+import itertools
+import numpy as np
+import pandas as pd
+
+from .encoded import encode_shared
+from .wrangling_tse import TSEDataWrangler
+
+# Tamanho máximo das combinações de quase-identificadores exploradas
+QID_MAX_SIZE = 5
+# Chaves combinadas são compactadas antes de passar disso (cabem em int64 com folga)
+_KEY_LIMIT = 1 << 62
+
+def default_qid_columns(df):
+    """Colunas do TSEDataWrangler (brutas ou já tratadas) presentes em df."""
+    wrangler = TSEDataWrangler()
+    candidates = wrangler.base_cols + [c for c in wrangler.required_columns() if c not in wrangler.base_cols]
+    return [c for c in candidates if c in df.columns]
+
+def class_sizes(frame, columns):
+    """
+    Tamanho de cada classe de equivalência de `columns` (registros com os mesmos valores):
+    group-by por hash (pd.factorize) sobre uma chave inteira que combina os códigos.
+    """
+    if not len(frame):
+        return np.zeros(0, dtype=np.int64)
+    key, size = None, 1
+    for col in columns:
+        codes = frame.codes[col].astype(np.int64) + 1  # -1 (desconhecido) vira um valor próprio
+        card = len(frame.vocab[col]) + 1
+        if key is None:
+            key, size = codes, card
+            continue
+        if size > _KEY_LIMIT // card:
+            key, uniques = pd.factorize(key)
+            size = len(uniques)
+        key, size = key * card + codes, size * card
+    ids, uniques = pd.factorize(key)
+    return np.bincount(ids, minlength=len(uniques))
+
+def _class_stats(sizes, n_rows, k):
+    return {
+        "classes": len(sizes),
+        "k": int(sizes.min()) if len(sizes) else 0,
+        "unique_ratio": float((sizes == 1).sum() / max(n_rows, 1)),
+        "at_risk_ratio": float(sizes[sizes < k].sum() / max(n_rows, 1)),
+    }
+
+def _candidates(safe, size):
+    """
+    Junção do Apriori: uniões de duas combinações seguras que diferem só no último item,
+    mantidas apenas se todos os subconjuntos de tamanho size-1 também forem seguros.
+    """
+    ordered = sorted(safe)
+    for i, a in enumerate(ordered):
+        for b in ordered[i + 1:]:
+            if a[:-1] != b[:-1]:
+                break
+            combo = a + b[-1:]
+            if all(sub in safe for sub in itertools.combinations(combo, size - 1)):
+                yield combo
+
+def explore_qids(frame, columns=None, max_size=QID_MAX_SIZE, k=2, tolerance=0.01):
+    """
+    Busca no reticulado de subconjuntos de `columns` (até `max_size` colunas) as combinações
+    mínimas arriscadas: aquelas em que mais de `tolerance` dos registros ficam em classes de
+    equivalência menores que `k` (k=2: registros únicos), mas nenhum subconjunto próprio fica.
+
+    O risco só cresce ao acrescentar colunas (as classes só se dividem), então, como no
+    Apriori, os superconjuntos de uma combinação arriscada não são avaliados: ela já é o
+    achado mínimo. Retorna (DataFrame das combinações mínimas, estatísticas da busca).
+    """
+    columns = list(frame.columns if columns is None else columns)
+    n_rows = len(frame)
+    start = time.perf_counter()
+    rows, safe, evaluated = [], set(), 0
+
+    level = [(col,) for col in columns]
+    for size in range(1, max_size + 1):
+        next_safe = set()
+        for combo in level:
+            stats = _class_stats(class_sizes(frame, combo), n_rows, k)
+            evaluated += 1
+            if stats["at_risk_ratio"] > tolerance:
+                rows.append({"columns": combo, "size": size, **stats})
+            else:
+                next_safe.add(combo)
+        safe = next_safe
+        if size == max_size or len(safe) < 2:
+            break
+        level = list(_candidates(safe, size + 1))
+        if not level:
+            break
+
+    # Combinações que a busca sem poda avaliaria e que o Apriori descartou
+    total = sum(math.comb(len(columns), size) for size in range(1, max_size + 1))
+    report = pd.DataFrame(rows, columns=["columns", "size", "classes", "k", "unique_ratio", "at_risk_ratio"])
+    report = report.sort_values(["size", "at_risk_ratio"], ascending=[True, False], ignore_index=True)
+    search = {"rows": n_rows, "columns": len(columns), "evaluated": evaluated, "pruned": total - evaluated,
+              "seconds": time.perf_counter() - start}
+    return report, search
+
+def qid_risk_report(df_real, df_syn=None, columns=None, max_size=QID_MAX_SIZE, k=2, tolerance=0.01):
+    """
+    Combinações mínimas arriscadas de quase-identificadores no dado real e, se houver, no
+    sintético (codificados com o mesmo vocabulário). Para cada combinação mínima do real,
+    `syn_at_risk_ratio` mostra quanto o sintético ainda expõe a mesma combinação.
+    """
+    frames = [f for f in (df_real, df_syn) if f is not None]
+    if columns is None:
+        columns = default_qid_columns(frames[0])
+    encoded = encode_shared(frames, columns=columns)
+
+    result = {}
+    for name, frame in zip(("real", "syn"), encoded):
+        report, search = explore_qids(frame, columns, max_size=max_size, k=k, tolerance=tolerance)
+        print(f"[QID] {name}: {len(report)} combinações mínimas arriscadas | {search['evaluated']} avaliadas, "
+              f"{search['pruned']} podadas | {search['seconds']:.2f}s")
+        result[name], result[f"{name}_search"] = report, search
+
+    if "syn" in result:
+        syn_frame = encoded[1]
+        result["real"]["syn_at_risk_ratio"] = [
+            _class_stats(class_sizes(syn_frame, combo), len(syn_frame), k)["at_risk_ratio"]
+            for combo in result["real"]["columns"]]
+    return result
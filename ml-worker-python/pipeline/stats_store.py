@@ -0,0 +1,346 @@
+import os
+import json
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+
+from .fingerprint import dataset_fingerprint
+from .utility import MAX_DENSE_CELLS
+from .loader import load_tse_sample
+from .encoded import encoded_path, sidecar_metadata
+from .wrangling_tse import TSEDataWrangler, fit_wrangler, WRANGLER_CACHE_DIR
+
+# Versão do formato do arquivo .stats.npz (incrementar ao mudar o layout dos arrays)
+STATS_FORMAT_VERSION = 1
+# Variante do store de um arquivo já limpo (run_epsilon_sweep com preprocess=False): a amostra do
+# loader contada como está. Nunca o <base>.stats.npz, que a linha de comando conta do Parquet inteiro
+CLEAN_VARIANT = "clean"
+
+def stats_path(dataset_path, variant=None):
+    """
+    Arquivo de estatísticas ao lado do dataset: base.parquet -> base.stats.npz.
+    `variant` separa stores de preparos diferentes do mesmo arquivo (ex.: estratégia do wrangler).
+    """
+    base = os.path.splitext(dataset_path)[0]
+    return f"{base}.{variant}.stats.npz" if variant else f"{base}.stats.npz"
+
+class SufficientStats:
+    """
+    Estatísticas suficientes de um dataset categórico: contagens de 1 via (um vetor por
+    coluna) e de 2 vias (uma matriz por par; triplas (a, b, n) quando o produto das
+    cardinalidades passa de MAX_DENSE_CELLS).
+
+    Os códigos seguem a ordem de primeira aparição e categorias novas só entram no fim
+    do vocabulário, então update() soma as contagens de um delta sem reler as linhas já
+    contadas. Valores nulos ficam fora das tabelas (como no value_counts), em `missing`.
+    """
+
+    def __init__(self, columns, pairs=True):
+        self.columns = list(columns)
+        self.pairs = pairs
+        self.n_rows = 0
+        self.sources = []  # Fingerprints dos frames somados (base + deltas), em ordem
+        self.vocab = [np.empty(0, dtype=object) for _ in self.columns]
+        self.missing = np.zeros(len(self.columns), dtype=np.int64)
+        self.counts1 = [np.zeros(0, dtype=np.int64) for _ in self.columns]
+        self.counts2 = {}  # (i, j) com i < j -> matriz densa ou tupla (a, b, n)
+        self._col_index = {col: j for j, col in enumerate(self.columns)}
+        self._lookup = [pd.Index([], dtype=object) for _ in self.columns]
+
+    @classmethod
+    def build(cls, df, columns=None, pairs=True):
+        """Conta todas as marginais de df em uma passada."""
+        stats = cls(df.columns if columns is None else columns, pairs=pairs)
+        return stats.update(df)
+
+    # --- ATUALIZAÇÃO INCREMENTAL ---
+
+    def update(self, df):
+        """Soma as contagens de novas linhas (mesmas colunas) às tabelas existentes."""
+        missing_cols = [c for c in self.columns if c not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Delta sem as colunas {missing_cols}")
+
+        fingerprint = dataset_fingerprint(df, columns=self.columns)
+        if fingerprint in self.sources:
+            print(f"[STATS] Delta já contabilizado ({fingerprint[:12]}); ignorado")
+            return self
+
+        codes = self.encode(df, grow=True)
+        cards = self.cardinalities()
+        for j in range(len(self.columns)):
+            valid = codes[:, j] >= 0
+            self.missing[j] += int((~valid).sum())
+            self.counts1[j] = _pad(self.counts1[j], (cards[j],))
+            self.counts1[j] += np.bincount(codes[valid, j], minlength=cards[j])
+
+        if self.pairs:
+            for i, j in itertools.combinations(range(len(self.columns)), 2):
+                self._add_pair(i, j, codes, cards)
+
+        self.n_rows += len(df)
+        self.sources.append(fingerprint)
+        return self
+
+    def update_from_file(self, path, transform=None):
+        """
+        Atualiza a partir de um arquivo delta (Parquet ou CSV do TSE). `transform` aplica
+        ao delta o mesmo preparo da base (ex.: wrangler.transform) antes da contagem.
+        """
+        if os.path.splitext(path)[1].lower() == ".parquet":
+            df = pd.read_parquet(path, columns=self.columns if transform is None else None)
+        else:
+            df = pd.read_csv(path, sep=';', encoding='iso-8859-1', dtype=str)
+        if transform is not None:
+            df = transform(df)
+        print(f"[STATS] Delta {os.path.basename(path)}: {len(df)} linhas")
+        return self.update(df)
+
+    def _add_pair(self, i, j, codes, cards):
+        valid = (codes[:, i] >= 0) & (codes[:, j] >= 0)
+        a, b = codes[valid, i], codes[valid, j]
+        table = self.counts2.get((i, j))
+
+        if cards[i] * cards[j] <= MAX_DENSE_CELLS:
+            table = np.zeros((cards[i], cards[j]), dtype=np.int64) if table is None else _pad(table, (cards[i], cards[j]))
+            table += np.bincount(a * cards[j] + b, minlength=cards[i] * cards[j]).reshape(cards[i], cards[j])
+        else:
+            # Tabela esparsa: acumula as triplas e agrega células repetidas
+            old_a, old_b, old_n = _triplets(table) if table is not None else (a[:0], b[:0], a[:0])
+            keys = np.concatenate([old_a * cards[j] + old_b, a * cards[j] + b])
+            weights = np.concatenate([old_n, np.ones(len(a), dtype=np.int64)])
+            uniq, inv = np.unique(keys, return_inverse=True)
+            n = np.bincount(inv, weights=weights, minlength=len(uniq)).astype(np.int64)
+            table = (uniq // cards[j], uniq % cards[j], n)
+        self.counts2[(i, j)] = table
+
+    # --- CODIFICAÇÃO ---
+
+    def encode(self, df, columns=None, grow=False):
+        """
+        Códigos de df no vocabulário do store (-1 para nulos). Categorias desconhecidas
+        recebem códigos a partir da cardinalidade atual; com `grow` elas entram no vocabulário.
+        """
+        columns = self.columns if columns is None else columns
+        codes = np.full((len(df), len(columns)), -1, dtype=np.int64)
+        for k, col in enumerate(columns):
+            j = self._col_index[col]
+            series = df[col]
+            valid = series.notna().to_numpy()
+            local, uniques = pd.factorize(series[valid].astype(str).to_numpy())
+            idx = self._lookup[j].get_indexer(uniques)
+            unseen = idx < 0
+            idx[unseen] = len(self.vocab[j]) + np.arange(int(unseen.sum()))
+            if grow and unseen.any():
+                self.vocab[j] = np.concatenate([self.vocab[j], np.asarray(uniques[unseen], dtype=object)])
+                self._lookup[j] = pd.Index(self.vocab[j], dtype=object)
+            codes[valid, k] = idx[local]
+        return codes
+
+    # --- CONSULTAS ---
+
+    def cardinalities(self, columns=None):
+        columns = self.columns if columns is None else columns
+        return np.array([len(self.vocab[self._col_index[c]]) for c in columns], dtype=np.int64)
+
+    def counts(self, col):
+        """Contagens de 1 via, na ordem do vocabulário (uma categoria por posição)."""
+        return self.counts1[self._col_index[col]]
+
+    def value_counts(self, col):
+        """Equivalente a df[col].astype(str).value_counts() sobre todas as linhas contadas."""
+        j = self._col_index[col]
+        series = pd.Series(self.counts1[j], index=pd.Index(self.vocab[j], name=col), name="count")
+        return series[series > 0].sort_values(ascending=False, kind="stable")
+
+    def nunique(self, col):
+        return int(np.count_nonzero(self.counts(col)))
+
+    def pair(self, col_a, col_b):
+        """Tabela de 2 vias como triplas (códigos de col_a, códigos de col_b, contagem > 0)."""
+        i, j = self._col_index[col_a], self._col_index[col_b]
+        if i == j:
+            raise ValueError("Par de colunas precisa de duas colunas distintas")
+        if (min(i, j), max(i, j)) not in self.counts2:
+            raise KeyError(f"Par ({col_a}, {col_b}) não foi contado (pairs=False)")
+        a, b, n = _triplets(self.counts2[(min(i, j), max(i, j))])
+        return (a, b, n) if i < j else (b, a, n)
+
+    def mutual_information(self, col, target):
+        """Informação mútua (nats, como sklearn.metrics.mutual_info_score) a partir da tabela do par."""
+        a, b, n = self.pair(col, target)
+        total = n.sum()
+        if total == 0:
+            return 0.0
+        p_xy = n / total
+        p_x = np.bincount(a, weights=p_xy)
+        p_y = np.bincount(b, weights=p_xy)
+        return float(max(0.0, np.sum(p_xy * np.log(p_xy / (p_x[a] * p_y[b])))))
+
+    # --- PERSISTÊNCIA ---
+
+    def save(self, path):
+        """Grava tudo em um único .npz comprimido (sem pickle), com escrita atômica."""
+        arrays = {}
+        for j in range(len(self.columns)):
+            arrays[f"vocab_{j}"] = np.asarray(self.vocab[j], dtype=str)
+            arrays[f"counts1_{j}"] = self.counts1[j]
+        for (i, j), table in self.counts2.items():
+            if isinstance(table, tuple):
+                arrays[f"pair_{i}_{j}_a"], arrays[f"pair_{i}_{j}_b"], arrays[f"pair_{i}_{j}_n"] = table
+            else:
+                arrays[f"pair_{i}_{j}"] = table
+        meta = {
+            "version": STATS_FORMAT_VERSION,
+            "columns": self.columns,
+            "pairs": self.pairs,
+            "n_rows": self.n_rows,
+            "sources": self.sources,
+            "missing": self.missing.tolist(),
+        }
+        arrays["meta"] = np.array(json.dumps(meta, ensure_ascii=False))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um store salvo; retorna None se o arquivo for de outra versão do formato."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != STATS_FORMAT_VERSION:
+                return None
+            stats = cls(meta["columns"], pairs=meta["pairs"])
+            stats.n_rows = meta["n_rows"]
+            stats.sources = meta["sources"]
+            stats.missing = np.asarray(meta["missing"], dtype=np.int64)
+            for j in range(len(stats.columns)):
+                stats.vocab[j] = data[f"vocab_{j}"].astype(object)
+                stats._lookup[j] = pd.Index(stats.vocab[j], dtype=object)
+                stats.counts1[j] = data[f"counts1_{j}"]
+            if stats.pairs:
+                for i, j in itertools.combinations(range(len(stats.columns)), 2):
+                    key = f"pair_{i}_{j}"
+                    if key in data:
+                        stats.counts2[(i, j)] = data[key]
+                    else:
+                        stats.counts2[(i, j)] = (data[f"{key}_a"], data[f"{key}_b"], data[f"{key}_n"])
+        return stats
+
+def _pad(array, shape):
+    """Estende a tabela com zeros para categorias que apareceram depois."""
+    if array.shape == tuple(shape):
+        return array
+    return np.pad(array, [(0, s - d) for s, d in zip(shape, array.shape)])
+
+def _triplets(table):
+    if isinstance(table, tuple):
+        return table
+    a, b = np.nonzero(table)
+    return a, b, table[a, b]
+
+def load_or_build(df, path, columns=None):
+    """
+    Reaproveita o store em `path` se ele foi construído exatamente a partir de df (mesmo
+    fingerprint, sem deltas); senão conta df e grava o arquivo. Falha de escrita só
+    desativa o cache. Stores com deltas ficam em outro arquivo (ver delta_stats_path):
+    o engine pontua o sintético contra as marginais do dado em que ele foi treinado.
+    """
+    columns = list(df.columns) if columns is None else columns
+    fingerprint = dataset_fingerprint(df, columns=columns)
+    if path and os.path.exists(path):
+        try:
+            stats = SufficientStats.load(path)
+        except Exception as e:
+            print(f"[STATS] Arquivo inválido descartado ({os.path.basename(path)}): {e}")
+            stats = None
+        if stats is not None and stats.sources == [fingerprint] and stats.columns == columns:
+            print(f"[STATS] Estatísticas reaproveitadas: {os.path.basename(path)}")
+            return stats
+
+    stats = SufficientStats.build(df, columns=columns)
+    if path:
+        try:
+            stats.save(path)
+        except OSError as e:
+            print(f"[STATS] Não foi possível salvar {path}: {e}")
+    return stats
+
+# --- LINHA DE COMANDO: DELTAS SOBRE A BASE DO ENGINE ---
+
+def delta_stats_path(dataset_path, variant):
+    """Store da base do engine somada a deltas: base.<variant>.deltas.stats.npz (o engine não o lê)."""
+    return stats_path(dataset_path, variant=f"{variant}.deltas")
+
+def engine_base(dataset_path, variant):
+    """
+    Base do store que o engine grava para `variant` (<base>.<variant>.stats.npz): a mesma
+    amostra do loader, limpa pelo wrangler ajustado nela (o artefato em cache, ou o mesmo
+    fit refeito). Retorna (frame base, transform dos deltas com os vocabulários da base);
+    com CLEAN_VARIANT o arquivo já está limpo e os deltas são contados como estão.
+    """
+    if variant == CLEAN_VARIANT:
+        return load_tse_sample(dataset_path), None
+    wrangler = TSEDataWrangler(strategy=variant)
+    df = load_tse_sample(dataset_path, columns=wrangler.required_columns())
+    wrangler = fit_wrangler(df, strategy=variant, cache_dir=WRANGLER_CACHE_DIR)
+    return wrangler.transform(df), wrangler.transform
+
+def engine_columns(dataset_path, variant, base):
+    """
+    Colunas que o engine conta para esta base: as do store que ele gravou ou, sem o store,
+    as que sobram tirando as colunas PII registradas no sidecar codificado. Sem nenhum dos
+    dois as colunas PII são desconhecidas e a função falha, em vez de gravar PII em disco.
+    """
+    engine_path = stats_path(dataset_path, variant=variant)
+    stats = SufficientStats.load(engine_path) if os.path.exists(engine_path) else None
+    if stats is not None:
+        if stats.sources[:1] != [dataset_fingerprint(base, columns=stats.columns)]:
+            raise ValueError(f"{os.path.basename(engine_path)} é de outra versão do dataset: "
+                             "rode o pipeline de novo para atualizá-lo")
+        return stats.columns
+    if variant == CLEAN_VARIANT:
+        return list(base.columns)
+    sidecar = encoded_path(dataset_path, variant=variant)
+    if not os.path.exists(sidecar):
+        raise ValueError(f"Colunas PII desconhecidas: sem {os.path.basename(engine_path)} nem "
+                         f"{os.path.basename(sidecar)}. Rode o pipeline uma vez com DATASET_STATS=1")
+    pii_cols = set(sidecar_metadata(sidecar).get("pii_columns", []))
+    return [c for c in base.columns if c not in pii_cols]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store de contagens de 1 e 2 vias ao lado de um dataset.")
+    parser.add_argument("dataset", help="Dataset base; o store fica em <base>.stats.npz (ou, com --variant, "
+                                        "<base>.<variant>.deltas.stats.npz)")
+    parser.add_argument("--variant", default=None,
+                        help="Estratégia do wrangler do engine (ex.: high_fidelity): a base é a mesma amostra "
+                             "limpa que o engine conta e os deltas passam pelos mesmos vocabulários. "
+                             f"'{CLEAN_VARIANT}': arquivo já limpo da varredura de epsilons. Vazio: Parquet bruto inteiro")
+    parser.add_argument("--delta", nargs="*", default=[], help="Arquivos com linhas novas a somar ao store existente")
+    parser.add_argument("--rebuild", action="store_true", help="Recontar a base do zero")
+    args = parser.parse_args()
+
+    base, transform = engine_base(args.dataset, args.variant) if args.variant else (None, None)
+    path = delta_stats_path(args.dataset, args.variant) if args.variant else stats_path(args.dataset)
+    stats = None if args.rebuild or not os.path.exists(path) else SufficientStats.load(path)
+    if stats is None:
+        if base is None:
+            stats = SufficientStats.build(pd.read_parquet(args.dataset))
+        else:
+            try:
+                columns = engine_columns(args.dataset, args.variant, base)
+            except ValueError as e:
+                parser.error(str(e))
+            stats = SufficientStats.build(base, columns=columns)
+        print(f"[STATS] Base contada: {stats.n_rows} linhas, {len(stats.columns)} colunas")
+    for delta in args.delta:
+        stats.update_from_file(delta, transform=transform)
+    stats.save(path)
+
+    print(f"[STATS] {path}: {stats.n_rows} linhas | {len(stats.sources)} fonte(s)")
+    for col, card in zip(stats.columns, stats.cardinalities()):
+        print(f"   {col:<25} {card:>6} categorias")
@@ -0,0 +1,186 @@
+import os
+import time
+import resource
+import threading
+from contextlib import contextmanager
+
+# Histórico por etapa de cada execução em CSV (opcional: vazio desativa; ex.: STAGE_METRICS_LOG=stage_metrics.csv)
+STAGE_METRICS_LOG = os.environ.get("STAGE_METRICS_LOG", "")
+STAGE_FIELDS = ["name", "wall_sec", "cpu_sec", "peak_rss_mb", "rows_in", "rows_out"]
+
+# Intervalo entre leituras do RSS enquanto um bloco é medido
+RSS_SAMPLE_SEC = 0.05
+
+# --- MEDIÇÃO DE RECURSOS ---
+
+def current_rss_mb():
+    """Memória residente atual do processo, em MB (None sem /proc/self/statm)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_mb():
+    """Pico de memória residente do processo desde o início, em MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class _RssSampler:
+    """
+    Pico de RSS de um bloco sem alterar o estado do processo: uma thread lê o RSS atual a
+    cada RSS_SAMPLE_SEC. Se o pico histórico (VmHWM) subiu durante o bloco, ele é o pico
+    exato do bloco; senão vale a maior leitura (picos mais curtos que o intervalo escapam).
+    Sem /proc/self/statm fica o pico histórico do processo.
+    """
+
+    def __init__(self):
+        self._start_peak = peak_rss_mb()
+        self._peak = current_rss_mb() or 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_SEC):
+            rss = current_rss_mb()
+            if rss is None:
+                return
+            self._peak = max(self._peak, rss)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        peak, rss = peak_rss_mb(), current_rss_mb()
+        if peak > self._start_peak or rss is None:
+            return peak
+        return max(self._peak, rss)
+
+@contextmanager
+def measure():
+    """
+    Mede o bloco: tempo de parede, CPU do processo (todas as threads, inclusive as do
+    torch/polars) e pico de RSS durante o bloco (ver _RssSampler). O dict devolvido é
+    preenchido na saída do bloco.
+    A CPU e o pico são do processo inteiro: só isolam a etapa quando ela é a única em
+    execução no processo (modo 'process' ou requisições serializadas no 'inline').
+    """
+    usage = {}
+    sampler = _RssSampler()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield usage
+    finally:
+        usage["wall_sec"] = time.perf_counter() - wall
+        usage["cpu_sec"] = time.process_time() - cpu
+        usage["peak_rss_mb"] = sampler.stop()
+
+def merge_usage(total, usage):
+    """Soma tempos e mantém o maior pico (lotes sucessivos de um mesmo ataque)."""
+    if total is None:
+        return dict(usage)
+    return {
+        "wall_sec": total["wall_sec"] + usage["wall_sec"],
+        "cpu_sec": total["cpu_sec"] + usage["cpu_sec"],
+        "peak_rss_mb": max(total["peak_rss_mb"], usage["peak_rss_mb"]),
+    }
+
+# --- TRACER DE UMA EXECUÇÃO ---
+
+class StageTracer:
+    """
+    Registro das etapas de uma execução do pipeline, na ordem em que terminam. Cada etapa
+    é um dict com os campos de STAGE_FIELDS (o mesmo formato do StageMetric do proto).
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def stage(self, name, rows_in=0):
+        """
+        Mede o bloco como uma etapa. O bloco pode ajustar `rows_in`/`rows_out` no span
+        devolvido; sem `rows_out`, a etapa conta como tendo repassado todas as linhas.
+        """
+        span = {"name": name, "rows_in": int(rows_in), "rows_out": None}
+        with measure() as usage:
+            yield span
+        if span["rows_out"] is None:
+            span["rows_out"] = span["rows_in"]
+        span.update(usage)
+        self.spans.append(span)
+
+    def record(self, name, usage, rows_in=0, rows_out=None):
+        """Etapa medida fora do tracer (ex.: um ataque rodado num worker do pool de auditoria)."""
+        rows_out = rows_in if rows_out is None else rows_out
+        self.spans.append({"name": name, **usage, "rows_in": int(rows_in), "rows_out": int(rows_out)})
+
+    def summary(self):
+        return " | ".join(f"{s['name']} {s['wall_sec']:.2f}s" for s in self.spans)
+
+# --- AGREGADO DO PROCESSO (PROMETHEUS) ---
+
+class StageMetrics:
+    """
+    Acumula as etapas de todas as execuções do servidor e as exporta no formato texto do
+    Prometheus. Alimentado com os StageMetric das respostas, então cobre também as
+    execuções feitas nos processos do modo 'process'.
+    """
+
+    def __init__(self, prefix="privacy_stage"):
+        self.prefix = prefix
+        self._stages = {}
+        self._runs = 0
+        self._lock = threading.Lock()
+
+    def observe(self, spans):
+        with self._lock:
+            self._runs += 1
+            for span in spans:
+                agg = self._stages.setdefault(span["name"], {
+                    "count": 0, "wall_sum": 0.0, "cpu_sum": 0.0, "wall_last": 0.0,
+                    "rss_max": 0.0, "rows_in": 0, "rows_out": 0,
+                })
+                agg["count"] += 1
+                agg["wall_sum"] += span["wall_sec"]
+                agg["cpu_sum"] += span["cpu_sec"]
+                agg["wall_last"] = span["wall_sec"]
+                agg["rss_max"] = max(agg["rss_max"], span["peak_rss_mb"])
+                agg["rows_in"] += span["rows_in"]
+                agg["rows_out"] += span["rows_out"]
+
+    def prometheus_text(self):
+        p = self.prefix
+        metrics = [
+            (f"{p}_wall_seconds", "summary", "Tempo de parede por etapa", ("wall_sum", "count")),
+            (f"{p}_cpu_seconds", "summary", "Tempo de CPU do processo por etapa", ("cpu_sum", "count")),
+            (f"{p}_last_wall_seconds", "gauge", "Tempo de parede da execução mais recente", "wall_last"),
+            (f"{p}_peak_rss_bytes", "gauge", "Maior pico de RSS observado na etapa", "rss_max"),
+            (f"{p}_rows_in_total", "counter", "Linhas recebidas pela etapa", "rows_in"),
+            (f"{p}_rows_out_total", "counter", "Linhas produzidas pela etapa", "rows_out"),
+        ]
+        with self._lock:
+            stages = {name: dict(agg) for name, agg in self._stages.items()}
+            runs = self._runs
+
+        lines = [f"# HELP {p}_runs_total Execuções do pipeline observadas",
+                 f"# TYPE {p}_runs_total counter", f"{p}_runs_total {runs}"]
+        for metric, kind, help_text, key in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for name, agg in sorted(stages.items()):
+                label = f'{{stage="{name}"}}'
+                if kind == "summary":
+                    lines.append(f"{metric}_sum{label} {agg[key[0]]:.6f}")
+                    lines.append(f"{metric}_count{label} {agg[key[1]]}")
+                elif key == "rss_max":
+                    lines.append(f"{metric}{label} {int(agg[key] * 1024**2)}")
+                else:
+                    lines.append(f"{metric}{label} {agg[key]}")
+        return "\n".join(lines) + "\n"
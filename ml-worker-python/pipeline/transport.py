@@ -0,0 +1,211 @@
+import io
+import os
+import uuid
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+# input_path dos datasets recebidos por UploadDataset: dataset://<id>/<nome do arquivo>
+DATASET_SCHEME = "dataset://"
+UPLOAD_FORMATS = ("arrow", "parquet", "csv")
+# Fragmentos do DownloadResult: abaixo do limite padrão de 4 MB por mensagem do gRPC
+STREAM_CHUNK_BYTES = 1 << 20
+STREAM_BATCH_ROWS = 65536
+# Memória total dos datasets recebidos; os mais antigos são liberados além disso
+DATASET_STORE_MAX_MB = int(os.environ.get("DATASET_STORE_MAX_MB", "1024"))
+
+class DatasetTooLarge(Exception):
+    """Upload maior que o espaço do store; mapeada para RESOURCE_EXHAUSTED."""
+
+# --- ARROW IPC EM MEMÓRIA COMPARTILHADA ---
+
+def _ipc_bytes(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def share_table(table, name=None, payload=None):
+    """
+    Grava a tabela (ou um stream Arrow IPC já serializado em `payload`) num bloco de
+    memória compartilhada. Retorna (bloco, meta); quem cria é responsável pelo unlink.
+    """
+    if payload is None:
+        payload = _ipc_bytes(table)
+    size = len(payload) if isinstance(payload, (bytes, bytearray)) else payload.size
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1),
+                                     name=name or f"arrow_{uuid.uuid4().hex[:16]}")
+    try:
+        shm.buf[:size] = memoryview(payload).cast("B")
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, {"name": shm.name, "size": size}
+
+def read_shared_table(meta):
+    """Cópia independente do bloco: a tabela continua válida depois que ele é liberado."""
+    # Processos criados por spawn herdam o resource_tracker do processo principal, que faz o unlink
+    shm = shared_memory.SharedMemory(name=meta["name"])
+    try:
+        payload = pa.py_buffer(bytes(shm.buf[:meta["size"]]))
+    finally:
+        shm.close()
+    return pa.ipc.open_stream(payload).read_all()
+
+def apply_shared_table(name, fn):
+    """
+    Chama fn(tabela) com a tabela lida direto do bloco, sem cópia, e devolve o resultado.
+    O resultado precisa ser materializado dentro de fn (take/to_pandas copiam): o bloco
+    é fechado na volta.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return fn(pa.ipc.open_stream(pa.py_buffer(shm.buf)).read_all())
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # Só acontece se fn falhou e o traceback ainda segura a tabela; o mapeamento
+            # fica aberto até o fim do processo, o unlink continua com quem criou o bloco
+            pass
+
+def dataset_name(path):
+    """Nome do bloco de um input_path dataset://<id>/<arquivo>."""
+    return path[len(DATASET_SCHEME):].split("/", 1)[0]
+
+# --- DECODIFICAÇÃO DO UPLOAD ---
+
+def _upload_format(fmt, filename):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+    return {"arrow": "arrow", "arrows": "arrow", "ipc": "arrow", "parquet": "parquet"}.get(ext, "csv")
+
+def decode_upload(payload, fmt):
+    """Converte os bytes recebidos em tabela Arrow: um único parse, sem passar pelo disco."""
+    if fmt == "arrow":
+        # Zero-copy sobre o buffer recebido
+        return pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+    if fmt == "parquet":
+        return pq.read_table(pa.BufferReader(payload))
+    # CSV do TSE: ';' e ISO-8859-1, tudo como texto (mesmo dtype=str do loader)
+    end = payload.find(b"\n")
+    header = bytes(payload[:end if end >= 0 else len(payload)]).decode("iso-8859-1").strip()
+    names = [c.strip().strip('"') for c in header.split(";")]
+    return pacsv.read_csv(
+        pa.BufferReader(payload),
+        read_options=pacsv.ReadOptions(encoding="iso-8859-1"),
+        parse_options=pacsv.ParseOptions(delimiter=";"),
+        convert_options=pacsv.ConvertOptions(column_types={n: pa.string() for n in names}),
+    )
+
+# --- ENCODERS DO DOWNLOAD ---
+
+def _split(data, chunk_bytes):
+    for start in range(0, len(data), chunk_bytes):
+        yield data[start:start + chunk_bytes]
+
+def iter_parquet_ipc(path, batch_rows=STREAM_BATCH_ROWS, chunk_bytes=STREAM_CHUNK_BYTES):
+    """
+    Relê o Parquet um record batch por vez e emite um único stream Arrow IPC em fragmentos:
+    a concatenação dos fragmentos é o stream completo (schema, batches e EOS).
+    """
+    pf = pq.ParquetFile(path)
+    sink = io.BytesIO()
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, pf.schema_arrow) as writer:
+        for batch in pf.iter_batches(batch_size=batch_rows):
+            writer.write_batch(batch)
+            yield from _split(drain(), chunk_bytes)
+    yield from _split(drain(), chunk_bytes)
+
+def iter_file_chunks(path, chunk_bytes=STREAM_CHUNK_BYTES):
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                return
+            yield data
+
+# --- STORE DOS DATASETS RECEBIDOS ---
+
+class DatasetStore:
+    """
+    Datasets recebidos por stream, guardados como Arrow IPC em memória compartilhada:
+    o pipeline os lê pelo input_path dataset://..., no processo do servidor ou nos
+    workers do modo 'process', sem volume compartilhado nem escrita em disco.
+    Acima de `max_bytes` os uploads mais antigos são liberados (LRU por chegada).
+    """
+
+    def __init__(self, max_bytes=DATASET_STORE_MAX_MB * 1024**2):
+        self.max_bytes = max_bytes
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def receive(self, chunks):
+        """Consome os fragmentos de um UploadDataset e devolve o handle do dataset."""
+        parts, size = [], 0
+        filename, fmt = "", ""
+        for chunk in chunks:
+            filename = filename or chunk.filename
+            fmt = fmt or chunk.format
+            size += len(chunk.data)
+            if size > self.max_bytes:
+                raise DatasetTooLarge(f"Upload acima de {self.max_bytes // 1024**2} MB")
+            parts.append(chunk.data)
+
+        fmt = _upload_format(fmt, filename)
+        if fmt not in UPLOAD_FORMATS:
+            raise ValueError(f"Formato desconhecido: {fmt} (use {UPLOAD_FORMATS})")
+        payload = b"".join(parts)
+        del parts
+        table = decode_upload(payload, fmt)
+        # Arrow recebido já é o formato do bloco: copia os bytes como vieram
+        return self.put(table, filename or f"upload.{fmt}", payload=payload if fmt == "arrow" else None)
+
+    def put(self, table, filename, payload=None):
+        shm, meta = share_table(table, name=f"ds_{uuid.uuid4().hex[:16]}", payload=payload)
+        with self._lock:
+            self._blocks[shm.name] = shm
+            self._evict(keep=shm.name)
+        print(f"[TRANSPORT] Dataset {shm.name} recebido: {table.num_rows} linhas, "
+              f"{meta['size'] / 1024**2:.1f} MB ({filename})")
+        return {
+            "dataset_id": shm.name,
+            "input_path": f"{DATASET_SCHEME}{shm.name}/{os.path.basename(filename)}",
+            "rows": table.num_rows,
+            "size_bytes": meta["size"],
+        }
+
+    def release(self, dataset_id):
+        with self._lock:
+            shm = self._blocks.pop(dataset_id, None)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    def _evict(self, keep):
+        total = sum(shm.size for shm in self._blocks.values())
+        for name in list(self._blocks):
+            if total <= self.max_bytes or name == keep:
+                break
+            shm = self._blocks.pop(name)
+            total -= shm.size
+            shm.close()
+            shm.unlink()
+            print(f"[TRANSPORT] Dataset {name} liberado (limite de memória)")
+
+    def close(self):
+        for name in list(self._blocks):
+            self.release(name)
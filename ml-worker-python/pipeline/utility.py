@@ -0,0 +1,153 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+# Pares cujo produto de cardinalidades passa disso são recodificados só com as células observadas
+MAX_DENSE_CELLS = 4_000_000
+
+def encode_frames(df_ori, df_syn, columns):
+    """
+    Codifica as duas bases com um dicionário comum por coluna (uma única passada).
+    Retorna (codes_ori, codes_syn, cardinalidades); NaN vira -1, como o dropna do value_counts.
+    """
+    n_ori = len(df_ori)
+    codes_ori = np.empty((n_ori, len(columns)), dtype=np.int64)
+    codes_syn = np.empty((len(df_syn), len(columns)), dtype=np.int64)
+    cards = []
+    for j, col in enumerate(columns):
+        values = pd.concat([df_ori[col], df_syn[col]], ignore_index=True)
+        codes, uniques = pd.factorize(values)
+        codes_ori[:, j] = codes[:n_ori]
+        codes_syn[:, j] = codes[n_ori:]
+        cards.append(len(uniques))
+    return codes_ori, codes_syn, np.asarray(cards, dtype=np.int64)
+
+def _tables(codes_ori, codes_syn, cards, pairs):
+    """
+    Tabelas de contingência (contagens) de cada marginal, via np.bincount sobre códigos
+    combinados. Retorna listas paralelas de (contagens_ori, contagens_syn).
+    """
+    tables = []
+    for cols in pairs:
+        if len(cols) == 1:
+            a_o, a_s = codes_ori[:, cols[0]], codes_syn[:, cols[0]]
+            valid_o, valid_s = a_o >= 0, a_s >= 0
+            comb_o, comb_s, size = a_o[valid_o], a_s[valid_s], cards[cols[0]]
+        else:
+            i, j = cols
+            valid_o = (codes_ori[:, i] >= 0) & (codes_ori[:, j] >= 0)
+            valid_s = (codes_syn[:, i] >= 0) & (codes_syn[:, j] >= 0)
+            comb_o = codes_ori[valid_o, i] * cards[j] + codes_ori[valid_o, j]
+            comb_s = codes_syn[valid_s, i] * cards[j] + codes_syn[valid_s, j]
+            size = cards[i] * cards[j]
+            if size > MAX_DENSE_CELLS:
+                # Tabela esparsa: só as combinações que aparecem em alguma das bases
+                uniq, inv = np.unique(np.concatenate([comb_o, comb_s]), return_inverse=True)
+                comb_o, comb_s, size = inv[:len(comb_o)], inv[len(comb_o):], len(uniq)
+        # Segmento vazio quebraria o reduceat; uma célula zerada resulta em distância NaN
+        size = max(size, 1)
+        tables.append((np.bincount(comb_o, minlength=size), np.bincount(comb_s, minlength=size)))
+    return tables
+
+def _batched_distances(tables):
+    """
+    JSD (base 2, como scipy.spatial.distance.jensenshannon) e TVD de todas as marginais
+    numa única passada vetorizada sobre as tabelas concatenadas.
+    """
+    sizes = np.array([len(p) for p, _ in tables])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    p = np.concatenate([t[0] for t in tables]).astype(float)
+    q = np.concatenate([t[1] for t in tables]).astype(float)
+
+    seg = np.repeat(np.arange(len(tables)), sizes)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p /= np.add.reduceat(p, offsets)[seg]
+        q /= np.add.reduceat(q, offsets)[seg]
+        m = (p + q) / 2
+        kl_p = np.where(p > 0, p * np.log2(p / m), 0.0)
+        kl_q = np.where(q > 0, q * np.log2(q / m), 0.0)
+    js_div = np.add.reduceat(kl_p + kl_q, offsets) / 2
+    jsd = np.sqrt(np.clip(js_div, 0.0, None))
+    tvd = np.add.reduceat(np.abs(p - q), offsets) / 2
+    return jsd, tvd
+
+def utility_report(df_ori, df_syn, columns=None, joint=True):
+    """
+    Fidelidade estatística entre as bases: JSD e TVD de todas as marginais de 1 via
+    e (com `joint`) de todos os pares de colunas. Retorna um DataFrame com uma linha por
+    marginal (colunas: marginal, order, jsd, tvd).
+    """
+    if columns is None:
+        columns = [c for c in df_ori.columns if c in df_syn.columns]
+    if not columns:
+        return pd.DataFrame(columns=["marginal", "order", "jsd", "tvd"])
+
+    codes_ori, codes_syn, cards = encode_frames(df_ori, df_syn, columns)
+    pairs = [(j,) for j in range(len(columns))]
+    if joint:
+        pairs += list(itertools.combinations(range(len(columns)), 2))
+
+    jsd, tvd = _batched_distances(_tables(codes_ori, codes_syn, cards, pairs))
+    return _report_frame(columns, pairs, jsd, tvd)
+
+def utility_report_from_stats(stats, df_syn, columns=None, joint=True):
+    """
+    Mesmo relatório de utility_report, com o lado original lido de um SufficientStats
+    (stats_store.py) em vez de recontado: só o sintético é varrido.
+    """
+    if columns is None:
+        columns = [c for c in stats.columns if c in df_syn.columns]
+    if not columns:
+        return pd.DataFrame(columns=["marginal", "order", "jsd", "tvd"])
+
+    # Categorias que só existem no sintético ganham códigos além do vocabulário do store
+    codes_syn = stats.encode(df_syn, columns=columns)
+    cards = np.maximum(np.maximum(stats.cardinalities(columns), codes_syn.max(axis=0, initial=-1) + 1), 1)
+    pairs = [(j,) for j in range(len(columns))]
+    if joint:
+        pairs += list(itertools.combinations(range(len(columns)), 2))
+
+    tables = []
+    for cols in pairs:
+        if len(cols) == 1:
+            j = cols[0]
+            counts = stats.counts(columns[j])
+            a_s = codes_syn[:, j]
+            p = np.pad(counts, (0, cards[j] - len(counts)))
+            q = np.bincount(a_s[a_s >= 0], minlength=cards[j])
+        else:
+            i, j = cols
+            a, b, n = stats.pair(columns[i], columns[j])
+            valid_s = (codes_syn[:, i] >= 0) & (codes_syn[:, j] >= 0)
+            comb_o = a * cards[j] + b
+            comb_s = codes_syn[valid_s, i] * cards[j] + codes_syn[valid_s, j]
+            size = cards[i] * cards[j]
+            if size > MAX_DENSE_CELLS:
+                uniq, inv = np.unique(np.concatenate([comb_o, comb_s]), return_inverse=True)
+                comb_o, comb_s, size = inv[:len(comb_o)], inv[len(comb_o):], len(uniq)
+            size = max(size, 1)
+            p = np.bincount(comb_o, weights=n, minlength=size)
+            q = np.bincount(comb_s, minlength=size)
+        tables.append((p, q))
+
+    jsd, tvd = _batched_distances(tables)
+    return _report_frame(columns, pairs, jsd, tvd)
+
+def _report_frame(columns, pairs, jsd, tvd):
+    return pd.DataFrame({
+        "marginal": ["|".join(columns[j] for j in cols) for cols in pairs],
+        "order": [len(cols) for cols in pairs],
+        "jsd": jsd,
+        "tvd": tvd,
+    })
+
+def summarize_utility(report):
+    """Scores agregados (1 - média das distâncias) por ordem de marginal."""
+    one_way = report[report["order"] == 1]
+    two_way = report[report["order"] == 2]
+    return {
+        "util_marginal": float(1.0 - one_way["jsd"].mean()) if len(one_way) else 0.0,
+        "util_joint": float(1.0 - two_way["jsd"].mean()) if len(two_way) else 0.0,
+        "tvd_marginal": float(one_way["tvd"].mean()) if len(one_way) else 0.0,
+        "tvd_joint": float(two_way["tvd"].mean()) if len(two_way) else 0.0,
+    }
@@ -1,6 +1,16 @@
+import os
+import json
 import pandas as pd
 import numpy as np
 
+from .fingerprint import dataset_fingerprint
+from .encoded import EncodedFrame, code_dtype
+
+# Versão do formato do artefato de vocabulários (incrementar ao mudar a lógica do fit)
+WRANGLER_ARTIFACT_VERSION = 1
+# Vocabulários do wrangler ajustados por (hash do dataset, estratégia)
+WRANGLER_CACHE_DIR = os.environ.get("WRANGLER_CACHE_DIR", os.path.join("models", "wranglers"))
+
 class TSEDataWrangler:
     def __init__(self, strategy="intensive"):
         self.strategy = strategy
@@ -48,7 +58,64 @@ class TSEDataWrangler:
             }
             self.default_limit = 10 
 
+    def required_columns(self):
+        """Colunas brutas lidas pelo process(); o loader usa esta lista para podar a leitura."""
+        return self.base_cols + ['DT_NASCIMENTO']
+
+    def fit(self, df):
+        self.fit_transform(df)
+        return self
+
+    def fit_transform(self, df):
+        return self.fit_transform_encoded(df).to_frame()
+
+    def transform(self, df):
+        return self.transform_encoded(df).to_frame()
+
+    def fit_transform_encoded(self, df):
+        """
+        Aprende o que depende dos dados (mediana do ano de nascimento e, por coluna,
+        o vocabulário Top-N ou None quando a coluna fica intacta) e já aplica a df.
+        Devolve o resultado como EncodedFrame (códigos + rótulos); fit_transform o decodifica.
+        """
+        years = self._birth_years(df)
+        self.year_median_ = float(years.median()) if years is not None else None
+        df = self._select_columns(df, years)
+
+        # --- D. REDUÇÃO DE CARDINALIDADE (O "GROSSO" DA ANONIMIZAÇÃO) ---
+        self.vocabularies_ = {}
+        codes, vocab = {}, {}
+        for col in df.columns:
+            col_codes, labels = self._normalize(df[col])
+            self.vocabularies_[col] = self._fit_vocabulary(col_codes, labels, col)
+            codes[col], vocab[col] = self._apply_vocabulary(col_codes, labels, self.vocabularies_[col])
+        return EncodedFrame(codes, vocab, index=df.index)
+
+    def transform_encoded(self, df):
+        """Aplica os vocabulários já ajustados: um lookup por valor distinto, mapeado pelos códigos."""
+        if not hasattr(self, "vocabularies_"):
+            raise RuntimeError("TSEDataWrangler precisa de fit() (ou load()) antes de transform().")
+
+        df = self._select_columns(df, self._birth_years(df))
+        codes, vocab = {}, {}
+        for col in df.columns:
+            col_codes, labels = self._normalize(df[col])
+            codes[col], vocab[col] = self._apply_vocabulary(col_codes, labels, self.vocabularies_.get(col))
+        return EncodedFrame(codes, vocab, index=df.index)
+
     def process(self, df):
+        return self.fit_transform(df)
+
+    def _birth_years(self, df):
+        """Ano de nascimento por linha (NaN se inválido), convertido uma vez por data distinta."""
+        if 'DT_NASCIMENTO' not in df.columns:
+            return None
+        codes, uniques = pd.factorize(df['DT_NASCIMENTO'], use_na_sentinel=False)
+        unique_years = pd.to_datetime(pd.Series(uniques), errors='coerce').dt.year.to_numpy()
+        return pd.Series(unique_years[codes], index=df.index)
+
+    def _select_columns(self, df, years):
+        """Passos A-C: remoção de PII, generalização da idade e seleção das colunas de interesse."""
         # Cópia para evitar SettingWithCopyWarning
         df = df.copy()
 
@@ -56,10 +123,8 @@ class TSEDataWrangler:
         df = df.drop(columns=[c for c in self.blacklist if c in df.columns])
 
         # --- B. GENERALIZAÇÃO TEMPORAL (IDADE) ---
-        if 'DT_NASCIMENTO' in df.columns:
-            # Converte para data e extrai o ano
-            years = pd.to_datetime(df['DT_NASCIMENTO'], errors='coerce').dt.year
-            years = years.fillna(years.median())
+        if years is not None:
+            years = years.fillna(self.year_median_)
 
             if self.strategy == "high_fidelity":
                 # Mantém o ano exato (Alto risco de inferência)
@@ -74,29 +139,127 @@ class TSEDataWrangler:
 
         # --- C. SELEÇÃO E LIMPEZA DE COLUNAS ---
         available_cols = [c for c in self.base_cols if c in df.columns]
-        df = df[available_cols].copy()
+        return df[available_cols].copy()
 
-        # --- D. REDUÇÃO DE CARDINALIDADE (O "GROSSO" DA ANONIMIZAÇÃO) ---
-        for col in df.columns:
-            # Padronização para evitar duplicidade (ex: "MÉDICO" vs "medico")
-            df[col] = df[col].astype(str).str.strip().str.upper().replace('NAN', 'NULL')
-            
-            # Pula redução se for modo fidelidade total para certas colunas
-            if self.strategy == "high_fidelity" and col in ['NM_UE', 'CD_OCUPACAO']:
-                continue
-
-            limit = self.limits.get(col, self.default_limit)
-            
-            # Se a coluna tiver mais categorias que o permitido, agrupamos o "resto"
-            if df[col].nunique() > limit:
-                top_items = df[col].value_counts().nlargest(limit).index
-                df[col] = df[col].apply(lambda x: x if x in top_items else "OUTROS_GRUPOS")
-
-        return df
-
-def apply_wrangling(df, strategy="intensive"):
+    def _normalize(self, series):
+        """
+        Padronização sobre a coluna dicionarizada: o trabalho é feito uma vez por valor
+        distinto e o resultado volta para as linhas através dos códigos.
+        """
+        # Códigos na ordem de primeira aparição (mesma ordem de desempate do value_counts)
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+
+        # Padronização para evitar duplicidade (ex: "MÉDICO" vs "medico")
+        labels = pd.Series(uniques).astype(str).str.strip().str.upper().replace('NAN', 'NULL')
+        label_codes, labels = pd.factorize(labels)
+        return label_codes[codes], np.asarray(labels, dtype=object)
+
+    def _fit_vocabulary(self, codes, labels, col):
+        """Top-N da coluna, ou None quando não há redução a fazer."""
+        # Pula redução se for modo fidelidade total para certas colunas
+        if self.strategy == "high_fidelity" and col in ['NM_UE', 'CD_OCUPACAO']:
+            return None
+
+        limit = self.limits.get(col, self.default_limit)
+        if len(labels) <= limit:
+            return None
+
+        # value_counts sobre os códigos: mesma ordem de primeira aparição e mesmo desempate
+        # (que muda entre versões do pandas) do value_counts sobre os rótulos
+        counts = pd.Series(codes).value_counts()
+        return labels[counts.nlargest(limit).index.to_numpy()].tolist()
+
+    def _apply_vocabulary(self, codes, labels, vocabulary):
+        """
+        Valores fora do vocabulário viram OUTROS_GRUPOS; a decisão é tomada por rótulo, não por
+        linha. Devolve (códigos, rótulos) já com os rótulos agrupados fundidos em um só código.
+        """
+        if vocabulary is not None:
+            labels = np.where(pd.Index(labels).isin(vocabulary), labels, "OUTROS_GRUPOS").astype(object)
+            label_codes, labels = pd.factorize(labels)
+            codes = label_codes[codes]
+        return codes.astype(code_dtype(len(labels))), np.asarray(labels, dtype=object)
+
+    # --- PERSISTÊNCIA DO ARTEFATO ---
+
+    def save(self, path, dataset_hash=None):
+        """Salva os vocabulários ajustados em um JSON pequeno e versionado."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        artifact = {
+            "version": WRANGLER_ARTIFACT_VERSION,
+            "strategy": self.strategy,
+            "dataset_hash": dataset_hash,
+            "limits": self.limits,
+            "default_limit": self.default_limit,
+            "year_median": self.year_median_,
+            "vocabularies": self.vocabularies_,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um wrangler ajustado; retorna None se o artefato for de outra versão/configuração."""
+        with open(path, encoding="utf-8") as f:
+            artifact = json.load(f)
+
+        wrangler = cls(strategy=artifact.get("strategy", "intensive"))
+        if (artifact.get("version") != WRANGLER_ARTIFACT_VERSION
+                or artifact.get("limits") != wrangler.limits
+                or artifact.get("default_limit") != wrangler.default_limit):
+            return None
+
+        wrangler.year_median_ = artifact["year_median"]
+        wrangler.vocabularies_ = artifact["vocabularies"]
+        return wrangler
+
+def _artifact_path(df, strategy, cache_dir):
+    """Caminho do artefato de vocabulários, chaveado por hash do dataset + estratégia."""
+    columns = TSEDataWrangler(strategy=strategy).required_columns()
+    dataset_hash = dataset_fingerprint(df, columns=columns)
+    return os.path.join(cache_dir, f"wrangler_{strategy}_{dataset_hash[:16]}.json"), dataset_hash
+
+def _load_cached(path):
+    if not os.path.exists(path):
+        return None
+    wrangler = TSEDataWrangler.load(path)
+    if wrangler is not None:
+        print(f"[WRANGLING] Vocabulários reaproveitados: {os.path.basename(path)}")
+    return wrangler
+
+def fit_wrangler(df, strategy="intensive", cache_dir=None):
+    """
+    Retorna um TSEDataWrangler ajustado em df. Com cache_dir, os vocabulários ficam salvos
+    por (hash do dataset, estratégia) e execuções seguintes só fazem o transform.
+    Use o mesmo wrangler para transformar treino, teste e sintético com as mesmas categorias.
     """
-    Função de conveniência para o engine.py
+    if cache_dir is None:
+        return TSEDataWrangler(strategy=strategy).fit(df)
+
+    path, dataset_hash = _artifact_path(df, strategy, cache_dir)
+    wrangler = _load_cached(path)
+    if wrangler is None:
+        wrangler = TSEDataWrangler(strategy=strategy).fit(df)
+        wrangler.save(path, dataset_hash=dataset_hash)
+    return wrangler
+
+def apply_wrangling(df, strategy="intensive", cache_dir=None, encoded=False):
     """
-    wrangler = TSEDataWrangler(strategy=strategy)
-    return wrangler.process(df)
\ No newline at end of file
+    Função de conveniência para o engine.py. Com `encoded`, devolve o EncodedFrame do
+    wrangler (códigos + vocabulário) em vez do DataFrame de texto.
+    """
+    if cache_dir is None:
+        result = TSEDataWrangler(strategy=strategy).fit_transform_encoded(df)
+        return result if encoded else result.to_frame()
+
+    path, dataset_hash = _artifact_path(df, strategy, cache_dir)
+    wrangler = _load_cached(path)
+    if wrangler is not None:
+        result = wrangler.transform_encoded(df)
+    else:
+        wrangler = TSEDataWrangler(strategy=strategy)
+        result = wrangler.fit_transform_encoded(df)
+        wrangler.save(path, dataset_hash=dataset_hash)
+    return result if encoded else result.to_frame()
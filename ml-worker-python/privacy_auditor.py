@@ -1,58 +1,135 @@
+import time
 import pandas as pd
 import warnings
-from anonymeter.evaluators import SinglingOutEvaluator, LinkabilityEvaluator, InferenceEvaluator
+
+from pipeline.audit_executor import AUDIT_ENGINE, attack_task, get_audit_executor
+from pipeline.encoded import EncodedFrame, encode_shared
 
 warnings.filterwarnings("ignore")
 
+# Amostra padrão do anonymeter (o motor nativo audita os frames inteiros)
+ANONYMETER_SAMPLE_SIZE = 2500
+
+def _text_sample(df, n):
+    """Amostra em texto para o anonymeter; de um EncodedFrame só as linhas sorteadas são decodificadas."""
+    sample = df.sample(n, random_state=42)
+    return sample.to_frame() if isinstance(sample, EncodedFrame) else sample.astype(str)
+
 class PrivacyAuditor:
-    def __init__(self, df_real, df_syn, control_cols, target_col, sample_size=2500):
+    def __init__(self, df_ori, df_syn, aux_cols, target_col=None, sample_size=None, executor=None, engine=None):
+        self.engine = engine or AUDIT_ENGINE
+        if sample_size is None:
+            sample_size = ANONYMETER_SAMPLE_SIZE if self.engine == "anonymeter" else max(len(df_ori), len(df_syn))
         # Amostragem para garantir que o teste termine em tempo hábil
-        self.sample_size = min(sample_size, len(df_real))
+        self.sample_size = min(sample_size, len(df_ori), len(df_syn))
         
-        self.df_real = df_real.sample(self.sample_size, random_state=42).astype(str)
-        self.df_syn = df_syn.sample(self.sample_size, random_state=42).astype(str)
+        if self.engine == "anonymeter":
+            self.df_real = _text_sample(df_ori, self.sample_size)
+            self.df_syn = _text_sample(df_syn, self.sample_size)
+        else:
+            # Códigos inteiros num vocabulário comum: sem astype(str) e sem amostra, salvo se pedida
+            self.df_real, self.df_syn = encode_shared([df_ori, df_syn])
+            if self.sample_size < max(len(self.df_real), len(self.df_syn)):
+                self.df_real = self.df_real.sample(min(self.sample_size, len(self.df_real)))
+                self.df_syn = self.df_syn.sample(min(self.sample_size, len(self.df_syn)))
         
-        self.control_cols = control_cols
+        self.control_cols = list(aux_cols)
         self.target_col = target_col
+        self.executor = executor or get_audit_executor()
         self.results = {}
+        self.attacks_used = {}  # Preenchido no modo sequencial (ataques efetivamente usados)
+        self.attack_usage = {}  # Tempo, CPU e pico de RSS de cada ataque (ver tracing.measure)
+
+    def _linkability_aux(self):
+        # O LinkabilityEvaluator espera as colunas divididas entre as duas bases do atacante
+        half = max(1, len(self.control_cols) // 2)
+        return (self.control_cols[:half], self.control_cols[half:])
+
+    def build_tasks(self, n_attacks=300, secret_cols=None):
+        """Singling Out, Linkability e uma Inference por coluna secreta (todos independentes)."""
+        secret_cols = secret_cols or ([self.target_col] if self.target_col else [])
+        tasks = [
+            attack_task("singling_out", name="Singling Out", engine=self.engine, n_attacks=n_attacks),
+            attack_task("linkability", name="Linkability", engine=self.engine, n_attacks=n_attacks,
+                        aux_cols=self._linkability_aux()),
+        ]
+        for secret in secret_cols:
+            aux = [c for c in self.control_cols if c != secret]
+            name = "Inference" if len(secret_cols) == 1 else f"Inference [{secret}]"
+            tasks.append(attack_task("inference", name=name, engine=self.engine, n_attacks=n_attacks,
+                                     aux_cols=aux, secret=secret))
+        return tasks
+
+    def _run(self, tasks, progress_cb=None):
+        frames = {"ori": self.df_real, "syn": self.df_syn}
+        results = self.executor.run(frames, tasks, progress_cb=progress_cb)
+        self.results.update(results)
+        return results
+
+    def run_all_attacks(self, n_attacks=300, secret_cols=None, progress_cb=None,
+                        target_ci_width=None, max_attacks=1000, batch_size=100):
+        """
+        Roda todos os ataques em paralelo. Com `target_ci_width`, cada ataque roda em lotes de
+        `batch_size` até a largura do IC ficar abaixo do alvo ou `max_attacks` ser atingido
+        (nesse modo `n_attacks` é ignorado e o total usado fica em `self.attacks_used`).
+        """
+        print(f"🕵️ Auditoria Turbo ({self.engine}): Amostra de {self.sample_size} registros.")
+        if target_ci_width:
+            print(f"🛠️ Configuração: lotes de {batch_size} até IC <= {target_ci_width} "
+                  f"(máx. {max_attacks}), {self.executor.max_workers} processo(s).")
+        else:
+            print(f"🛠️ Configuração: {n_attacks} ataques por vetor, {self.executor.max_workers} processo(s).")
+
+        def log_done(name, result, elapsed):
+            if target_ci_width:
+                status = "✅" if result.converged else "⚠️ orçamento esgotado"
+                print(f"   - {name:22} {status} ({result.n_attacks} ataques, IC {result.ci_width:.4f}, {elapsed:.1f}s)")
+                result = result.risk
+            else:
+                print(f"   - {name:22} ✅ ({elapsed:.1f}s)")
+            if progress_cb is not None:
+                progress_cb(name, result, elapsed)
+
+        start = time.perf_counter()
+        tasks = self.build_tasks(n_attacks, secret_cols)
+        frames = {"ori": self.df_real, "syn": self.df_syn}
+        if target_ci_width:
+            adaptive = self.executor.run_adaptive(frames, tasks, target_ci_width=target_ci_width,
+                                                  batch_size=batch_size, max_attacks=max_attacks,
+                                                  progress_cb=log_done, usage=self.attack_usage)
+            results = {name: r.risk for name, r in adaptive.items()}
+            self.attacks_used.update({name: r.n_attacks for name, r in adaptive.items()})
+        else:
+            results = self.executor.run(frames, tasks, progress_cb=log_done, usage=self.attack_usage)
+        self.results.update(results)
+        print(f"   Auditoria concluída em {time.perf_counter() - start:.1f}s")
+        return results
+
+    # Ataques individuais: devolvem só o valor do risco (None se o ataque falhar)
+
+    def run_singling_out(self, n_attacks=300):
+        risk = self._run([attack_task("singling_out", name="Singling Out", engine=self.engine, n_attacks=n_attacks)])
+        return risk["Singling Out"].value if risk else None
+
+    def run_linkability(self, n_attacks=300):
+        risk = self._run([attack_task("linkability", name="Linkability", engine=self.engine,
+                                      n_attacks=n_attacks, aux_cols=self._linkability_aux())])
+        return risk["Linkability"].value if risk else None
 
-    def run_all_attacks(self, n_attacks=300):
-        print(f"🕵️ Auditoria Turbo: Amostra de {self.sample_size} registros.")
-        print(f"🛠️ Configuração: {n_attacks} ataques por vetor.")
-
-        # 1. SINGLING OUT
-        print("   - Atacando Singling Out... ", end="", flush=True)
-        eval_so = SinglingOutEvaluator(ori=self.df_real, syn=self.df_syn, n_attacks=n_attacks)
-        eval_so.evaluate()
-        self.results['Singling Out'] = eval_so.risk()
-        print("✅")
-
-        # 2. LINKABILITY
-        print("   - Atacando Linkability... ", end="", flush=True)
-        eval_link = LinkabilityEvaluator(ori=self.df_real, syn=self.df_syn, 
-                                          aux_cols=self.control_cols, n_attacks=n_attacks)
-        eval_link.evaluate()
-        self.results['Linkability'] = eval_link.risk()
-        print("✅")
-
-        # 3. INFERENCE
-        print("   - Atacando Inference... ", end="", flush=True)
-        # AJUSTE DEFINITIVO: O parâmetro esperado é 'secret'
-        eval_inf = InferenceEvaluator(ori=self.df_real, 
-                                       syn=self.df_syn, 
-                                       aux_cols=self.control_cols, 
-                                       secret=self.target_col, # O 'alvo' agora é o 'secret'
-                                       n_attacks=n_attacks)
-        eval_inf.evaluate()
-        self.results['Inference'] = eval_inf.risk()
-        print("✅")
+    def run_inference(self, secret_col=None, n_attacks=300):
+        secret_col = secret_col or self.target_col
+        aux = [c for c in self.control_cols if c != secret_col]
+        risk = self._run([attack_task("inference", name="Inference", engine=self.engine,
+                                      n_attacks=n_attacks, aux_cols=aux, secret=secret_col)])
+        return risk["Inference"].value if risk else None
 
     def print_summary(self, epsilon):
         print(f"\n📊 RESULTADOS DE PRIVACIDADE (Epsilon {epsilon})")
         print("-" * 45)
         for attack, risk in self.results.items():
             # Exibindo valor do risco e intervalo de confiança
-            print(f"🔹 {attack:15} | Risco: {risk.value:.4f} | IC: ({risk.ci[0]:.4f}, {risk.ci[1]:.4f})")
+            used = f" | {self.attacks_used[attack]} ataques" if attack in self.attacks_used else ""
+            print(f"🔹 {attack:15} | Risco: {risk.value:.4f} | IC: ({risk.ci[0]:.4f}, {risk.ci[1]:.4f}){used}")
         print("-" * 45)
 
 # ... (mantenha os imports e a classe PrivacyAuditor igual) ...
@@ -62,8 +139,11 @@ if __name__ == "__main__":
     TARGET = 'DS_SIT_TOT_TURNO'
     
     # Configurações de Rigor Acadêmico Equilibrado
-    SAMPLE_SIZE = 2000  # Diminuímos para 2.5k para fluir
-    N_ATTACKS = 150     # 300 ataques já dão um IC (Intervalo de Confiança) sólido
+    # Só o anonymeter precisa de amostra; o motor nativo audita as bases inteiras
+    SAMPLE_SIZE = 2000 if AUDIT_ENGINE == "anonymeter" else None
+    # Em vez de um n_attacks fixo: lotes até o IC de 95% ter no máximo 0.05 de largura
+    TARGET_CI_WIDTH = 0.05
+    MAX_ATTACKS = 1000
     
     try:
         df_real = pd.read_parquet("df_real_auditoria.parquet")
@@ -76,12 +156,11 @@ if __name__ == "__main__":
                 
                 # Criamos o auditor com a amostra equilibrada
                 auditor = PrivacyAuditor(df_real, df_syn, 
-                                         control_cols=QUASI_IDS, 
+                                         aux_cols=QUASI_IDS, 
                                          target_col=TARGET, 
                                          sample_size=SAMPLE_SIZE)
                 
-                # Rodamos com 300 ataques (Equilíbrio entre tempo e precisão)
-                auditor.run_all_attacks(n_attacks=N_ATTACKS) 
+                auditor.run_all_attacks(target_ci_width=TARGET_CI_WIDTH, max_attacks=MAX_ATTACKS)
                 auditor.print_summary(epsilon=eps)
                 
             except FileNotFoundError:
@@ -6,6 +6,7 @@ import json
 
 # Importações confirmadas pelo seu ambiente
 from anonymeter.evaluators import SinglingOutEvaluator, LinkabilityEvaluator, InferenceEvaluator
+from pipeline.audit_executor import attack_task, get_audit_executor
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -20,22 +21,23 @@ def get_risk_label(risk_value):
     else:
         return "🔥 CRÍTICO"
 
-def run_system_audit(df_ori, df_obs, aux_cols):
-    """Realiza a auditoria multi-alvo para inferência de atributos"""
+def run_system_audit(df_ori, df_obs, aux_cols, executor=None):
+    """Realiza a auditoria multi-alvo para inferência de atributos (um processo por alvo)"""
     targets = ['CD_COR_RACA', 'CD_GRAU_INSTRUCAO', 'CD_ESTADO_CIVIL']
     results = {}
 
     print("\n--- 🛡️  AUDITORIA DE SISTEMA (INFERÊNCIA MULTI-ALVO) ---")
 
+    # Verifica se a coluna existe no dataframe amostrado
+    tasks = [attack_task("inference", name=target, ori="ori", syn="obs", aux_cols=aux_cols, secret=target)
+             for target in targets if target in df_ori.columns]
+    executor = executor or get_audit_executor()
+    risks = executor.run({"ori": df_ori, "obs": df_obs}, tasks)
+
     for target in targets:
-        # Verifica se a coluna existe no dataframe amostrado
-        if target not in df_ori.columns:
+        if target not in risks:
             continue
-            
-        eval_inf = InferenceEvaluator(ori=df_ori, syn=df_obs, aux_cols=aux_cols, secret=target)
-        eval_inf.evaluate()
-        
-        risk = eval_inf.risk().value
+        risk = risks[target].value
         results[target] = {
             "risk": risk,
             "label": get_risk_label(risk)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Os testes importam o pacote `pipeline` a partir da raiz do worker e reaproveitam
+# os geradores e referências dos benchmarks (synthetic_tse, bench_wrangler)
+WORKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (WORKER_DIR, os.path.join(WORKER_DIR, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
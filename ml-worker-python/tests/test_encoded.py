@@ -0,0 +1,62 @@
+"""Sidecar .encoded.parquet: ida e volta sem perda e invalidação quando o dado muda."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import encoded as encoded_module
+from pipeline.encoded import EncodedFrame, encoded_path, sidecar_metadata
+from pipeline.fingerprint import dataset_fingerprint
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "SG_UF": rng.choice(["SP", "RJ", "MG", "BA"], 500),
+        "CD_CARGO": rng.choice(["6", "7", "11", "13"], 500),
+        "NM_UE": [f"CIDADE {i % 97}" for i in range(500)],
+    })
+    df.loc[::50, "SG_UF"] = None
+    return df
+
+def test_sidecar_path(tmp_path):
+    path = str(tmp_path / "raw.csv")
+    assert encoded_path(path) == str(tmp_path / "raw.encoded.parquet")
+    assert encoded_path(path, variant="intensive") == str(tmp_path / "raw.intensive.encoded.parquet")
+
+def test_round_trip(frame, tmp_path):
+    path = str(tmp_path / "raw.encoded.parquet")
+    original = EncodedFrame.from_frame(frame)
+    original.metadata = {"pii_columns": ["NM_CANDIDATO"]}
+    original.save(path, fingerprint=dataset_fingerprint(frame))
+
+    loaded = EncodedFrame.load(path, fingerprint=dataset_fingerprint(frame))
+    assert loaded is not None
+    assert loaded.columns == original.columns
+    for col in original.columns:
+        np.testing.assert_array_equal(loaded.codes[col], original.codes[col])
+        np.testing.assert_array_equal(loaded.vocab[col], original.vocab[col])
+    pd.testing.assert_frame_equal(loaded.to_frame(), original.to_frame())
+    assert loaded.metadata == original.metadata
+    assert sidecar_metadata(path) == {"pii_columns": ["NM_CANDIDATO"]}
+
+def test_column_subset(frame, tmp_path):
+    path = str(tmp_path / "raw.encoded.parquet")
+    EncodedFrame.from_frame(frame).save(path)
+    loaded = EncodedFrame.load(path, columns=["CD_CARGO"])
+    assert loaded.columns == ["CD_CARGO"]
+    pd.testing.assert_frame_equal(loaded.to_frame(), EncodedFrame.from_frame(frame).to_frame(["CD_CARGO"]))
+
+def test_changed_data_invalidates_sidecar(frame, tmp_path):
+    path = str(tmp_path / "raw.encoded.parquet")
+    EncodedFrame.from_frame(frame).save(path, fingerprint=dataset_fingerprint(frame))
+
+    changed = frame.copy()
+    changed.loc[0, "CD_CARGO"] = "99"
+    assert dataset_fingerprint(changed) != dataset_fingerprint(frame)
+    assert EncodedFrame.load(path, fingerprint=dataset_fingerprint(changed)) is None
+
+def test_other_format_version_invalidates_sidecar(frame, tmp_path, monkeypatch):
+    path = str(tmp_path / "raw.encoded.parquet")
+    EncodedFrame.from_frame(frame).save(path)
+    monkeypatch.setattr(encoded_module, "ENCODED_FORMAT_VERSION", encoded_module.ENCODED_FORMAT_VERSION + 1)
+    assert EncodedFrame.load(path) is None
@@ -0,0 +1,57 @@
+"""EpsilonBracket: a busca converge para o limiar de um risco monotônico no epsilon."""
+import pytest
+
+from pipeline.epsilon_search import EpsilonBracket, log_grid
+
+TARGET = 0.3
+
+def risk(epsilon, threshold=3.0):
+    # Risco cresce com o epsilon e cruza o alvo exatamente em `threshold`
+    return TARGET * epsilon / threshold
+
+def run(bracket, risk_fn=risk, width=1, fails=()):
+    while probes := bracket.next_probes(width):
+        assert len(probes) <= width
+        for eps in probes:
+            assert eps not in bracket.probes and eps not in bracket.failed
+            if eps in fails:
+                bracket.discard(eps)
+            else:
+                bracket.record(eps, risk_fn(eps))
+    return bracket
+
+@pytest.mark.parametrize("width", [1, 3])
+def test_converges_to_threshold(width):
+    bracket = run(EpsilonBracket(TARGET, max_probes=40, ratio=1.25), width=width)
+    low, high = bracket.bracket()
+    assert low <= 3.0 < high
+    assert high / low <= 1.25
+    assert bracket.best() == (low, True)
+    assert bracket.spent() <= 40
+
+def test_respects_probe_budget():
+    bracket = run(EpsilonBracket(TARGET, max_probes=4, ratio=1.01))
+    assert bracket.spent() == 4
+    epsilon, met = bracket.best()
+    assert met and risk(epsilon) <= TARGET
+
+def test_whole_range_passes():
+    bracket = run(EpsilonBracket(TARGET, eps_max=2.0))
+    assert bracket.best() == (2.0, True)
+    assert list(bracket.probes) == [2.0]
+
+def test_nothing_passes():
+    bracket = run(EpsilonBracket(TARGET, eps_min=5.0, eps_max=50.0))
+    assert bracket.best() == (5.0, False)
+
+def test_failed_probes_are_not_retried():
+    # O teto e a primeira sondagem interna falham: a grade fica mais fina e a busca ainda converge
+    first = log_grid(0.01, 3.3, 1)[0]
+    bracket = run(EpsilonBracket(TARGET, eps_max=3.3, max_probes=40), fails={3.3, first})
+    assert bracket.failed == {3.3, first}
+    epsilon, met = bracket.best()
+    assert met and epsilon <= 3.0
+
+def test_invalid_range():
+    with pytest.raises(ValueError):
+        EpsilonBracket(TARGET, eps_min=1.0, eps_max=1.0001)
@@ -0,0 +1,57 @@
+"""Amostragem do loader: reservatório bottom-k do CSV e row groups do Parquet."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.loader import load_tse_sample
+
+N_ROWS = 5_000
+
+@pytest.fixture(scope="module")
+def csv_path(tmp_path_factory):
+    df = pd.DataFrame({"ID": np.arange(N_ROWS), "SG_UF": np.resize(["SP", "RJ", "MG"], N_ROWS),
+                       "NM_UE": [f"CIDADE {i % 17}" for i in range(N_ROWS)]})
+    path = tmp_path_factory.mktemp("loader") / "raw.csv"
+    df.to_csv(path, sep=";", encoding="iso-8859-1", index=False)
+    return str(path)
+
+def sample_ids(path, **kwargs):
+    return load_tse_sample(path, **kwargs)["ID"].astype(int).tolist()
+
+def test_small_file_is_read_whole_in_order(csv_path):
+    df = load_tse_sample(csv_path, threshold=N_ROWS)
+    assert df["ID"].astype(int).tolist() == list(range(N_ROWS))
+    assert df.attrs["source_rows"] == N_ROWS
+
+def test_reservoir_is_bottom_k_of_row_keys(csv_path):
+    # Uma chave uniforme por linha, na ordem do arquivo: a amostra são as 300 menores
+    keys = np.random.default_rng(7).random(N_ROWS)
+    expected = np.argsort(keys, kind="stable")[:300].tolist()
+    df = load_tse_sample(csv_path, threshold=1_000, sample_size=300, random_state=7, chunksize=256)
+    assert df["ID"].astype(int).tolist() == expected
+    assert df.attrs["source_rows"] == N_ROWS
+
+def test_sample_does_not_depend_on_chunk_size(csv_path):
+    kwargs = dict(threshold=1_000, sample_size=300, random_state=3)
+    reference = sample_ids(csv_path, chunksize=N_ROWS, **kwargs)
+    for chunksize in (7, 999, 1_001):
+        assert sample_ids(csv_path, chunksize=chunksize, **kwargs) == reference
+
+def test_sample_covers_the_whole_file(csv_path):
+    ids = np.array(sample_ids(csv_path, threshold=1_000, sample_size=1_000, chunksize=500))
+    assert len(set(ids)) == len(ids) == 1_000
+    # Cada quinto do arquivo recebe perto de 1/5 da amostra (não só os primeiros chunks)
+    per_fifth = np.bincount(ids * 5 // N_ROWS, minlength=5)
+    assert per_fifth.min() > 150
+
+def test_column_projection(csv_path):
+    df = load_tse_sample(csv_path, columns=["SG_UF", "ID"], threshold=1_000, sample_size=100)
+    assert sorted(df.columns) == ["ID", "SG_UF"]
+    assert len(df) == 100
+
+def test_parquet_sample(csv_path, tmp_path):
+    path = str(tmp_path / "raw.parquet")
+    pd.read_csv(csv_path, sep=";", encoding="iso-8859-1").to_parquet(path, row_group_size=400)
+    ids = sample_ids(path, threshold=1_000, sample_size=300)
+    assert len(set(ids)) == 300 and set(ids) <= set(range(N_ROWS))
+    assert ids == sample_ids(path, threshold=1_000, sample_size=300)
@@ -0,0 +1,92 @@
+"""SufficientStats: base + deltas soma exatamente o mesmo que recontar tudo."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import stats_store
+from pipeline.stats_store import SufficientStats, load_or_build, stats_path
+
+COLUMNS = ["SG_UF", "CD_CARGO", "CD_GENERO", "NM_UE"]
+
+def make_frame(n, seed, cities=40):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "SG_UF": rng.choice(["SP", "RJ", "MG", "BA", "RS"], n),
+        "CD_CARGO": rng.choice(["6", "7", "11", "13"], n),
+        "CD_GENERO": rng.choice(["2", "4"], n),
+        "NM_UE": [f"CIDADE {v}" for v in rng.integers(0, cities, n)],
+    })
+    df.loc[rng.random(n) < 0.05, "CD_GENERO"] = None
+    return df
+
+def pair_cells(stats, col_a, col_b):
+    """Células do par como (rótulo, rótulo, contagem): não dependem da ordem dos códigos."""
+    a, b, n = stats.pair(col_a, col_b)
+    vocab_a, vocab_b = (stats.vocab[stats.columns.index(c)] for c in (col_a, col_b))
+    return sorted(zip(vocab_a[a], vocab_b[b], n.tolist()))
+
+def assert_same(a, b):
+    assert a.n_rows == b.n_rows
+    np.testing.assert_array_equal(a.missing, b.missing)
+    for col in COLUMNS:
+        pd.testing.assert_series_equal(a.value_counts(col), b.value_counts(col))
+    for i, col_a in enumerate(COLUMNS):
+        for col_b in COLUMNS[i + 1:]:
+            assert pair_cells(a, col_a, col_b) == pair_cells(b, col_a, col_b)
+
+@pytest.fixture
+def frames():
+    # Os deltas trazem categorias novas (cidades além das da base)
+    return make_frame(3_000, 0), make_frame(1_000, 1, cities=60), make_frame(500, 2, cities=80)
+
+@pytest.mark.parametrize("dense", [True, False])
+def test_deltas_match_full_rebuild(frames, dense, monkeypatch):
+    if not dense:
+        # Força as tabelas esparsas (triplas) em todos os pares
+        monkeypatch.setattr(stats_store, "MAX_DENSE_CELLS", 1)
+    base, *deltas = frames
+    incremental = SufficientStats.build(base, columns=COLUMNS)
+    for delta in deltas:
+        incremental.update(delta)
+    full = SufficientStats.build(pd.concat(frames, ignore_index=True), columns=COLUMNS)
+    assert_same(incremental, full)
+    assert len(incremental.sources) == 3
+
+def test_value_counts_match_pandas(frames):
+    df = pd.concat(frames, ignore_index=True)
+    stats = SufficientStats.build(df, columns=COLUMNS)
+    for col in COLUMNS:
+        expected = df[col].dropna().astype(str).value_counts()
+        pd.testing.assert_series_equal(stats.value_counts(col).sort_index(), expected.sort_index(),
+                                       check_names=False)
+
+def test_repeated_delta_is_ignored(frames):
+    base, delta, _ = frames
+    stats = SufficientStats.build(base, columns=COLUMNS).update(delta)
+    before = stats.n_rows
+    stats.update(delta)
+    assert stats.n_rows == before
+
+def test_save_load_round_trip(frames, tmp_path):
+    base, delta, _ = frames
+    stats = SufficientStats.build(base, columns=COLUMNS).update(delta)
+    path = str(tmp_path / "raw.stats.npz")
+    stats.save(path)
+    loaded = SufficientStats.load(path)
+    assert loaded.sources == stats.sources
+    assert_same(loaded, stats)
+    # O store carregado continua aceitando deltas
+    _, _, extra = frames
+    assert_same(loaded.update(extra), stats.update(extra))
+
+def test_load_or_build_reuses_only_its_own_store(frames, tmp_path):
+    base, delta, _ = frames
+    path = stats_path(str(tmp_path / "raw.csv"))
+    built = load_or_build(base, path, columns=COLUMNS)
+    assert SufficientStats.load(path).sources == built.sources
+
+    # Um store com deltas no mesmo caminho não serve para a base: é recontado
+    SufficientStats.build(base, columns=COLUMNS).update(delta).save(path)
+    rebuilt = load_or_build(base, path, columns=COLUMNS)
+    assert rebuilt.n_rows == len(base)
+    assert SufficientStats.load(path).n_rows == len(base)
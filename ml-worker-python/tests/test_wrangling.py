@@ -0,0 +1,45 @@
+"""TSEDataWrangler com fit/transform e vocabulários em cache contra o process() original."""
+import pandas as pd
+import pytest
+
+from pipeline.wrangling_tse import TSEDataWrangler, fit_wrangler, apply_wrangling
+from bench_wrangler import legacy_process, STRATEGIES
+from synthetic_tse import make_tse_frame
+
+# DT_NASCIMENTO do gerador vem em dd/mm/aaaa, como no TSE (aviso do pandas, não do wrangler)
+pytestmark = pytest.mark.filterwarnings("ignore:Parsing dates")
+
+@pytest.fixture(scope="module")
+def raw():
+    return make_tse_frame(20_000)
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_process_matches_legacy(raw, strategy):
+    wrangler = TSEDataWrangler(strategy=strategy)
+    pd.testing.assert_frame_equal(wrangler.process(raw), legacy_process(wrangler, raw))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_fit_then_transform_matches_process(raw, strategy):
+    expected = TSEDataWrangler(strategy=strategy).process(raw)
+    wrangler = TSEDataWrangler(strategy=strategy).fit(raw)
+    pd.testing.assert_frame_equal(wrangler.transform(raw), expected)
+    pd.testing.assert_frame_equal(wrangler.transform_encoded(raw).to_frame(), expected)
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_cached_vocabularies_match_process(raw, strategy, tmp_path):
+    expected = TSEDataWrangler(strategy=strategy).process(raw)
+    # Primeira chamada ajusta e grava o artefato; a segunda só faz o transform
+    for _ in range(2):
+        pd.testing.assert_frame_equal(apply_wrangling(raw, strategy=strategy, cache_dir=tmp_path), expected)
+    assert len(list(tmp_path.glob(f"wrangler_{strategy}_*.json"))) == 1
+
+def test_transform_keeps_fitted_categories(raw, tmp_path):
+    wrangler = fit_wrangler(raw, strategy="intensive", cache_dir=tmp_path)
+    fresh = wrangler.transform(make_tse_frame(5_000, random_state=7))
+    for col, vocabulary in wrangler.vocabularies_.items():
+        if vocabulary is not None:
+            assert set(fresh[col]) <= set(vocabulary) | {"OUTROS_GRUPOS"}
+
+def test_transform_requires_fit(raw):
+    with pytest.raises(RuntimeError):
+        TSEDataWrangler().transform(raw)
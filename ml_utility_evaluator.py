@@ -4,12 +4,75 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import f1_score, accuracy_score, precision_score
 from xgboost import XGBClassifier
-from sklearn.preprocessing import LabelEncoder
+import sys
+import os
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+# --- AJUSTE DE PATH ---
+root_dir = os.path.dirname(os.path.abspath(__file__))
+worker_dir = os.path.join(root_dir, "ml-worker-python")
+if worker_dir not in sys.path:
+    sys.path.insert(0, worker_dir)
+
+from pipeline.encoded import EncodedFrame
+from pipeline.fingerprint import dataset_fingerprint
+from pipeline.model_cache import ModelCache
+
+# Núcleos disponíveis para os treinos de avaliação ("0" usa todos)
+ML_EVAL_CPUS = int(os.environ.get("ML_EVAL_CPUS", "0")) or os.cpu_count() or 1
+# Baselines (treino no real) salvos em disco entre execuções ("" guarda só em memória)
+ML_EVAL_CACHE_DIR = os.environ.get("ML_EVAL_CACHE_DIR", os.path.join("models", "tstr_baselines"))
+MODEL_FAMILIES = ("RandomForest", "XGBoost")
+
+# O que fazer com categorias do sintético que não existem no real:
+#   unknown       -> código extra (balde de desconhecidos) no fim do vocabulário
+#   drop          -> descarta as linhas que as contêm
+#   most_frequent -> troca pela categoria mais frequente do real
+UNSEEN_POLICIES = ("unknown", "drop", "most_frequent")
+
+def make_model(family, n_jobs=1):
+    if family == "RandomForest":
+        return RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, n_jobs=n_jobs)
+    if family == "XGBoost":
+        return XGBClassifier(use_label_encoder=False, eval_metric='logloss', random_state=42, n_jobs=n_jobs)
+    raise ValueError(f"Família de modelo desconhecida: {family} (use {MODEL_FAMILIES})")
+
+def fit_score(family, X_train, y_train, X_test, y_test, n_jobs=1):
+    """Treina um modelo da família e o avalia no teste (sempre dado real)."""
+    model = make_model(family, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return {"F1": f1_score(y_test, y_pred, average='weighted'), "Acc": accuracy_score(y_test, y_pred)}
+
+def parallel_fit(jobs, cpu_budget=ML_EVAL_CPUS):
+    """
+    Roda os treinos `jobs` (funções que recebem n_jobs) dividindo o orçamento de núcleos:
+    até cpu_budget treinos simultâneos, com cpu_budget // treinos threads cada. Threads
+    bastam porque sklearn e XGBoost soltam o GIL no treino. Resultados na ordem de `jobs`.
+    """
+    if not jobs:
+        return []
+    workers = max(1, min(len(jobs), cpu_budget))
+    n_jobs = max(1, cpu_budget // workers)
+    if workers == 1:
+        return [job(n_jobs=n_jobs) for job in jobs]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: job(n_jobs=n_jobs), jobs))
 
 class MLUtilityEvaluator:
-    def __init__(self, target_col='CD_SITUACAO_CANDIDATO_TOT'):
+    def __init__(self, target_col='CD_SITUACAO_CANDIDATO_TOT', unseen_policy="unknown",
+                 families=MODEL_FAMILIES, cpu_budget=ML_EVAL_CPUS, cache_dir=ML_EVAL_CACHE_DIR):
+        if unseen_policy not in UNSEEN_POLICIES:
+            raise ValueError(f"unseen_policy inválida: {unseen_policy} (use {UNSEEN_POLICIES})")
         self.target_col = target_col
-        self.le_map = {}
+        self.unseen_policy = unseen_policy
+        self.families = tuple(families)
+        self.cpu_budget = max(1, cpu_budget)
+        self.cache = ModelCache(cache_dir) if cache_dir else None
+        self.vocab = {}  # Rótulos por coluna, fixados pela base real em avaliação
+        self.most_frequent = {}  # Código da categoria mais frequente de cada coluna na base real
+        self._baselines = {}  # Hash da base real -> vocabulário, split e scores do baseline
 
     def _preprocess(self, df):
         """Limpeza básica e encoding para os modelos de ML."""
@@ -18,56 +81,111 @@ class MLUtilityEvaluator:
         cols_to_drop = ['SQ_CANDIDATO', 'NM_CANDIDATO', 'NR_CPF_CANDIDATO']
         df = df.drop(columns=[c for c in cols_to_drop if c in df.columns])
         
-        # Encoding de colunas categóricas
-        for col in df.select_dtypes(include=['object']).columns:
-            if col not in self.le_map:
-                self.le_map[col] = LabelEncoder()
-                df[col] = self.le_map[col].fit_transform(df[col].astype(str))
-            else:
-                # Trata categorias novas no sintético que não existiam no real
-                df[col] = df[col].map(lambda s: s if s in self.le_map[col].classes_ else self.le_map[col].classes_[0])
-                df[col] = self.le_map[col].transform(df[col].astype(str))
+        # Encoding de colunas categóricas (vocabulário ordenado: códigos de um LabelEncoder)
+        obj_cols = list(df.select_dtypes(include=['object']).columns)
+        new_cols = [c for c in obj_cols if c not in self.vocab]
+        if new_cols:
+            fitted = EncodedFrame.from_frame(df, columns=new_cols, sort=True)
+            self.vocab.update(fitted.vocab)
+            for col in new_cols:
+                self.most_frequent[col] = int(np.bincount(fitted.codes[col]).argmax())
+
+        # Um único lookup vetorizado por coluna; categorias fora do vocabulário viram -1
+        encoded = EncodedFrame({}, {c: self.vocab[c] for c in obj_cols}).encode(df)
+        drop_rows = np.zeros(len(df), dtype=bool)
+        for col in obj_cols:
+            codes = encoded.codes[col]
+            unseen = codes < 0
+            if unseen.any():
+                print(f"   ⚠️ {col}: {int(unseen.sum())} valores fora do vocabulário do real ({self.unseen_policy})")
+                if self.unseen_policy == "most_frequent":
+                    codes[unseen] = self.most_frequent[col]
+                elif self.unseen_policy == "unknown" and col != self.target_col:
+                    codes[unseen] = len(self.vocab[col])
+                else:
+                    # Um rótulo-alvo inexistente no real não tem como ser avaliado: a linha sai
+                    drop_rows |= unseen
+            df[col] = codes
+        if drop_rows.any():
+            df = df[~drop_rows]
         return df.fillna(0)
 
-    def run_evaluation(self, df_real, df_syn):
+    # --- BASELINE (TREINO NO REAL) ---
+
+    def _baseline(self, df_real):
         """
-        Treina no sintético, testa no real. 
-        Compara com o baseline (Treina no real, testa no real).
+        Vocabulário, split e scores "Train Real -> Test Real" da base real, calculados uma
+        vez por base (hash do conteúdo): um sweep de epsilons só treina nos sintéticos.
+        Os scores também vão para o disco (ModelCache) e valem para as próximas execuções.
         """
-        # Preparação das bases
-        real_prep = self._preprocess(df_real)
-        syn_prep = self._preprocess(df_syn)
+        data_hash = dataset_fingerprint(df_real)
+        entry = self._baselines.get(data_hash)
+        if entry is None:
+            self.vocab, self.most_frequent = {}, {}
+            real_prep = self._preprocess(df_real)
 
-        # Split do Real para teste (O teste é SEMPRE o dado real não visto)
-        X_real = real_prep.drop(columns=[self.target_col])
-        y_real = real_prep[self.target_col]
-        X_train_real, X_test_real, y_train_real, y_test_real = train_test_split(
-            X_real, y_real, test_size=0.3, random_state=42
-        )
+            # Split do Real para teste (O teste é SEMPRE o dado real não visto)
+            X_real = real_prep.drop(columns=[self.target_col])
+            y_real = real_prep[self.target_col]
+            split = train_test_split(X_real, y_real, test_size=0.3, random_state=42)
+            X_train, X_test, y_train, y_test = split
 
-        # X e y do Sintético (usado integralmente para treino)
-        X_train_syn = syn_prep.drop(columns=[self.target_col])
-        y_train_syn = syn_prep[self.target_col]
+            key = ModelCache.make_key(data_hash, kind="tstr_baseline", target=self.target_col,
+                                      unseen_policy=self.unseen_policy, families=list(self.families))
+            scores = self.cache.get(key) if self.cache else None
+            if scores is None:
+                print(f"   [ML] Treinando baselines no real ({', '.join(self.families)})...")
+                scores = dict(zip(self.families, parallel_fit(
+                    [partial(fit_score, f, X_train, y_train, X_test, y_test) for f in self.families],
+                    self.cpu_budget)))
+                if self.cache:
+                    self.cache.put(key, scores)
+            else:
+                print(f"   [ML] Baselines reaproveitados do cache ({key[:12]})")
+            entry = {"vocab": self.vocab, "most_frequent": self.most_frequent, "split": split, "scores": scores}
+            self._baselines[data_hash] = entry
+        self.vocab, self.most_frequent = entry["vocab"], entry["most_frequent"]
+        return entry
 
-        results = {}
+    # --- AVALIAÇÃO ---
+
+    def run_sweep(self, df_real, synthetic):
+        """
+        Train Synthetic -> Test Real para vários sintéticos ({epsilon: df_syn}) de uma vez:
+        os treinos de cada epsilon e família rodam em paralelo dentro do cpu_budget.
+        Retorna uma tabela com uma linha por epsilon e modelo.
+        """
+        base = self._baseline(df_real)
+        _, X_test, _, y_test = base["split"]
+
+        labels, jobs = [], []
+        for epsilon, df_syn in synthetic.items():
+            # X e y do Sintético (usado integralmente para treino)
+            syn_prep = self._preprocess(df_syn)
+            X_syn, y_syn = syn_prep.drop(columns=[self.target_col]), syn_prep[self.target_col]
+            for family in self.families:
+                labels.append((epsilon, family))
+                jobs.append(partial(fit_score, family, X_syn, y_syn, X_test, y_test))
 
-        # Modelos para testar
-        models = {
-            "RandomForest": RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42),
-            "XGBoost": XGBClassifier(use_label_encoder=False, eval_metric='logloss', random_state=42)
-        }
-
-        for name, model in models.items():
-            # 1. Baseline: Train Real -> Test Real
-            model.fit(X_train_real, y_train_real)
-            y_pred_base = model.predict(X_test_real)
-            
-            # 2. Experimento: Train Synthetic -> Test Real
-            model.fit(X_train_syn, y_train_syn)
-            y_pred_syn = model.predict(X_test_real)
-
-            results[f"{name}_F1_Real"] = f1_score(y_test_real, y_pred_base, average='weighted')
-            results[f"{name}_F1_Syn"] = f1_score(y_test_real, y_pred_syn, average='weighted')
-            results[f"{name}_Acc_Delta"] = accuracy_score(y_test_real, y_pred_base) - accuracy_score(y_test_real, y_pred_syn)
-
-        return results
\ No newline at end of file
+        rows = []
+        for (epsilon, family), score in zip(labels, parallel_fit(jobs, self.cpu_budget)):
+            real = base["scores"][family]
+            rows.append({
+                "Epsilon": epsilon, "Modelo": family,
+                "F1_Real": real["F1"], "F1_Syn": score["F1"],
+                "Acc_Real": real["Acc"], "Acc_Syn": score["Acc"],
+                "Acc_Delta": real["Acc"] - score["Acc"],
+            })
+        return pd.DataFrame(rows)
+
+    def run_evaluation(self, df_real, df_syn):
+        """
+        Treina no sintético, testa no real.
+        Compara com o baseline (Treina no real, testa no real), treinado uma vez por base real.
+        """
+        results = {}
+        for row in self.run_sweep(df_real, {None: df_syn}).itertuples(index=False):
+            results[f"{row.Modelo}_F1_Real"] = row.F1_Real
+            results[f"{row.Modelo}_F1_Syn"] = row.F1_Syn
+            results[f"{row.Modelo}_Acc_Delta"] = row.Acc_Delta
+        return results